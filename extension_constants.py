@@ -14,9 +14,12 @@ class EXTENSION_DEPENDENCIES(BaseExtensionDependencies):
     my_location = auto()
     daily_digest_prompt = auto()  # Customizable prompt for analysis
     daily_digest_storage_path = auto()  # Where to store collected content
+    daily_digest_schedule = auto()  # HH:MM times to precompute the digest at
+    daily_digest_precompute_after = auto()  # Precompute after this many new entries
     airtable_api_key = auto()
     airtable_base_id = auto()
     airtable_table_name = auto()
+    airtable_articles_table_name = auto()  # Table storing each article body once
 
 
 class EXTENSION_ID(BaseExtensionID):
@@ -28,3 +31,4 @@ class EXTENSION_ID(BaseExtensionID):
     notion_mcp_extension = auto()
     calendar_mcp_extension = auto()
     sample_context_extension = auto()
+    clipboard_history_extension = auto()
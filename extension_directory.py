@@ -1,41 +1,37 @@
-from tabtabtab_lib.extension_directory import (
-    ExtensionDescriptor,
-)
-from extensions.sample_extension.sample_extension import SampleExtension
-from extensions.sample_context_extension.sample_context_extension import (
-    SampleContextExtension,
-)
-from extensions.notion_mcp_extension.notion_mcp_extension import NotionMCPExtension
-from extensions.calendar_mcp_extension.calendar_mcp_extension import (
-    CalendarMCPExtension,
-)
 from extension_constants import EXTENSION_DEPENDENCIES, EXTENSION_ID
-from extensions.translation_extension.translation_extension import TranslationExtension
-
+from extension_loader import LazyExtensionDescriptor
 
+# Extension classes are given as "module:Class" import paths and imported on
+# first use, so importing the directory doesn't import every extension.
+# `python local_runner/import_benchmark.py` reports what each one costs.
 EXTENSION_DIRECTORY = [
-    ExtensionDescriptor(
+    LazyExtensionDescriptor(
         extension_id=EXTENSION_ID.sample_extension,
         description="Sample extension to show how to use the extension interface. It takes a copy of a web browser page (public only) and summarizes it.",
         dependencies=[],
-        extension_class=SampleExtension,
+        import_path="extensions.sample_extension.sample_extension:SampleExtension",
     ),
-    ExtensionDescriptor(
+    LazyExtensionDescriptor(
         extension_id=EXTENSION_ID.sample_context_extension,
         description="Sample context extension to show how to use the extension as context provider.",
         dependencies=[],
-        extension_class=SampleContextExtension,
+        import_path=(
+            "extensions.sample_context_extension.sample_context_extension"
+            ":SampleContextExtension"
+        ),
     ),
-    ExtensionDescriptor(
+    LazyExtensionDescriptor(
         extension_id=EXTENSION_ID.notion_mcp_extension,
         description="Notion extension, pushes any text that is copied to the right place in Notion",
         dependencies=[
             EXTENSION_DEPENDENCIES.notion_mcp_url,
             EXTENSION_DEPENDENCIES.anthropic_api_key,
         ],
-        extension_class=NotionMCPExtension,
+        import_path=(
+            "extensions.notion_mcp_extension.notion_mcp_extension:NotionMCPExtension"
+        ),
     ),
-    ExtensionDescriptor(
+    LazyExtensionDescriptor(
         extension_id=EXTENSION_ID.calendar_mcp_extension,
         description="Calendar extension, copy a text and add it to your calender, paste a text and get calendar aware responses.",
         dependencies=[
@@ -43,6 +39,21 @@ EXTENSION_DIRECTORY = [
             EXTENSION_DEPENDENCIES.anthropic_api_key,
             EXTENSION_DEPENDENCIES.my_location,
         ],
-        extension_class=CalendarMCPExtension,
+        import_path=(
+            "extensions.calendar_mcp_extension.calendar_mcp_extension"
+            ":CalendarMCPExtension"
+        ),
+    ),
+    LazyExtensionDescriptor(
+        extension_id=EXTENSION_ID.clipboard_history_extension,
+        description=(
+            "Clipboard history, remembers recent copies and provides them as "
+            "context, by app, page or term."
+        ),
+        dependencies=[],
+        import_path=(
+            "extensions.clipboard_history_extension.clipboard_history_extension"
+            ":ClipboardHistoryExtension"
+        ),
     ),
 ]
@@ -0,0 +1,288 @@
+"""
+Concurrent fan-out of events to every enabled extension.
+
+A copy or paste goes to all extensions at once rather than one after
+another. Each extension gets its own deadline and its own copy of the event
+context; one that raises, hangs or returns nothing doesn't affect the others.
+Paste first gathers `on_context_request` results from every extension in
+parallel and passes them on as `extensions_context`.
+
+Each dispatch returns a DispatchReport with every extension's outcome and
+how long it took until the first extension responded and until all were
+done. Pass `on_response` to forward responses as they arrive instead of
+waiting for the slowest extension. A coroutine handler runs as its own task,
+so a slow one doesn't hold back later responses; the dispatch returns once
+every handler has finished. A plain function is called inline and must be
+quick.
+
+Usage:
+    dispatcher = ExtensionDispatcher(reloader.instances, deadline=5)
+    report = await dispatcher.on_copy(context)
+    report.first_response_seconds
+"""
+
+import asyncio
+import logging
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Mapping, Optional, Set
+
+log = logging.getLogger(__name__)
+
+# How long each extension may take to answer an event (its background work
+# continues independently)
+DEFAULT_EXTENSION_DEADLINE_SECONDS = 5.0
+DEFAULT_CONTEXT_DEADLINE_SECONDS = 2.0
+
+
+def extension_key(extension_id: Any) -> str:
+    return str(getattr(extension_id, "name", extension_id))
+
+
+class DispatchResult:
+    """One extension's answer to one event."""
+
+    def __init__(
+        self,
+        extension_id: Any,
+        response: Any = None,
+        error: Optional[str] = None,
+        timed_out: bool = False,
+        seconds: float = 0.0,
+    ):
+        self.extension_id = extension_id
+        self.response = response
+        self.error = error
+        self.timed_out = timed_out
+        self.seconds = seconds
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None and not self.timed_out
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "extension_id": extension_key(self.extension_id),
+            "responded": self.response is not None,
+            "error": self.error,
+            "timed_out": self.timed_out,
+            "seconds": round(self.seconds, 4),
+        }
+
+
+class DispatchReport:
+    """Outcome of sending one event to every extension."""
+
+    def __init__(self, event: str):
+        self.event = event
+        self.results: List[DispatchResult] = []
+        # From dispatch until the first extension returned a response
+        self.first_response_seconds: Optional[float] = None
+        self.total_seconds = 0.0
+        # Time spent gathering extensions_context before a paste
+        self.context_seconds = 0.0
+
+    @property
+    def responses(self) -> Dict[Any, Any]:
+        return {
+            result.extension_id: result.response
+            for result in self.results
+            if result.response is not None
+        }
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "event": self.event,
+            "first_response_seconds": (
+                round(self.first_response_seconds, 4)
+                if self.first_response_seconds is not None
+                else None
+            ),
+            "total_seconds": round(self.total_seconds, 4),
+            "context_seconds": round(self.context_seconds, 4),
+            "results": [result.to_dict() for result in self.results],
+        }
+
+
+class ExtensionDispatcher:
+    """
+    Sends events to a mapping of extension id to extension instance, such as
+    `ExtensionReloader.instances`. The mapping is read on each dispatch, so
+    reloaded instances are picked up.
+
+    `deadlines` overrides the per-extension deadline by extension id, and
+    `total_deadline` caps every extension's deadline to what is left of it
+    (for a paste, after gathering context).
+    """
+
+    def __init__(
+        self,
+        extensions: Mapping[Any, Any],
+        deadline: float = DEFAULT_EXTENSION_DEADLINE_SECONDS,
+        deadlines: Optional[Dict[Any, float]] = None,
+        total_deadline: Optional[float] = None,
+        context_deadline: float = DEFAULT_CONTEXT_DEADLINE_SECONDS,
+    ):
+        self.extensions = extensions
+        self.deadline = deadline
+        self.deadlines = deadlines or {}
+        self.total_deadline = total_deadline
+        self.context_deadline = context_deadline
+
+    async def on_copy(
+        self,
+        context: Dict[str, Any],
+        on_response: Optional[Callable[[DispatchResult], Any]] = None,
+    ) -> DispatchReport:
+        return await self._fan_out(
+            "on_copy",
+            lambda extension: extension.on_copy(dict(context)),
+            on_response,
+        )
+
+    async def on_paste(
+        self,
+        context: Dict[str, Any],
+        on_response: Optional[Callable[[DispatchResult], Any]] = None,
+        gather_context: bool = True,
+    ) -> DispatchReport:
+        context_seconds = 0.0
+        if gather_context:
+            started = time.perf_counter()
+            extensions_context = await self.gather_context(
+                {"dependencies": context.get("dependencies", {})}
+            )
+            context_seconds = time.perf_counter() - started
+            context = {
+                **context,
+                "extensions_context": {
+                    **extensions_context,
+                    **(context.get("extensions_context") or {}),
+                },
+            }
+        report = await self._fan_out(
+            "on_paste",
+            lambda extension: extension.on_paste(dict(context)),
+            on_response,
+            elapsed=context_seconds,
+        )
+        # Count from the paste, not from the end of context gathering
+        report.context_seconds = context_seconds
+        report.total_seconds += context_seconds
+        if report.first_response_seconds is not None:
+            report.first_response_seconds += context_seconds
+        return report
+
+    async def gather_context(
+        self, context_query: Dict[str, Any], source_extension_id: str = "dispatcher"
+    ) -> Dict[str, Dict[str, Any]]:
+        """
+        Ask every extension for context in parallel and return it in the
+        `extensions_context` shape: {extension: {"contexts": [...]}}.
+        """
+        report = await self._fan_out(
+            "on_context_request",
+            lambda extension: extension.on_context_request(
+                source_extension_id=source_extension_id,
+                context_query=dict(context_query),
+            ),
+            deadline=self.context_deadline,
+        )
+        gathered: Dict[str, Dict[str, Any]] = {}
+        for extension_id, response in report.responses.items():
+            contexts = getattr(response, "contexts", None) or []
+            gathered[extension_key(extension_id)] = {
+                "contexts": [
+                    {"description": c.description, "context": c.context}
+                    for c in contexts
+                ]
+            }
+        return gathered
+
+    def _deadline_for(self, extension_id: Any, default: float, elapsed: float) -> float:
+        deadline = self.deadlines.get(extension_id, default)
+        if self.total_deadline is not None:
+            deadline = min(deadline, max(self.total_deadline - elapsed, 0))
+        return deadline
+
+    async def _call(
+        self,
+        extension_id: Any,
+        extension: Any,
+        call: Callable[[Any], Awaitable[Any]],
+        deadline: float,
+    ) -> DispatchResult:
+        started = time.perf_counter()
+        try:
+            response = await asyncio.wait_for(call(extension), timeout=deadline)
+            return DispatchResult(
+                extension_id, response=response, seconds=time.perf_counter() - started
+            )
+        except asyncio.TimeoutError:
+            log.warning(
+                f"{extension_key(extension_id)} missed its {deadline:.1f}s deadline"
+            )
+            return DispatchResult(
+                extension_id, timed_out=True, seconds=time.perf_counter() - started
+            )
+        except Exception as e:
+            log.error(f"{extension_key(extension_id)} failed: {e!r}", exc_info=True)
+            return DispatchResult(
+                extension_id, error=repr(e), seconds=time.perf_counter() - started
+            )
+
+    @staticmethod
+    async def _forward(event: str, outcome: Awaitable[Any]) -> None:
+        try:
+            await outcome
+        except Exception as e:
+            log.error(f"Response handler failed for {event}: {e}")
+
+    async def _fan_out(
+        self,
+        event: str,
+        call: Callable[[Any], Awaitable[Any]],
+        on_response: Optional[Callable[[DispatchResult], Any]] = None,
+        deadline: Optional[float] = None,
+        elapsed: float = 0.0,
+    ) -> DispatchReport:
+        report = DispatchReport(event)
+        started = time.perf_counter()
+        default = self.deadline if deadline is None else deadline
+        pending = [
+            asyncio.ensure_future(
+                self._call(
+                    extension_id,
+                    extension,
+                    call,
+                    self._deadline_for(extension_id, default, elapsed),
+                )
+            )
+            for extension_id, extension in list(self.extensions.items())
+        ]
+        forwarding: Set["asyncio.Task[None]"] = set()
+        for next_done in asyncio.as_completed(pending):
+            result = await next_done
+            report.results.append(result)
+            if result.response is None:
+                continue
+            if report.first_response_seconds is None:
+                report.first_response_seconds = time.perf_counter() - started
+            if on_response is not None:
+                try:
+                    outcome = on_response(result)
+                    if asyncio.iscoroutine(outcome):
+                        forwarding.add(
+                            asyncio.ensure_future(self._forward(event, outcome))
+                        )
+                except Exception as e:
+                    log.error(f"Response handler failed for {event}: {e}")
+        report.total_seconds = time.perf_counter() - started
+        if forwarding:
+            await asyncio.gather(*forwarding)
+        log.info(
+            f"Dispatched {event} to {len(report.results)} extension(s): "
+            f"{len(report.responses)} responded, first after "
+            f"{(report.first_response_seconds or 0) * 1000:.0f}ms, all done after "
+            f"{report.total_seconds * 1000:.0f}ms"
+        )
+        return report
@@ -0,0 +1,110 @@
+"""
+Lazily imported extension classes for the extension directory.
+
+Importing an extension module pulls in everything it uses (anthropic, mcp,
+aiohttp, pytz, ...). Descriptors here hold the import path of the extension
+class instead of the class, and import it the first time `extension_class`
+is read, so the directory itself is cheap to import and hosts only pay for
+the extensions they actually load. Hosts that need tabtabtab_lib's own
+ExtensionDescriptor get it from `descriptor`, which wraps the resolved class.
+"""
+
+import importlib
+import logging
+import threading
+import time
+from typing import Any, List, Optional, Type
+
+from tabtabtab_lib.extension_directory import ExtensionDescriptor
+
+log = logging.getLogger(__name__)
+
+
+def import_extension_class(import_path: str) -> Type[Any]:
+    """Import "package.module:ClassName" and return the class."""
+    module_name, _, class_name = import_path.partition(":")
+    if not module_name or not class_name:
+        raise ValueError(
+            "Extension import path must look like 'package.module:ClassName', "
+            f"got {import_path!r}"
+        )
+    module = importlib.import_module(module_name)
+    try:
+        extension_class: Type[Any] = getattr(module, class_name)
+    except AttributeError:
+        raise ImportError(f"{module_name} has no attribute {class_name!r}") from None
+    return extension_class
+
+
+class LazyExtensionDescriptor:
+    """
+    Describes an extension like tabtabtab_lib's ExtensionDescriptor, with the
+    class given as an import path and resolved on first use of
+    `extension_class` or `descriptor`.
+    """
+
+    def __init__(
+        self,
+        extension_id: Any,
+        description: str,
+        dependencies: List[Any],
+        import_path: str,
+    ):
+        self.extension_id = extension_id
+        self.description = description
+        self.dependencies = dependencies
+        self.import_path = import_path
+        self._extension_class: Optional[Type[Any]] = None
+        self._descriptor: Optional[ExtensionDescriptor] = None
+        self._lock = threading.Lock()
+        # Seconds spent importing the class, once it has been
+        self.import_seconds: Optional[float] = None
+
+    @property
+    def module_name(self) -> str:
+        return self.import_path.partition(":")[0]
+
+    @property
+    def is_loaded(self) -> bool:
+        return self._extension_class is not None
+
+    @property
+    def extension_class(self) -> Type[Any]:
+        if self._extension_class is None:
+            with self._lock:
+                if self._extension_class is None:
+                    started = time.perf_counter()
+                    extension_class = import_extension_class(self.import_path)
+                    self.import_seconds = time.perf_counter() - started
+                    log.info(
+                        f"Loaded extension {self.extension_id} from {self.import_path} "
+                        f"in {self.import_seconds * 1000:.0f}ms"
+                    )
+                    self._extension_class = extension_class
+        return self._extension_class
+
+    @property
+    def descriptor(self) -> ExtensionDescriptor:
+        """tabtabtab_lib's descriptor for this extension; imports its class."""
+        if self._descriptor is None:
+            self._descriptor = ExtensionDescriptor(
+                extension_id=self.extension_id,
+                description=self.description,
+                dependencies=self.dependencies,
+                extension_class=self.extension_class,
+            )
+        return self._descriptor
+
+    def unload(self) -> None:
+        """Forget the resolved class so the next use imports it again."""
+        with self._lock:
+            self._extension_class = None
+            self._descriptor = None
+            self.import_seconds = None
+
+    def __repr__(self) -> str:
+        state = "loaded" if self.is_loaded else "not loaded"
+        return (
+            f"LazyExtensionDescriptor({self.extension_id}, {self.import_path!r}, "
+            f"{state})"
+        )
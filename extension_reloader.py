@@ -0,0 +1,330 @@
+"""
+Incremental hot reload of the extensions in EXTENSION_DIRECTORY.
+
+Each extension is fingerprinted by the source of its module tree: its own
+modules plus every module in this repository they import, directly or not.
+`reload()` re-reads only files whose size or mtime changed, and re-creates
+only the extensions whose tree contains a changed module. Modules that
+changed, and the repository modules importing them, are dropped from
+sys.modules so they are imported afresh; everything else is left alone.
+
+For each extension being replaced, the attributes named in the class's
+TRANSFERABLE_STATE (pools, caches) are first handed to the new instance when
+the value's type is unchanged, i.e. its module wasn't reloaded. The two
+instances swap those values, so stopping the old one closes the new
+instance's unused fresh resources rather than the ones handed over. Attributes
+in SHARED_STATE are given to the new instance without a swap, so both see the
+same object while the old one drains: work the old instance finishes can
+update state the new one now holds. The new instance then takes the old one's
+place in `instances` and is started, so events arriving while the old one
+drains are served rather than refused.
+Finally the old instance is stopped and the new one takes over the work it
+left behind.
+
+Usage:
+    reloader = ExtensionReloader(EXTENSION_DIRECTORY, create_instance)
+    await reloader.load_all()
+    ...
+    report = await reloader.reload()
+"""
+
+import ast
+import asyncio
+import hashlib
+import logging
+import os
+import sys
+import time
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+log = logging.getLogger(__name__)
+
+PROJECT_ROOT = os.path.dirname(os.path.abspath(__file__))
+
+
+class _ModuleInfo:
+    __slots__ = ("path", "stat", "digest", "imports")
+
+    def __init__(
+        self, path: str, stat: Tuple[int, int], digest: str, imports: Set[str]
+    ):
+        self.path = path
+        self.stat = stat
+        self.digest = digest
+        self.imports = imports
+
+
+class ModuleGraph:
+    """Source digests and import edges for the modules in a source tree."""
+
+    def __init__(self, root: str = PROJECT_ROOT):
+        self.root = root
+        self._modules: Dict[str, _ModuleInfo] = {}
+
+    def resolve(self, name: str) -> Optional[str]:
+        """Path of module `name` if it lives under the root, else None."""
+        base = os.path.join(self.root, *name.split("."))
+        for path in (base + ".py", os.path.join(base, "__init__.py")):
+            if os.path.isfile(path):
+                return path
+        return None
+
+    def refresh(self, name: str) -> Optional[_ModuleInfo]:
+        """Re-read module `name` if its file changed since last time."""
+        path = self.resolve(name)
+        if path is None:
+            self._modules.pop(name, None)
+            return None
+        st = os.stat(path)
+        stat = (st.st_mtime_ns, st.st_size)
+        info = self._modules.get(name)
+        if info is not None and info.path == path and info.stat == stat:
+            return info
+        with open(path, "rb") as f:
+            source = f.read()
+        info = _ModuleInfo(
+            path,
+            stat,
+            hashlib.sha256(source).hexdigest(),
+            self._imports(name, path, source),
+        )
+        self._modules[name] = info
+        return info
+
+    def _imports(self, name: str, path: str, source: bytes) -> Set[str]:
+        try:
+            tree = ast.parse(source, filename=path)
+        except SyntaxError as e:
+            log.warning(f"Cannot parse {path}: {e}")
+            return set()
+        is_package = path.endswith("__init__.py")
+        package = name if is_package else name.rpartition(".")[0]
+        found: Set[str] = set()
+        for node in ast.walk(tree):
+            if isinstance(node, ast.Import):
+                found.update(alias.name for alias in node.names)
+            elif isinstance(node, ast.ImportFrom):
+                if node.level:
+                    parts = package.split(".")
+                    parts = parts[: len(parts) - (node.level - 1)]
+                    base = ".".join(parts + ([node.module] if node.module else []))
+                else:
+                    base = node.module or ""
+                found.add(base)
+                # `from package import submodule`
+                found.update(f"{base}.{alias.name}" for alias in node.names)
+        local: Set[str] = set()
+        for candidate in found:
+            parts = candidate.split(".")
+            # Importing a.b.c also runs a/__init__ and a/b/__init__
+            for i in range(1, len(parts) + 1):
+                prefix = ".".join(parts[:i])
+                if prefix != name and self.resolve(prefix) is not None:
+                    local.add(prefix)
+        return local
+
+    def tree(self, name: str) -> Dict[str, str]:
+        """Digest of `name` and every local module it imports, transitively."""
+        digests: Dict[str, str] = {}
+        pending = [name]
+        while pending:
+            current = pending.pop()
+            if current in digests:
+                continue
+            info = self.refresh(current)
+            if info is None:
+                continue
+            digests[current] = info.digest
+            pending.extend(info.imports)
+        return digests
+
+    def importers(self, names: Iterable[str]) -> Set[str]:
+        """`names` plus every known module that imports any of them, transitively."""
+        result = set(names)
+        changed = True
+        while changed:
+            changed = False
+            for module, info in self._modules.items():
+                if module not in result and info.imports & result:
+                    result.add(module)
+                    changed = True
+        return result
+
+
+def fingerprint(tree: Dict[str, str]) -> str:
+    digest = hashlib.sha256()
+    for name in sorted(tree):
+        digest.update(f"{name}={tree[name]}\n".encode("utf-8"))
+    return digest.hexdigest()
+
+
+def _is_current(cls: type) -> bool:
+    """Whether `cls` is still the class its module defines, i.e. it wasn't reloaded."""
+    target: Any = sys.modules.get(cls.__module__)
+    for part in cls.__qualname__.split("."):
+        target = getattr(target, part, None)
+    return target is cls
+
+
+def transfer_state(old: Any, new: Any) -> List[str]:
+    """
+    Swap the attributes in the new class's TRANSFERABLE_STATE between `old`
+    and `new`, and give `new` those in its SHARED_STATE, where the old value's
+    type wasn't reloaded. Returns the names moved.
+    """
+    moved: List[str] = []
+    shared = getattr(type(new), "SHARED_STATE", ())
+    for name in (*getattr(type(new), "TRANSFERABLE_STATE", ()), *shared):
+        if name not in old.__dict__ or name not in new.__dict__:
+            continue
+        old_value, new_value = old.__dict__[name], new.__dict__[name]
+        if old_value is None:
+            continue
+        if not _is_current(type(old_value)):
+            log.info(f"Not transferring {type(new).__name__}.{name}: its type changed")
+            continue
+        new.__dict__[name] = old_value
+        if name not in shared:
+            old.__dict__[name] = new_value
+        moved.append(name)
+    return moved
+
+
+class ReloadReport:
+    """What a reload did."""
+
+    def __init__(self) -> None:
+        self.reloaded: List[Any] = []
+        self.unchanged: List[Any] = []
+        self.failed: Dict[Any, str] = {}
+        self.transferred: Dict[Any, List[str]] = {}
+        self.purged_modules: List[str] = []
+        self.seconds = 0.0
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "reloaded": [str(i) for i in self.reloaded],
+            "unchanged": [str(i) for i in self.unchanged],
+            "failed": {str(k): v for k, v in self.failed.items()},
+            "transferred": {str(k): v for k, v in self.transferred.items()},
+            "purged_modules": self.purged_modules,
+            "seconds": round(self.seconds, 3),
+        }
+
+
+class ExtensionReloader:
+    """
+    Owns the running instance of each extension in a directory of
+    LazyExtensionDescriptor entries and replaces only those whose source
+    changed. `create_instance(descriptor)` builds an instance of
+    `descriptor.extension_class` the way the host does.
+    """
+
+    def __init__(
+        self,
+        directory: List[Any],
+        create_instance: Callable[[Any], Any],
+        root: str = PROJECT_ROOT,
+        stop_timeout: Optional[float] = None,
+    ):
+        self.directory = directory
+        self.create_instance = create_instance
+        self.stop_timeout = stop_timeout
+        self.graph = ModuleGraph(root)
+        self.instances: Dict[Any, Any] = {}
+        self._trees: Dict[Any, Dict[str, str]] = {}
+        self._lock = asyncio.Lock()
+
+    def fingerprints(self) -> Dict[Any, str]:
+        """Fingerprint of each loaded extension's module tree at its last (re)load."""
+        return {
+            extension_id: fingerprint(tree)
+            for extension_id, tree in self._trees.items()
+        }
+
+    async def load_all(self) -> None:
+        """Create and start an instance of every extension not yet loaded."""
+        async with self._lock:
+            for descriptor in self.directory:
+                if descriptor.extension_id in self.instances:
+                    continue
+                tree = self.graph.tree(descriptor.module_name)
+                instance = self.create_instance(descriptor)
+                await _start(instance)
+                self.instances[descriptor.extension_id] = instance
+                self._trees[descriptor.extension_id] = tree
+
+    async def reload(self) -> ReloadReport:
+        """Replace the extensions whose module tree changed since they were loaded."""
+        async with self._lock:
+            started = time.perf_counter()
+            report = ReloadReport()
+
+            trees = {
+                descriptor.extension_id: self.graph.tree(descriptor.module_name)
+                for descriptor in self.directory
+            }
+            changed_modules: Set[str] = set()
+            for extension_id, tree in trees.items():
+                previous = self._trees.get(extension_id, {})
+                for module in set(tree) | set(previous):
+                    if tree.get(module) != previous.get(module):
+                        changed_modules.add(module)
+
+            stale = self.graph.importers(changed_modules)
+            for module in sorted(stale):
+                if sys.modules.pop(module, None) is not None:
+                    report.purged_modules.append(module)
+
+            for descriptor in self.directory:
+                extension_id = descriptor.extension_id
+                loaded = extension_id in self.instances
+                if loaded and not (set(trees[extension_id]) & stale):
+                    report.unchanged.append(extension_id)
+                    continue
+                try:
+                    await self._replace(descriptor, report)
+                    self._trees[extension_id] = trees[extension_id]
+                    report.reloaded.append(extension_id)
+                except Exception as e:
+                    log.error(f"Reloading {extension_id} failed: {e}", exc_info=True)
+                    report.failed[extension_id] = repr(e)
+
+            report.seconds = time.perf_counter() - started
+            log.info(
+                f"Reloaded {len(report.reloaded)} extension(s), "
+                f"{len(report.unchanged)} unchanged, {len(report.failed)} failed "
+                f"in {report.seconds * 1000:.0f}ms"
+            )
+            return report
+
+    async def _replace(self, descriptor: Any, report: ReloadReport) -> None:
+        descriptor.unload()
+        # Import and construct before touching the old instance, so a broken
+        # change leaves it serving
+        new = self.create_instance(descriptor)
+        old = self.instances.get(descriptor.extension_id)
+        if old is not None:
+            moved = transfer_state(old, new)
+            if moved:
+                report.transferred[descriptor.extension_id] = moved
+        # Route events to the new instance before the old one starts draining
+        self.instances[descriptor.extension_id] = new
+        await _start(new)
+        if old is not None:
+            await _stop(old, self.stop_timeout)
+            take_over = getattr(new, "take_over", None)
+            if take_over is not None:
+                await take_over()
+
+
+async def _start(instance: Any) -> None:
+    start = getattr(instance, "start", None)
+    if start is not None:
+        await start()
+
+
+async def _stop(instance: Any, timeout: Optional[float]) -> None:
+    stop = getattr(instance, "stop", None)
+    if stop is not None:
+        await stop(timeout)
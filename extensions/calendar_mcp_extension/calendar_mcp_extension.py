@@ -1,6 +1,5 @@
-import asyncio
 import logging
-from typing import Any, Dict
+from typing import Any, Dict, Optional, Tuple
 
 from tabtabtab_lib.extension_interface import (
     ExtensionInterface,
@@ -19,8 +18,24 @@ from extensions.mcp_extension_lib import (
 )
 from datetime import datetime
 import pytz
-import anthropic
 from extension_constants import EXTENSION_DEPENDENCIES
+from extensions.single_flight import SingleFlight, flight_key
+from extensions.job_queue import DurableJobsMixin
+from extensions.llm_clients import AnthropicClientPool
+from extensions.relevance import (
+    CALENDAR_APPS,
+    DATE_PATTERN,
+    DEVELOPER_APPS,
+    PASSWORD_MANAGERS,
+    TIME_PATTERN,
+    AppRule,
+    CheckRule,
+    KeywordRule,
+    PatternRule,
+    RelevanceClassifier,
+    looks_like_code,
+)
+from extensions.task_supervisor import PRIORITY_HIGH
 
 # Configure logging
 logging.basicConfig(
@@ -32,6 +47,72 @@ logger = logging.getLogger(__name__)
 # These constants should be moved to the top level
 PASTE_DISABLED_TOOLS = {"create_event", "update_event"}
 
+# Background work for a copy or paste is abandoned after this long
+BACKGROUND_TASK_DEADLINE_SECONDS = 120
+
+# Identical requests made while one is running share its result, so the same
+# event copied on two devices is only created once
+_requests_in_flight = SingleFlight("calendar")
+
+# Decides locally whether text is worth a calendar agent run
+CALENDAR_RELEVANCE = RelevanceClassifier(
+    "calendar",
+    rules=[
+        KeywordRule(
+            "calendar_keyword",
+            [
+                "calendar",
+                "meeting",
+                "meet",
+                "appointment",
+                "schedule",
+                "reschedule",
+                "invite",
+                "invitation",
+                "event",
+                "agenda",
+                "availability",
+                "available",
+                "deadline",
+                "remind",
+                "reminder",
+                "booked",
+                "book",
+            ],
+            0.6,
+        ),
+        KeywordRule(
+            "time_keyword",
+            [
+                "time",
+                "when",
+                "call",
+                "lunch",
+                "dinner",
+                "breakfast",
+                "coffee",
+                "flight",
+                "timezone",
+                "o'clock",
+                "busy",
+                "free",
+            ],
+            0.5,
+        ),
+        PatternRule("date", DATE_PATTERN, 0.45),
+        PatternRule("time", TIME_PATTERN, 0.45),
+        AppRule("calendar_app", CALENDAR_APPS, 0.15),
+        AppRule("developer_app", DEVELOPER_APPS, -0.8),
+        AppRule("password_manager", PASSWORD_MANAGERS, -1.0),
+        CheckRule("code", looks_like_code, -0.8),
+    ],
+)
+# Copies can create events, so they need stronger evidence than paste hints:
+# two signals in the text itself. A lone keyword ("book", "event") or date
+# isn't enough, even copied from a calendar app; the weakest pair of text
+# signals (a date and a time) scores about 0.70.
+COPY_RELEVANCE_THRESHOLD = 0.68
+
 
 def get_current_time(timezone: str):
     """Get the current time in the given timezone"""
@@ -41,11 +122,24 @@ def get_current_time(timezone: str):
     return f"The current time in {timezone} is {current_time}"
 
 
-class CalendarMCPExtension(ExtensionInterface):
+class CalendarMCPExtension(DurableJobsMixin, ExtensionInterface):
     """
     TabTabTab extension that integrates with your calendar via MCP (Model Context Protocol)
     """
 
+    # Not idempotent: running it again could create the event twice
+    JOB_HANDLERS = {"process": "_process_in_background"}
+    # Handed to the new instance on a hot reload
+    TRANSFERABLE_STATE = ("anthropic_clients",)
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.anthropic_clients = AnthropicClientPool()
+
+    async def close_resources(self) -> None:
+        await super().close_resources()
+        await self.anthropic_clients.close()
+
     async def on_context_request(
         self, source_extension_id: str, context_query: Dict[str, Any]
     ) -> OnContextResponse:
@@ -71,14 +165,35 @@ class CalendarMCPExtension(ExtensionInterface):
             # Return None or a specific "nothing to do" notification if desired
             return None
 
+        if not self.is_relevant_text(
+            selected_text, context.get("window_info"), COPY_RELEVANCE_THRESHOLD
+        ):
+            logger.debug(
+                f"{self.extension_id}: Copied text not relevant "
+                f"(Request ID: {request_id})"
+            )
+            return None
+
         # Start background processing, passing dependencies
         logger.info(
             f"{self.extension_id}: Starting background processing for copy (Request ID: {request_id})"
         )
-        asyncio.create_task(
-            self._process_in_background(
-                request_id, selected_text, device_id, dependencies, mode="copy"
-            )
+        await self.submit_job(
+            "process",
+            {
+                "request_id": request_id,
+                "text": selected_text,
+                "device_id": device_id,
+                "dependencies": dependencies,
+                "mode": "copy",
+            },
+            device_id=device_id,
+            idempotency_key=f"copy:{request_id}",
+            deadline=BACKGROUND_TASK_DEADLINE_SECONDS,
+            # Only the latest copy from a device is acted on; one already being
+            # acted on is left to finish, since it may be creating an event
+            supersede_key=("copy", device_id),
+            cancel_running=False,
         )
 
         # Return pending notification immediately
@@ -105,7 +220,7 @@ class CalendarMCPExtension(ExtensionInterface):
             f"{self.extension_id} on_paste: Hint '{hint}', Request ID: {request_id}"
         )
 
-        if not self.is_relevant_text(hint):
+        if not self.is_relevant_text(hint, context.get("window_info")):
             logger.debug(
                 f"{self.extension_id}: Paste hint not relevant (Request ID: {request_id})"
             )
@@ -115,10 +230,21 @@ class CalendarMCPExtension(ExtensionInterface):
         logger.info(
             f"{self.extension_id}: Starting background processing for paste (Request ID: {request_id})"
         )
-        asyncio.create_task(
-            self._process_in_background(
-                request_id, hint, device_id, dependencies, mode="paste"
-            )
+        await self.submit_job(
+            "process",
+            {
+                "request_id": request_id,
+                "text": hint,
+                "device_id": device_id,
+                "dependencies": dependencies,
+                "mode": "paste",
+            },
+            device_id=device_id,
+            idempotency_key=f"paste:{request_id}",
+            # The user is waiting to paste; run ahead of queued copies
+            priority=PRIORITY_HIGH,
+            deadline=BACKGROUND_TASK_DEADLINE_SECONDS,
+            supersede_key=("paste", device_id),
         )
 
         return PasteResponse(
@@ -131,6 +257,19 @@ class CalendarMCPExtension(ExtensionInterface):
             ),
         )
 
+    async def on_job_superseded(self, kind: str, payload: Dict[str, Any]) -> None:
+        """Tell a request replaced by a newer one that it won't be acted on."""
+        await self.send_push_notification(
+            device_id=payload["device_id"],
+            notification=Notification(
+                request_id=payload["request_id"],
+                title="Calendar",
+                detail=f"Replaced by a newer {payload.get('mode', 'copy')}",
+                content="",
+                status=NotificationStatus.INFO,
+            ),
+        )
+
     async def _process_in_background(
         self,
         request_id: str,
@@ -146,7 +285,6 @@ class CalendarMCPExtension(ExtensionInterface):
         logger.info(f"{self.extension_id}: Started processing text.")
 
         final_notification = None  # No need for type annotation
-        time_tool = Tool.from_function(get_current_time)
 
         # Extract these values once at the beginning
         my_location = dependencies.get(EXTENSION_DEPENDENCIES.my_location.name, "")
@@ -159,85 +297,43 @@ class CalendarMCPExtension(ExtensionInterface):
 
         # The rest of the method can be simplified...
         try:
-            async with MCPToolProvider() as tool_provider:
-                logger.info(f"{self.extension_id}: Initializing MCPToolProvider...")
-                await tool_provider.initialize(
-                    calendar_mcp_url, [time_tool], "calendar"
-                )
-
-                # This block can be simplified - no need for multi-line f-string
-                text = f"I am currently at {my_location}. Please resolving the following request: {text}"
-                system_prompt = "You are a helpful assistant specialized in calendar and time-related queries. You can use the following tools to help the user."
-
-                client = anthropic.Anthropic(api_key=anthropic_api_key)
-                tools_dict = await tool_provider.get_tools_as_dicts()
-
-                if mode == "paste":
-                    tools_dict = [
-                        tool
-                        for tool in tools_dict
-                        if tool["name"] not in PASTE_DISABLED_TOOLS
-                    ]
-
-                messages = [{"role": "user", "content": text}]
-                tool_calls = False
-
-                while True:
-                    # Make a direct call to Anthropic using tools parameter
-                    response = client.messages.create(
-                        model=DEFAULT_MODEL,
-                        max_tokens=DEFAULT_MAX_TOKENS,
-                        temperature=DEFAULT_TEMPERATURE,
-                        system=system_prompt,
-                        tools=tools_dict,  # Now passing the dictionary format directly
-                        messages=messages,
-                    )
-
-                    content = response.content
-                    messages.append({"role": "assistant", "content": content})
-
-                    tool_results = await tool_provider.execute_all_tools(content)
-
-                    # we or here as we might have set it to true prior
-                    tool_calls = bool(tool_results) or tool_calls
-
-                    if not tool_results:
-                        result = content[0].text
-                        break
-
-                    messages.append(
-                        {
-                            "role": "user",
-                            "content": tool_results,
-                        }
-                    )
-
-                # Process the text
-                final_content = result
-                logger.info(f"{self.extension_id}: Final content: {final_content}")
-
-                # Determine notification based on mode and result
-                title = "Calendar"
-                if mode == "copy":
-                    # Check if a tool was actually called (implies an action was taken)
-                    if tool_calls:
-                        detail = "Updated calendar"
-                        status = NotificationStatus.READY
-                    else:
-                        # If no tool was called, LLM might just be responding conversationally
-                        detail = "Fetched data"
-                        status = NotificationStatus.READY
-                else:  # mode == "paste"
+            final_content, tool_calls = await _requests_in_flight.do(
+                flight_key(
+                    self.extension_id,
+                    mode,
+                    text,
+                    my_location,
+                    calendar_mcp_url,
+                    anthropic_api_key,
+                ),
+                lambda: self._run_calendar_agent(
+                    text, mode, my_location, calendar_mcp_url, anthropic_api_key
+                ),
+            )
+            logger.info(f"{self.extension_id}: Final content: {final_content}")
+
+            # Determine notification based on mode and result
+            title = "Calendar"
+            if mode == "copy":
+                # Check if a tool was actually called (implies an action was taken)
+                if tool_calls:
+                    detail = "Updated calendar"
+                    status = NotificationStatus.READY
+                else:
+                    # No tool was called; the LLM may just be answering conversationally
                     detail = "Fetched data"
                     status = NotificationStatus.READY
+            else:  # mode == "paste"
+                detail = "Fetched data"
+                status = NotificationStatus.READY
 
-                final_notification = Notification(
-                    request_id=request_id,
-                    title=title,
-                    detail=detail,
-                    content=final_content,
-                    status=status,
-                )
+            final_notification = Notification(
+                request_id=request_id,
+                title=title,
+                detail=detail,
+                content=final_content,
+                status=status,
+            )
 
         except ValueError as e:  # Catch specific init errors like missing keys/URL
             logger.error(
@@ -262,7 +358,6 @@ class CalendarMCPExtension(ExtensionInterface):
                 content=f"Error: {str(e)}",  # Optionally include error in content
                 status=NotificationStatus.ERROR,
             )
-        # MCPManager cleanup happens automatically when exiting the `async with` block
 
         # Send the final notification (either success or error)
         if final_notification:
@@ -289,6 +384,90 @@ class CalendarMCPExtension(ExtensionInterface):
                 f"{self.extension_id}: Processing finished but no final notification was generated."
             )
 
-    def is_relevant_text(self, text: str) -> bool:
-        # Keep this simple or make it more sophisticated if needed
-        return text and ("calendar" in text.lower() or "time" in text.lower())
+    async def _run_calendar_agent(
+        self,
+        text: str,
+        mode: str,
+        my_location: str,
+        calendar_mcp_url: str,
+        anthropic_api_key: str,
+    ) -> Tuple[str, bool]:
+        """
+        Runs the tool loop against the calendar MCP server. Returns the model's
+        final answer and whether any tool was called.
+        """
+        time_tool = Tool.from_function(get_current_time)
+
+        with self.anthropic_clients.lease(anthropic_api_key) as client:
+            async with MCPToolProvider() as tool_provider:
+                logger.info(f"{self.extension_id}: Initializing MCPToolProvider...")
+                await tool_provider.initialize(
+                    calendar_mcp_url, [time_tool], "calendar"
+                )
+
+                # This block can be simplified - no need for multi-line f-string
+                text = (
+                    f"I am currently at {my_location}. "
+                    f"Please resolving the following request: {text}"
+                )
+                system_prompt = (
+                    "You are a helpful assistant specialized in calendar and "
+                    "time-related queries. You can use the following tools to help "
+                    "the user."
+                )
+
+                # Async so that superseding this task also cancels the request in flight
+                tools_dict = await tool_provider.get_tools_as_dicts()
+
+                if mode == "paste":
+                    tools_dict = [
+                        tool
+                        for tool in tools_dict
+                        if tool["name"] not in PASTE_DISABLED_TOOLS
+                    ]
+
+                messages = [{"role": "user", "content": text}]
+                tool_calls = False
+
+                while True:
+                    # Make a direct call to Anthropic using tools parameter
+                    response = await client.messages.create(
+                        model=DEFAULT_MODEL,
+                        max_tokens=DEFAULT_MAX_TOKENS,
+                        temperature=DEFAULT_TEMPERATURE,
+                        system=system_prompt,
+                        tools=tools_dict,  # Now passing the dictionary format directly
+                        messages=messages,
+                    )
+
+                    content = response.content
+                    messages.append({"role": "assistant", "content": content})
+
+                    tool_results = await tool_provider.execute_all_tools(content)
+
+                    # we or here as we might have set it to true prior
+                    tool_calls = bool(tool_results) or tool_calls
+
+                    if not tool_results:
+                        return content[0].text, tool_calls
+
+                    messages.append(
+                        {
+                            "role": "user",
+                            "content": tool_results,
+                        }
+                    )
+        # MCPManager cleanup happens automatically when exiting the `async with` block
+
+    def is_relevant_text(
+        self,
+        text: str,
+        window_info: Optional[Dict[str, Any]] = None,
+        threshold: Optional[float] = None,
+    ) -> bool:
+        result = CALENDAR_RELEVANCE.classify(text, window_info, threshold)
+        logger.debug(
+            f"{self.extension_id}: Relevance {result.score:.2f} "
+            f"({', '.join(result.reasons) or 'no signals'})"
+        )
+        return result.relevant
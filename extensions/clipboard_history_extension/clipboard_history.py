@@ -0,0 +1,339 @@
+"""
+Bounded history of copy events in a fixed-size ring buffer.
+
+The buffer is one contiguous block of `capacity` fixed-size slots, either in
+memory or in a memory-mapped file, so recording a copy is a single copy into
+the next slot and memory use never grows. Each slot holds:
+
+    seq (u64) | copied_at (f64) | app, url, text lengths (u16, u16, u32) | bytes
+
+Text longer than the slot allows is truncated. In-memory indexes map the
+app's bundle id, the URL and each word to the sequence numbers of the entries
+containing them; they are rebuilt from the buffer on open and updated as slots
+are overwritten. Lookups intersect index sets and decode only the entries
+returned.
+
+A file header records the layout and the next sequence number, which is
+written after the slot, so a slot torn by a crash is skipped on open. The
+buffer is opened by `open()`, or on first use, and can be reopened after
+`close()` (an in-memory history starts out empty again).
+"""
+
+import logging
+import mmap
+import os
+import re
+import struct
+import time
+from typing import IO, Any, Dict, Iterable, List, Optional, Set
+
+log = logging.getLogger(__name__)
+
+DEFAULT_CAPACITY = 1000
+DEFAULT_SLOT_SIZE = 4096
+
+# Distinct words indexed per entry; the rest of a long copy is still stored
+MAX_INDEXED_TOKENS = 200
+
+_MAGIC = b"TTTCLIP1"
+_HEADER = struct.Struct("<8sIIQ")  # magic, capacity, slot size, next seq
+_SLOT = struct.Struct("<QdHHI")  # seq + 1 (0 = empty), copied_at, lengths
+_TOKEN_RE = re.compile(r"\w{2,}")
+
+
+def tokenize(text: str) -> Set[str]:
+    tokens: Set[str] = set()
+    for match in _TOKEN_RE.finditer(text.lower()):
+        tokens.add(match.group())
+        if len(tokens) >= MAX_INDEXED_TOKENS:
+            break
+    return tokens
+
+
+def normalize_url(url: Optional[str]) -> str:
+    """Drop the fragment and trailing slash so the same page matches."""
+    if not url:
+        return ""
+    return url.split("#", 1)[0].rstrip("/")
+
+
+def _truncate(data: bytes, limit: int) -> bytes:
+    if len(data) <= limit:
+        return data
+    # Don't leave half a UTF-8 character behind
+    return data[:limit].decode("utf-8", errors="ignore").encode("utf-8")
+
+
+class ClipboardEntry:
+    """One recorded copy."""
+
+    __slots__ = ("seq", "copied_at", "app", "url", "text")
+
+    def __init__(self, seq: int, copied_at: float, app: str, url: str, text: str):
+        self.seq = seq
+        self.copied_at = copied_at
+        self.app = app
+        self.url = url
+        self.text = text
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "text": self.text,
+            "app": self.app,
+            "url": self.url,
+            "copied_at": time.strftime(
+                "%Y-%m-%dT%H:%M:%S", time.localtime(self.copied_at)
+            ),
+        }
+
+
+class ClipboardHistory:
+    """
+    The last `capacity` copies, optionally persisted to `path`.
+
+    Not thread-safe; use it from the event loop only. Nothing is read or
+    mapped until `open()` or the first use.
+    """
+
+    def __init__(
+        self,
+        path: Optional[str] = None,
+        capacity: int = DEFAULT_CAPACITY,
+        slot_size: int = DEFAULT_SLOT_SIZE,
+    ):
+        if slot_size <= _SLOT.size:
+            raise ValueError(f"slot_size must be larger than {_SLOT.size} bytes")
+        self.path = path
+        self.capacity = capacity
+        self.slot_size = slot_size
+        self._next_seq = 0
+        self._file: Optional[IO[bytes]] = None
+        self._mmap: Optional[mmap.mmap] = None
+        self._view: Optional[memoryview] = None
+        self._by_app: Dict[str, Set[int]] = {}
+        self._by_url: Dict[str, Set[int]] = {}
+        self._by_token: Dict[str, Set[int]] = {}
+
+    @property
+    def is_open(self) -> bool:
+        return self._view is not None
+
+    def open(self) -> None:
+        """Map the file (or allocate the buffer) and rebuild the indexes."""
+        if self._view is not None:
+            return
+        size = _HEADER.size + self.capacity * self.slot_size
+        if self.path:
+            self._view = self._open_file(self.path, size)
+        else:
+            self._view = memoryview(bytearray(size))
+        self._next_seq = 0
+        self._by_app.clear()
+        self._by_url.clear()
+        self._by_token.clear()
+        self._load()
+
+    @property
+    def _buffer(self) -> memoryview:
+        assert self._view is not None, "open() the history first"
+        return self._view
+
+    def _open_file(self, path: str, size: int) -> memoryview:
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        # Copies can hold anything; don't let other users read them
+        fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o600)
+        self._file = file = os.fdopen(fd, "r+b")
+        header = file.read(_HEADER.size)
+        fresh = True
+        if len(header) == _HEADER.size:
+            magic, capacity, slot_size, _ = _HEADER.unpack(header)
+            if magic == _MAGIC and (capacity, slot_size) == (
+                self.capacity,
+                self.slot_size,
+            ):
+                fresh = False
+            else:
+                log.warning(
+                    f"Clipboard history at {path} has another layout; starting over"
+                )
+        if fresh:
+            file.truncate(0)
+        file.truncate(size)
+        self._mmap = mapped = mmap.mmap(file.fileno(), size)
+        if fresh:
+            _HEADER.pack_into(mapped, 0, _MAGIC, self.capacity, self.slot_size, 0)
+        return memoryview(mapped)
+
+    def _load(self) -> None:
+        magic, _, _, next_seq = _HEADER.unpack_from(self._buffer, 0)
+        if magic != _MAGIC:
+            return
+        self._next_seq = next_seq
+        for seq in range(max(0, next_seq - self.capacity), next_seq):
+            entry = self._read(seq)
+            if entry is not None:
+                self._index(entry, add=True)
+
+    def __len__(self) -> int:
+        self.open()
+        return min(self._next_seq, self.capacity)
+
+    def _offset(self, seq: int) -> int:
+        return _HEADER.size + (seq % self.capacity) * self.slot_size
+
+    def _read(self, seq: int) -> Optional[ClipboardEntry]:
+        if seq < self._next_seq - self.capacity or seq >= self._next_seq:
+            return None
+        offset = self._offset(seq)
+        stored_seq, copied_at, app_len, url_len, text_len = _SLOT.unpack_from(
+            self._buffer, offset
+        )
+        if stored_seq != seq + 1:
+            return None
+        start = offset + _SLOT.size
+        data = bytes(self._buffer[start : start + app_len + url_len + text_len])
+        return ClipboardEntry(
+            seq,
+            copied_at,
+            data[:app_len].decode("utf-8", errors="ignore"),
+            data[app_len : app_len + url_len].decode("utf-8", errors="ignore"),
+            data[app_len + url_len :].decode("utf-8", errors="ignore"),
+        )
+
+    def _index(self, entry: ClipboardEntry, add: bool) -> None:
+        keys = [(self._by_token, token) for token in tokenize(entry.text)]
+        if entry.app:
+            keys.append((self._by_app, entry.app.lower()))
+        if entry.url:
+            keys.append((self._by_url, normalize_url(entry.url)))
+        for index, key in keys:
+            if add:
+                index.setdefault(key, set()).add(entry.seq)
+                continue
+            seqs = index.get(key)
+            if seqs is not None:
+                seqs.discard(entry.seq)
+                if not seqs:
+                    del index[key]
+
+    def add(
+        self,
+        text: str,
+        app: Optional[str] = None,
+        url: Optional[str] = None,
+        copied_at: Optional[float] = None,
+    ) -> ClipboardEntry:
+        """Record a copy, overwriting the oldest entry once the buffer is full."""
+        self.open()
+        seq = self._next_seq
+        evicted = self._read(seq - self.capacity) if seq >= self.capacity else None
+        if evicted is not None:
+            self._index(evicted, add=False)
+
+        room = self.slot_size - _SLOT.size
+        app_bytes = _truncate((app or "").encode("utf-8"), min(room, 0xFFFF))
+        room -= len(app_bytes)
+        url_bytes = _truncate((url or "").encode("utf-8"), min(room, 0xFFFF))
+        room -= len(url_bytes)
+        text_bytes = _truncate(text.encode("utf-8"), room)
+        copied_at = time.time() if copied_at is None else copied_at
+
+        offset = self._offset(seq)
+        # Invalidate the slot while it's rewritten
+        _SLOT.pack_into(self._buffer, offset, 0, 0.0, 0, 0, 0)
+        start = offset + _SLOT.size
+        payload = app_bytes + url_bytes + text_bytes
+        self._buffer[start : start + len(payload)] = payload
+        _SLOT.pack_into(
+            self._buffer,
+            offset,
+            seq + 1,
+            copied_at,
+            len(app_bytes),
+            len(url_bytes),
+            len(text_bytes),
+        )
+        self._next_seq = seq + 1
+        _HEADER.pack_into(
+            self._buffer, 0, _MAGIC, self.capacity, self.slot_size, self._next_seq
+        )
+
+        entry = ClipboardEntry(
+            seq,
+            copied_at,
+            app_bytes.decode("utf-8"),
+            url_bytes.decode("utf-8"),
+            text_bytes.decode("utf-8"),
+        )
+        self._index(entry, add=True)
+        return entry
+
+    def search(
+        self,
+        app: Optional[str] = None,
+        url: Optional[str] = None,
+        terms: Iterable[str] = (),
+        limit: int = 10,
+    ) -> List[ClipboardEntry]:
+        """
+        Most recent entries first, matching all of the given filters. Terms
+        with no indexable word (a single letter, punctuation) match nothing.
+        """
+        self.open()
+        candidates: List[Set[int]] = []
+        if app:
+            candidates.append(self._by_app.get(app.lower(), set()))
+        if url:
+            candidates.append(self._by_url.get(normalize_url(url), set()))
+        terms = [term for term in terms if term.strip()]
+        tokens: Set[str] = set().union(*(tokenize(term) for term in terms))
+        if terms and not tokens:
+            return []
+        for token in tokens:
+            candidates.append(self._by_token.get(token, set()))
+
+        seqs: Iterable[int]
+        if candidates:
+            candidates.sort(key=len)
+            matches = set(candidates[0]).intersection(*candidates[1:])
+            seqs = sorted(matches, reverse=True)
+        else:
+            seqs = range(self._next_seq - 1, self._next_seq - len(self) - 1, -1)
+
+        results: List[ClipboardEntry] = []
+        for seq in seqs:
+            entry = self._read(seq)
+            if entry is not None:
+                results.append(entry)
+                if len(results) >= limit:
+                    break
+        return results
+
+    def clear(self) -> None:
+        """Forget every entry."""
+        self.open()
+        self._buffer[:] = bytes(len(self._buffer))
+        _HEADER.pack_into(self._buffer, 0, _MAGIC, self.capacity, self.slot_size, 0)
+        self._next_seq = 0
+        self._by_app.clear()
+        self._by_url.clear()
+        self._by_token.clear()
+
+    def flush(self) -> None:
+        if self._mmap is not None:
+            self._mmap.flush()
+
+    def close(self) -> None:
+        """Release the buffer; the next use opens it again."""
+        if self._view is not None:
+            self._view.release()
+            self._view = None
+        if self._mmap is not None:
+            self._mmap.flush()
+            self._mmap.close()
+            self._mmap = None
+        if self._file is not None:
+            self._file.close()
+            self._file = None
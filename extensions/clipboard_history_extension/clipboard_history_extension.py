@@ -0,0 +1,112 @@
+import json
+import logging
+import os
+from typing import Any, Dict, Optional
+
+from tabtabtab_lib.extension_interface import (
+    CopyResponse,
+    ExtensionInterface,
+    OnContextResponse,
+    PasteResponse,
+)
+
+from extensions.lifecycle import LifecycleMixin
+from extensions.relevance import PASSWORD_MANAGERS, looks_like_secret
+
+from .clipboard_history import DEFAULT_CAPACITY, ClipboardHistory
+
+logger = logging.getLogger(__name__)
+
+# Unset keeps the history in memory only
+CLIPBOARD_HISTORY_PATH = os.getenv("TABTABTAB_CLIPBOARD_HISTORY_PATH")
+CLIPBOARD_HISTORY_CAPACITY = int(
+    os.getenv("TABTABTAB_CLIPBOARD_HISTORY_CAPACITY", DEFAULT_CAPACITY)
+)
+
+DEFAULT_CONTEXT_LIMIT = 5
+MAX_CONTEXT_LIMIT = 50
+
+
+class ClipboardHistoryExtension(LifecycleMixin, ExtensionInterface):
+    """
+    Remembers recent copies and offers them as context to other extensions:
+    the latest copies, those from an app or page, or those containing a term.
+    """
+
+    # Handed to the new instance on a hot reload
+    TRANSFERABLE_STATE = ("history",)
+
+    def __init__(self, *args: Any, **kwargs: Any) -> None:
+        super().__init__(*args, **kwargs)
+        self.history = ClipboardHistory(
+            CLIPBOARD_HISTORY_PATH, capacity=CLIPBOARD_HISTORY_CAPACITY
+        )
+
+    async def on_start(self) -> None:
+        """Map the history file now rather than on the first copy."""
+        await super().on_start()
+        self.history.open()
+
+    async def close_resources(self) -> None:
+        await super().close_resources()
+        self.history.close()
+
+    async def on_copy(self, context: Dict[str, Any]) -> CopyResponse:
+        """Record the copy; there is nothing to show for it."""
+        selected_text = context.get("selected_text")
+        if not selected_text or not selected_text.strip() or not self.accepting_work:
+            return None
+
+        window_info = context.get("window_info")
+        window_info = window_info if isinstance(window_info, dict) else {}
+        app = window_info.get("bundleIdentifier") or ""
+        if app.lower().startswith(tuple(p.lower() for p in PASSWORD_MANAGERS)):
+            return None
+        if looks_like_secret(selected_text):
+            logger.info(f"{self.extension_id}: not recording what looks like a secret")
+            return None
+
+        accessibility_data = window_info.get("accessibilityData") or {}
+        url = accessibility_data.get("browser_url") or accessibility_data.get("url")
+        self.history.add(selected_text, app=app, url=url)
+        return None
+
+    async def on_paste(self, context: Dict[str, Any]) -> PasteResponse:
+        return None
+
+    async def on_context_request(
+        self, source_extension_id: str, context_query: Dict[str, Any]
+    ) -> OnContextResponse:
+        """
+        Recent copies, most recent first. `context_query` may narrow them down
+        with "app" (a bundle identifier), "url" and "term", and set "limit".
+        """
+        terms = context_query.get("term")
+        if isinstance(terms, str):
+            terms = [terms]
+        entries = self.history.search(
+            app=context_query.get("app"),
+            url=context_query.get("url"),
+            terms=terms or (),
+            limit=_limit(context_query.get("limit")),
+        )
+        logger.info(
+            f"{self.extension_id}: {len(entries)} recent copies "
+            f"for {source_extension_id}"
+        )
+        return OnContextResponse(
+            contexts=[
+                OnContextResponse.ExtensionContext(
+                    description="recent_copies",
+                    context=json.dumps([entry.to_dict() for entry in entries]),
+                )
+            ]
+        )
+
+
+def _limit(value: Optional[Any]) -> int:
+    try:
+        limit = int(value) if value is not None else DEFAULT_CONTEXT_LIMIT
+    except (TypeError, ValueError):
+        limit = DEFAULT_CONTEXT_LIMIT
+    return max(1, min(limit, MAX_CONTEXT_LIMIT))
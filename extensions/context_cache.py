@@ -0,0 +1,189 @@
+"""
+Cache for on_context_request responses.
+
+Every paste can ask each context provider for context, and providers that
+answer from a remote store (Airtable) or by aggregating local data repeat the
+same work for the same question. A ContextCache keeps each response for a
+TTL chosen by the provider, keyed by the provider, the requesting extension
+and the normalized query. The provider invalidates it when its data changes:
+all entries, or just one scope (e.g. one tenant's).
+
+Concurrent misses for the same key share one computation. A computation that
+was running while its scope was invalidated still returns its result to its
+callers but isn't cached. Cached responses are shared, so callers must not
+mutate them.
+
+Usage:
+    self.context_cache = ContextCache("daily_digest", ttl=60)
+
+    return await self.context_cache.get_or_compute(
+        source_extension_id,
+        context_query,
+        lambda: self._build_context(tenant),
+        scope=tenant.config.cache_key,
+    )
+
+    # After saving new data for the tenant
+    self.context_cache.invalidate(tenant.config.cache_key)
+"""
+
+import hashlib
+import json
+import logging
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple, TypeVar, cast
+
+from extensions.single_flight import SingleFlight, normalize_text
+
+log = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+DEFAULT_TTL_SECONDS = 60.0
+DEFAULT_MAX_ENTRIES = 256
+
+
+def _normalize(value: Any) -> Any:
+    if isinstance(value, str):
+        return normalize_text(value)
+    if isinstance(value, dict):
+        return {str(k): _normalize(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_normalize(v) for v in value]
+    return value
+
+
+def query_key(
+    provider: str,
+    source_extension_id: str,
+    context_query: Dict[str, Any],
+    scope: str = "",
+) -> str:
+    """
+    Key for one question to one provider. The query is hashed rather than
+    kept, since its dependencies carry credentials.
+    """
+    normalized = json.dumps(
+        _normalize(context_query or {}),
+        sort_keys=True,
+        separators=(",", ":"),
+        default=str,
+    )
+    digest = hashlib.sha256(
+        "\0".join((scope, str(source_extension_id), normalized)).encode("utf-8")
+    ).hexdigest()
+    return f"{provider}:{digest}"
+
+
+class _Entry:
+    __slots__ = ("value", "expires", "scope")
+
+    def __init__(self, value: Any, expires: float, scope: str):
+        self.value = value
+        self.expires = expires
+        self.scope = scope
+
+
+class ContextCache:
+    """TTL and LRU bounded cache of one provider's context responses."""
+
+    def __init__(
+        self,
+        provider: str,
+        ttl: float = DEFAULT_TTL_SECONDS,
+        max_entries: int = DEFAULT_MAX_ENTRIES,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.provider = provider
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._clock = clock
+        self._entries: "OrderedDict[str, _Entry]" = OrderedDict()
+        self._flights = SingleFlight(f"{provider}_context")
+        # Bumped by invalidate(); results computed across a bump aren't stored
+        self._epoch = 0
+        self._scope_epochs: Dict[str, int] = {}
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _generation(self, scope: str) -> Tuple[int, int]:
+        return self._epoch, self._scope_epochs.get(scope, 0)
+
+    def get(self, key: str) -> Optional[Any]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if entry.expires <= self._clock():
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return entry.value
+
+    def put(
+        self, key: str, value: Any, scope: str = "", ttl: Optional[float] = None
+    ) -> None:
+        ttl = self.ttl if ttl is None else ttl
+        if ttl <= 0:
+            return
+        self._entries[key] = _Entry(value, self._clock() + ttl, scope)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    async def get_or_compute(
+        self,
+        source_extension_id: str,
+        context_query: Dict[str, Any],
+        compute: Callable[[], Awaitable[T]],
+        scope: str = "",
+        ttl: Optional[float] = None,
+    ) -> T:
+        """Return the cached response for this query, computing it on a miss."""
+        key = query_key(self.provider, source_extension_id, context_query, scope)
+        cached = self.get(key)
+        if cached is not None:
+            self.hits += 1
+            return cast(T, cached)
+        self.misses += 1
+
+        generation = self._generation(scope)
+
+        async def compute_and_store() -> T:
+            value = await compute()
+            if value is not None and self._generation(scope) == generation:
+                self.put(key, value, scope, ttl)
+            return value
+
+        # Callers that arrive after an invalidation don't join a stale computation
+        return await self._flights.do((key, generation), compute_and_store)
+
+    def invalidate(self, scope: Optional[str] = None) -> int:
+        """Drop the entries for `scope`, or all entries. Returns how many."""
+        if scope is None:
+            self._epoch += 1
+            self._scope_epochs.clear()
+            dropped = len(self._entries)
+            self._entries.clear()
+        else:
+            self._scope_epochs[scope] = self._scope_epochs.get(scope, 0) + 1
+            stale = [
+                key for key, entry in self._entries.items() if entry.scope == scope
+            ]
+            for key in stale:
+                del self._entries[key]
+            dropped = len(stale)
+        if dropped:
+            log.debug(f"Invalidated {dropped} {self.provider} context response(s)")
+        return dropped
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "provider": self.provider,
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+        }
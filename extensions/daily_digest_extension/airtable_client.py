@@ -1,80 +1,177 @@
 """Airtable client for the Daily Digest Extension."""
 
-import requests
+import weakref
 from datetime import datetime
-from typing import Dict, Any, Optional
+from typing import Any, Dict, List, Optional
+
+import aiohttp
 
 from . import config
+from .http_client import PooledClient, RateLimiter
+
+# Airtable's limit applies per base, so every client for a base shares one
+# limiter. It lives as long as some client uses it; clients live as long as
+# their tenant stays cached.
+_base_limiters: "weakref.WeakValueDictionary[str, RateLimiter]" = (
+    weakref.WeakValueDictionary()
+)
+
+
+def _limiter_for_base(base_id: str) -> RateLimiter:
+    limiter = _base_limiters.get(base_id)
+    if limiter is None:
+        limiter = RateLimiter(config.AIRTABLE_REQUESTS_PER_SECOND)
+        _base_limiters[base_id] = limiter
+    return limiter
+
 
-class AirtableClient:
-    def __init__(self, api_key: Optional[str] = None, base_id: Optional[str] = None):
+class AirtableClient(PooledClient):
+    def __init__(
+        self,
+        api_key: str,
+        base_id: str,
+        table_name: Optional[str] = None,
+        session: Optional[aiohttp.ClientSession] = None,
+    ):
         """Initialize the Airtable client.
-        
+
         Args:
-            api_key: Optional Airtable API key. If not provided, uses the one from config.
-            base_id: Optional Airtable base ID. If not provided, uses the one from config.
+            api_key: Airtable API key.
+            base_id: Airtable base ID.
+            table_name: Default table for the entry helpers.
+            session: Optional shared session; one is created on first use otherwise.
         """
-        self.api_key = api_key or config.AIRTABLE_API_KEY
-        self.base_id = base_id or config.AIRTABLE_BASE_ID
-        self.headers = {
-            "Authorization": f"Bearer {self.api_key}",
-            "Content-Type": "application/json"
-        }
-        
-    def _get_table_url(self) -> str:
-        """Get the full URL for the Airtable table."""
-        return f"{config.AIRTABLE_API_URL}/{self.base_id}/{config.AIRTABLE_TABLE_NAME}"
-    
-    def create_entry(self, title: str, content: str, source_url: str, summary: str) -> Dict[str, Any]:
+        super().__init__(
+            headers={
+                "Authorization": f"Bearer {api_key}",
+                "Content-Type": "application/json",
+            },
+            limiter=_limiter_for_base(base_id),
+            session=session,
+        )
+        self.base_id = base_id
+        self.table_name = table_name
+
+    def _get_table_url(self, table: Optional[str] = None) -> str:
+        """Get the full URL for an Airtable table."""
+        return f"{config.AIRTABLE_API_URL}/{self.base_id}/{table or self.table_name}"
+
+    async def list_records(
+        self,
+        table: Optional[str] = None,
+        formula: Optional[str] = None,
+        max_records: Optional[int] = None,
+    ) -> List[Dict[str, Any]]:
+        """Retrieve records, following pagination until done or `max_records`.
+
+        Args:
+            table: Table to read; defaults to the client's table
+            formula: Optional `filterByFormula` expression
+            max_records: Maximum number of records to retrieve
+
+        Returns:
+            The retrieved records
+
+        Raises:
+            HTTPError: If the API request fails
+        """
+        params: Dict[str, Any] = {"pageSize": config.AIRTABLE_PAGE_SIZE}
+        if formula:
+            params["filterByFormula"] = formula
+        if max_records:
+            params["maxRecords"] = max_records
+
+        records: List[Dict[str, Any]] = []
+        while True:
+            data = await self._request("GET", self._get_table_url(table), params=params)
+            records.extend(data.get("records", []))
+            offset = data.get("offset")
+            if not offset or (max_records and len(records) >= max_records):
+                return records[:max_records] if max_records else records
+            params["offset"] = offset
+
+    async def create_records(
+        self, fields: List[Dict[str, Any]], table: Optional[str] = None
+    ) -> List[Dict[str, Any]]:
+        """Create records, batching to Airtable's per-request limit.
+
+        Returns:
+            The created records, in order
+
+        Raises:
+            HTTPError: If the API request fails
+        """
+        created: List[Dict[str, Any]] = []
+        for i in range(0, len(fields), config.AIRTABLE_BATCH_SIZE):
+            batch = fields[i : i + config.AIRTABLE_BATCH_SIZE]
+            data = await self._request(
+                "POST",
+                self._get_table_url(table),
+                json={"records": [{"fields": f} for f in batch]},
+            )
+            created.extend(data.get("records", []))
+        return created
+
+    async def update_records(
+        self, updates: Dict[str, Dict[str, Any]], table: Optional[str] = None
+    ) -> List[Dict[str, Any]]:
+        """Update fields on existing records, keyed by record ID.
+
+        Raises:
+            HTTPError: If the API request fails
+        """
+        items = list(updates.items())
+        updated: List[Dict[str, Any]] = []
+        for i in range(0, len(items), config.AIRTABLE_BATCH_SIZE):
+            batch = items[i : i + config.AIRTABLE_BATCH_SIZE]
+            data = await self._request(
+                "PATCH",
+                self._get_table_url(table),
+                json={"records": [{"id": rid, "fields": f} for rid, f in batch]},
+            )
+            updated.extend(data.get("records", []))
+        return updated
+
+    async def create_entry(
+        self, title: str, content: str, source_url: str, summary: str
+    ) -> Dict[str, Any]:
         """Create a new entry in the Airtable table.
-        
+
         Args:
             title: The title of the digest entry
             content: The content of the digest entry
             source_url: The source URL of the content
             summary: A summary of the content
-            
+
         Returns:
             The created record from Airtable
-            
+
         Raises:
-            requests.exceptions.RequestException: If the API request fails
+            HTTPError: If the API request fails
         """
-        data = {
-            "fields": {
-                config.FIELD_DATE: datetime.now().isoformat(),
-                config.FIELD_TITLE: title,
-                config.FIELD_CONTENT: content,
-                config.FIELD_SOURCE_URL: source_url,
-                config.FIELD_SUMMARY: summary
-            }
-        }
-        
-        response = requests.post(
-            self._get_table_url(),
-            headers=self.headers,
-            json=data
+        records = await self.create_records(
+            [
+                {
+                    config.FIELD_DATE: datetime.now().strftime(config.DATE_FORMAT),
+                    config.FIELD_TITLE: title,
+                    config.FIELD_CONTENT: content,
+                    config.FIELD_SOURCE_URL: source_url,
+                    config.FIELD_SUMMARY: summary,
+                }
+            ]
         )
-        response.raise_for_status()
-        return response.json()
-    
-    def get_entries(self, max_records: int = 100) -> Dict[str, Any]:
+        return records[0] if records else {}
+
+    async def get_entries(self, max_records: int = 100) -> List[Dict[str, Any]]:
         """Retrieve entries from the Airtable table.
-        
+
         Args:
             max_records: Maximum number of records to retrieve
-            
+
         Returns:
-            Dictionary containing the retrieved records
-            
+            The retrieved records
+
         Raises:
-            requests.exceptions.RequestException: If the API request fails
+            HTTPError: If the API request fails
         """
-        params = {"maxRecords": max_records}
-        response = requests.get(
-            self._get_table_url(),
-            headers=self.headers,
-            params=params
-        )
-        response.raise_for_status()
-        return response.json() 
\ No newline at end of file
+        return await self.list_records(max_records=max_records)
@@ -0,0 +1,97 @@
+"""Persisted digest analyses for the Daily Digest Extension."""
+
+import hashlib
+import json
+import logging
+import os
+from typing import Any, Dict, Optional
+
+from . import config
+
+log = logging.getLogger(__name__)
+
+
+def fingerprint(value: str) -> str:
+    """Return a short, stable fingerprint for a prompt or tenant key."""
+    return hashlib.sha256(value.encode("utf-8")).hexdigest()[:16]
+
+
+class DigestAnalysis:
+    """The last analysis generated for a day, plus the watermark it covers."""
+
+    def __init__(
+        self,
+        date: str,
+        prompt_hash: str,
+        watermark: str,
+        entry_count: int,
+        analysis: str,
+        generated_at: str,
+    ):
+        self.date = date
+        self.prompt_hash = prompt_hash
+        # Timestamp of the newest entry already folded into `analysis`
+        self.watermark = watermark
+        self.entry_count = entry_count
+        self.analysis = analysis
+        self.generated_at = generated_at
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "date": self.date,
+            "prompt_hash": self.prompt_hash,
+            "watermark": self.watermark,
+            "entry_count": self.entry_count,
+            "analysis": self.analysis,
+            "generated_at": self.generated_at,
+        }
+
+    @staticmethod
+    def from_dict(data: Dict[str, Any]) -> "DigestAnalysis":
+        return DigestAnalysis(
+            date=data.get("date", ""),
+            prompt_hash=data.get("prompt_hash", ""),
+            watermark=data.get("watermark", ""),
+            entry_count=data.get("entry_count", 0),
+            analysis=data.get("analysis", ""),
+            generated_at=data.get("generated_at", ""),
+        )
+
+
+class AnalysisStore:
+    """Stores one analysis per day and tenant as a small JSON file."""
+
+    def __init__(self, storage_path: Optional[str] = None):
+        self.storage_path = os.path.expanduser(
+            storage_path or config.DEFAULT_STORAGE_PATH
+        )
+
+    def _path(self, date: str, tenant: str) -> str:
+        filename = config.ANALYSIS_FILENAME_FORMAT.format(
+            date=date, tenant=fingerprint(tenant)
+        )
+        return os.path.join(self.storage_path, filename)
+
+    def load(self, date: str, tenant: str) -> Optional[DigestAnalysis]:
+        """Load the stored analysis for `date`, if there is one."""
+        path = self._path(date, tenant)
+        if not os.path.exists(path):
+            return None
+        try:
+            with open(path, "r") as f:
+                return DigestAnalysis.from_dict(json.load(f))
+        except Exception as e:
+            log.error(f"Error loading digest analysis: {e}")
+            return None
+
+    def save(self, analysis: DigestAnalysis, tenant: str) -> None:
+        """Atomically replace the stored analysis for `analysis.date`."""
+        path = self._path(analysis.date, tenant)
+        tmp_path = f"{path}.tmp"
+        try:
+            os.makedirs(self.storage_path, exist_ok=True)
+            with open(tmp_path, "w") as f:
+                json.dump(analysis.to_dict(), f)
+            os.replace(tmp_path, path)
+        except Exception as e:
+            log.error(f"Error saving digest analysis: {e}")
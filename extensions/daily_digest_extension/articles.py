@@ -0,0 +1,44 @@
+"""Content-addressed article bodies for the Daily Digest Extension."""
+
+import hashlib
+from collections import OrderedDict
+from typing import Dict, Iterable, Optional
+
+
+def article_hash(url: str, content: str) -> str:
+    """Key an article body by its URL and content."""
+    return hashlib.sha256(f"{url}\n{content}".encode("utf-8")).hexdigest()[:32]
+
+
+class ArticleCache:
+    """
+    Bounded LRU of article bodies known to be stored, so repeated copies from
+    the same page neither re-upload nor re-download the article.
+    """
+
+    def __init__(self, max_articles: int = 256):
+        self.max_articles = max_articles
+        self._articles: "OrderedDict[str, str]" = OrderedDict()
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._articles
+
+    def get(self, key: str) -> Optional[str]:
+        content = self._articles.get(key)
+        if content is not None:
+            self._articles.move_to_end(key)
+        return content
+
+    def put(self, key: str, content: str) -> None:
+        self._articles[key] = content
+        self._articles.move_to_end(key)
+        while len(self._articles) > self.max_articles:
+            self._articles.popitem(last=False)
+
+    def get_many(self, keys: Iterable[str]) -> Dict[str, str]:
+        found = {}
+        for key in keys:
+            content = self.get(key)
+            if content is not None:
+                found[key] = content
+        return found
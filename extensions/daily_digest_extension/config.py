@@ -1,6 +1,20 @@
 """Configuration settings for the Daily Digest Extension."""
 
+# Airtable Configuration
+AIRTABLE_API_URL = "https://api.airtable.com/v0"
+AIRTABLE_REQUESTS_PER_SECOND = 5  # Airtable's documented per-base limit
+AIRTABLE_PAGE_SIZE = 100
+AIRTABLE_BATCH_SIZE = 10  # Max records per create/update request
+
+# Airtable Fields
+FIELD_DATE = "Date"
+FIELD_TITLE = "Title"
+FIELD_CONTENT = "Content"
+FIELD_SOURCE_URL = "URL"
+FIELD_SUMMARY = "Summary"
+
 # Google Docs MCP Configuration
+GDOCS_REQUESTS_PER_SECOND = 2
 GDOCS_MCP_URL = "https://mcp.gumloop.com/gdocs/88sJerPkIhdgWSiZ17SRD897y5E3:4c7710595ad247458892643a9258a075"
 
 # Document Structure
@@ -12,4 +26,44 @@ SECTION_SUMMARY = "Summary"
 
 # Document Formatting
 DATE_FORMAT = "%Y-%m-%d"
-TIMESTAMP_FORMAT = "%Y-%m-%d %H:%M:%S" 
\ No newline at end of file
+TIMESTAMP_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+# Local Storage
+DEFAULT_STORAGE_PATH = "~/daily_digest_data"
+ANALYSIS_FILENAME_FORMAT = "analysis_{date}_{tenant}.json"
+
+# Precomputation
+# Precomputing spends LLM calls on digests that may never be pasted, so both
+# triggers are off unless configured
+DEFAULT_PRECOMPUTE_SCHEDULE = ""  # Comma-separated HH:MM times
+DEFAULT_PRECOMPUTE_AFTER_ENTRIES = 0  # 0 disables count-based precompute
+SCHEDULER_TICK_SECONDS = 60
+
+# Background Work
+# Collecting a copied entry is abandoned after this
+BACKGROUND_TASK_DEADLINE_SECONDS = 120
+
+# Webpage Extraction
+FETCH_TIMEOUT_SECONDS = 15
+MAX_HTML_BYTES = 2_000_000  # Larger pages are truncated before parsing
+PARSE_TIMEOUT_SECONDS = 5
+PARSE_WORKERS = 2
+
+# Article Storage
+ARTICLES_TABLE_NAME = "Articles"  # Fields: Hash, URL, Title, Content
+ARTICLE_LOOKUP_BATCH = 20
+
+# Duplicate Detection
+DUPLICATE_INDEX_SIZE = 500  # Recent entries checked for near-duplicates
+
+# Per-Tenant State
+MAX_CACHED_TENANTS = 64
+
+# Context Requests
+# Also bounds staleness after midnight or after edits made in Airtable
+CONTEXT_CACHE_TTL_SECONDS = 60
+
+# HTTP Clients
+HTTP_TIMEOUT_SECONDS = 30
+HTTP_MAX_RETRIES = 3
+HTTP_BACKOFF_SECONDS = 0.5
@@ -1,9 +1,8 @@
 import logging
-from typing import Any, Dict, Optional, List
+from typing import Any, Dict, Optional, List, Set, cast
 import json
 from datetime import datetime
 import aiohttp
-from bs4 import BeautifulSoup
 
 from tabtabtab_lib.extension_interface import (
     ExtensionInterface,
@@ -16,150 +15,273 @@ from tabtabtab_lib.extension_interface import (
 )
 from tabtabtab_lib.llm import LLMModel
 
+from extensions.context_cache import ContextCache
+from extensions.near_duplicate import NearDuplicateIndex
+from extensions.lifecycle import LifecycleMixin
+
+from . import config
+from .analysis_store import DigestAnalysis, fingerprint
+from .articles import article_hash
+from . import html_extract
+from .html_extract import parse_webpage
+from .http_client import HTTPError
+from .scheduler import DigestScheduler
+from .tenant import DigestConfig, TenantCache, TenantState
+
 logging.basicConfig(level=logging.INFO)
 log = logging.getLogger(__name__)
 
 class DigestEntry:
     """Represents a single entry in the daily digest."""
-    def __init__(self, url: str, title: str, content: str, timestamp: str):
+    def __init__(
+        self,
+        url: str,
+        title: str,
+        content: str,
+        timestamp: str,
+        article_hash: str = "",
+        copy_count: int = 1,
+        record_id: str = "",
+    ):
         self.url = url
         self.title = title
         self.content = content
         self.timestamp = timestamp
+        # Key of the scraped article body in the articles table, if any
+        self.article_hash = article_hash
+        # How many times (near-)identical text was copied
+        self.copy_count = copy_count
+        self.record_id = record_id
 
-    def to_dict(self) -> dict:
+    def to_dict(self) -> Dict[str, Any]:
         return {
             "url": self.url,
             "title": self.title,
             "content": self.content,
-            "timestamp": self.timestamp
+            "timestamp": self.timestamp,
+            "article_hash": self.article_hash,
+            "copy_count": self.copy_count,
+            "record_id": self.record_id,
         }
 
     @staticmethod
-    def from_dict(data: dict) -> 'DigestEntry':
+    def from_dict(data: Dict[str, Any]) -> 'DigestEntry':
         return DigestEntry(
             url=data.get("url", ""),
             title=data.get("title", ""),
             content=data.get("content", ""),
-            timestamp=data.get("timestamp", "")
+            timestamp=data.get("timestamp", ""),
+            article_hash=data.get("article_hash", ""),
+            copy_count=data.get("copy_count", 1),
+            record_id=data.get("record_id", ""),
         )
 
-class DailyDigestExtension(ExtensionInterface):
+
+class DailyDigestExtension(LifecycleMixin, ExtensionInterface):
     """
     An extension that collects and analyzes content you copy throughout the day.
     Stores content in Airtable and generates AI analysis.
+
+    Settings are read per request into a DigestConfig; anything derived from
+    credentials (connections, caches) lives in a TenantState from `self.tenants`,
+    so concurrent requests from different users never share them.
     """
 
+    # Handed to the new instance on a hot reload. The scheduler isn't: it calls
+    # back into the instance that created it.
+    TRANSFERABLE_STATE = ("tenants",)
+
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
-        self.airtable_api_key = None
-        self.airtable_base_id = None
-        self.airtable_table_name = None
-        self.custom_prompt = None
-        self.today_entries: List[DigestEntry] = []
-
-    async def _save_to_airtable(self, entry: DigestEntry) -> bool:
-        """Save an entry to Airtable."""
-        if not all([self.airtable_api_key, self.airtable_base_id, self.airtable_table_name]):
+        self.tenants = TenantCache()
+        self.scheduler = DigestScheduler(self._precompute_digest)
+        # Context answers per tenant, dropped when the tenant saves an entry
+        self.context_cache = ContextCache(
+            "daily_digest", ttl=config.CONTEXT_CACHE_TTL_SECONDS
+        )
+
+    async def close_resources(self) -> None:
+        """Stop precomputing, then close tenant connections and the parse workers."""
+        await super().close_resources()
+        self.scheduler.stop()
+        await self.tenants.close()
+        html_extract.shutdown()
+
+    async def _save_to_airtable(
+        self, tenant: TenantState, entry: DigestEntry
+    ) -> Optional[str]:
+        """Save an entry to Airtable and return its record ID."""
+        if not tenant.config.is_configured:
             log.error("Airtable credentials not configured")
-            return False
+            return None
 
-        url = f"https://api.airtable.com/v0/{self.airtable_base_id}/{self.airtable_table_name}"
-        headers = {
-            "Authorization": f"Bearer {self.airtable_api_key}",
-            "Content-Type": "application/json"
-        }
-        
         # Format data for Airtable
-        data = {
-            "records": [{
-                "fields": {
-                    "URL": entry.url,
-                    "Title": entry.title,
-                    "Content": entry.content,
-                    "Timestamp": entry.timestamp,
-                    "Date": entry.timestamp.split('T')[0]  # Extract date for easier filtering
-                }
-            }]
+        fields = {
+            "URL": entry.url,
+            "Title": entry.title,
+            "Content": entry.content,
+            "Timestamp": entry.timestamp,
+            "Date": entry.timestamp.split("T")[0],  # Extract date for easier filtering
         }
+        if entry.article_hash and "Article" not in tenant.missing_fields:
+            fields["Article"] = entry.article_hash
 
         try:
-            async with aiohttp.ClientSession() as session:
-                async with session.post(url, headers=headers, json=data) as response:
-                    if response.status == 200:
-                        log.info(f"Successfully saved entry to Airtable")
-                        return True
-                    else:
-                        log.error(f"Failed to save to Airtable: {response.status}")
-                        return False
+            try:
+                records = await tenant.airtable.create_records([fields])
+            except HTTPError as e:
+                if not (e.is_unknown_field and "Article" in fields):
+                    raise
+                self._warn_missing_field(tenant, "Article")
+                del fields["Article"]
+                records = await tenant.airtable.create_records([fields])
+            log.info(f"Successfully saved entry to Airtable")
+            return records[0].get("id", "") if records else ""
         except Exception as e:
             log.error(f"Error saving to Airtable: {e}")
+            return None
+
+    async def _update_copy_count(
+        self, tenant: TenantState, record_id: str, copy_count: int
+    ) -> bool:
+        """Record a repeated copy on an existing entry instead of storing it again."""
+        if (
+            not record_id
+            or not tenant.config.is_configured
+            or "CopyCount" in tenant.missing_fields
+        ):
+            return False
+
+        try:
+            await tenant.airtable.update_records({record_id: {"CopyCount": copy_count}})
+            return True
+        except HTTPError as e:
+            if not e.is_unknown_field:
+                log.error(f"Error updating copy count in Airtable: {e}")
+            else:
+                self._warn_missing_field(tenant, "CopyCount")
+            return False
+        except Exception as e:
+            log.error(f"Error updating copy count in Airtable: {e}")
             return False
 
-    async def _load_todays_entries(self) -> List[DigestEntry]:
+    @staticmethod
+    def _warn_missing_field(tenant: TenantState, field: str) -> None:
+        """Stop sending an optional field the entries table doesn't have."""
+        tenant.missing_fields.add(field)
+        log.warning(
+            f"Airtable table '{tenant.config.airtable_table_name}' has no '{field}' "
+            "field; storing entries without it. See the Daily Digest README to add it."
+        )
+
+    async def _load_todays_entries(self, tenant: TenantState) -> List[DigestEntry]:
         """Load today's entries from Airtable."""
-        if not all([self.airtable_api_key, self.airtable_base_id, self.airtable_table_name]):
+        if not tenant.config.is_configured:
             log.error("Airtable credentials not configured")
             return []
 
         today = datetime.now().strftime("%Y-%m-%d")
-        url = f"https://api.airtable.com/v0/{self.airtable_base_id}/{self.airtable_table_name}"
-        headers = {
-            "Authorization": f"Bearer {self.airtable_api_key}",
-        }
-        params = {
-            "filterByFormula": f"Date = '{today}'"
-        }
 
         try:
-            async with aiohttp.ClientSession() as session:
-                async with session.get(url, headers=headers, params=params) as response:
-                    if response.status == 200:
-                        data = await response.json()
-                        entries = []
-                        for record in data.get("records", []):
-                            fields = record.get("fields", {})
-                            entry = DigestEntry(
-                                url=fields.get("URL", ""),
-                                title=fields.get("Title", ""),
-                                content=fields.get("Content", ""),
-                                timestamp=fields.get("Timestamp", "")
-                            )
-                            entries.append(entry)
-                        return entries
-                    else:
-                        log.error(f"Failed to load from Airtable: {response.status}")
-                        return []
+            records = await tenant.airtable.list_records(formula=f"Date = '{today}'")
+
+            entries = []
+            for record in records:
+                fields = record.get("fields", {})
+                entry = DigestEntry(
+                    url=fields.get("URL", ""),
+                    title=fields.get("Title", ""),
+                    content=fields.get("Content", ""),
+                    timestamp=fields.get("Timestamp", ""),
+                    article_hash=fields.get("Article", ""),
+                    copy_count=fields.get("CopyCount") or 1,
+                    record_id=record.get("id", ""),
+                )
+                entries.append(entry)
+            # Let copies from other devices or earlier runs count as duplicates
+            for entry in entries:
+                if entry.record_id:
+                    tenant.duplicates.add(
+                        entry.record_id, entry.content, entry.copy_count
+                    )
+            return entries
         except Exception as e:
             log.error(f"Error loading from Airtable: {e}")
             return []
 
+    async def _save_article(
+        self, tenant: TenantState, key: str, url: str, title: str, content: str
+    ) -> bool:
+        """Store an article body once; copies from the same page reference it by key."""
+        if key in tenant.articles:
+            return True
+        if not tenant.config.is_configured:
+            log.error("Airtable credentials not configured")
+            return False
+
+        table = tenant.config.airtable_articles_table_name
+
+        try:
+            existing = await tenant.airtable.list_records(
+                table, formula=f"{{Hash}} = '{key}'", max_records=1
+            )
+            if not existing:
+                await tenant.airtable.create_records(
+                    [{"Hash": key, "URL": url, "Title": title, "Content": content}],
+                    table,
+                )
+                log.info(f"Stored article {key} in Airtable")
+            tenant.articles.put(key, content)
+            return True
+        except Exception as e:
+            log.error(f"Error saving article to Airtable: {e}")
+            return False
+
+    async def _load_articles(
+        self, tenant: TenantState, keys: List[str]
+    ) -> Dict[str, str]:
+        """Load article bodies by key, fetching only those not cached."""
+        articles = tenant.articles.get_many(keys)
+        missing = [key for key in keys if key not in articles]
+        if not missing or not tenant.config.is_configured:
+            return articles
+
+        try:
+            for i in range(0, len(missing), config.ARTICLE_LOOKUP_BATCH):
+                batch = missing[i : i + config.ARTICLE_LOOKUP_BATCH]
+                formula = ",".join(f"{{Hash}} = '{key}'" for key in batch)
+                records = await tenant.airtable.list_records(
+                    tenant.config.airtable_articles_table_name, formula=f"OR({formula})"
+                )
+                for record in records:
+                    fields = record.get("fields", {})
+                    key = fields.get("Hash", "")
+                    if key:
+                        articles[key] = fields.get("Content", "")
+                        tenant.articles.put(key, articles[key])
+        except Exception as e:
+            log.error(f"Error loading articles from Airtable: {e}")
+        return articles
+
     async def _extract_webpage_info(self, url: str) -> tuple[str, str]:
         """Extract title and main content from a webpage."""
         try:
-            async with aiohttp.ClientSession() as session:
+            timeout = aiohttp.ClientTimeout(total=config.FETCH_TIMEOUT_SECONDS)
+            async with aiohttp.ClientSession(timeout=timeout) as session:
                 async with session.get(url) as response:
                     if response.status == 200:
-                        html = await response.text()
-                        soup = BeautifulSoup(html, 'html.parser')
-                        
-                        # Get title
-                        title = soup.title.string if soup.title else url
-                        
-                        # Try to get main content
-                        content = ""
-                        for p in soup.find_all('p'):
-                            content += p.get_text() + "\n"
-                        
-                        return title, content
+                        raw = await response.content.read(config.MAX_HTML_BYTES)
+                        html = raw.decode(response.charset or "utf-8", errors="ignore")
+                        return await parse_webpage(html, url)
         except Exception as e:
             log.error(f"Error extracting webpage info: {e}")
-        
+
         return url, ""
 
     async def on_copy(self, context: Dict[str, Any]) -> CopyResponse:
         """
         When content is copied, store it in Airtable.
+        Fetching the page and saving run in the background.
         """
         log.info(f"[{self.extension_id}] on_copy called")
 
@@ -167,13 +289,12 @@ class DailyDigestExtension(ExtensionInterface):
         request_id = context.get("request_id")
         window_info = context.get("window_info", {})
         selected_text = context.get("selected_text", "")
-        
+
         # Get Airtable credentials from dependencies
         dependencies = context.get("dependencies", {})
-        self.airtable_api_key = dependencies.get("airtable_api_key")
-        self.airtable_base_id = dependencies.get("airtable_base_id")
-        self.airtable_table_name = dependencies.get("airtable_table_name")
-        
+        digest_config = DigestConfig.from_dependencies(dependencies)
+        self.scheduler.register(digest_config.tenant_key, dependencies)
+
         if not selected_text:
             return CopyResponse(
                 notification=Notification(
@@ -187,49 +308,127 @@ class DailyDigestExtension(ExtensionInterface):
 
         # Get URL and extract webpage info if available
         url = window_info.get("accessibilityData", {}).get("browser_url", "")
+
+        self.tasks.submit(
+            self._collect_entry(
+                digest_config, selected_text, url, device_id, request_id
+            ),
+            device_id=device_id,
+            deadline=config.BACKGROUND_TASK_DEADLINE_SECONDS,
+        )
+
+        return CopyResponse(
+            notification=Notification(
+                request_id=request_id,
+                title="Daily Digest",
+                detail="Adding to digest...",
+                content="",
+                status=NotificationStatus.PENDING,
+            )
+        )
+
+    async def _collect_entry(
+        self,
+        digest_config: DigestConfig,
+        selected_text: str,
+        url: str,
+        device_id: Optional[str],
+        request_id: Optional[str],
+    ) -> None:
+        """Background job for a copy; holds the tenant's state until it is done."""
+        with self.tenants.lease(digest_config) as tenant:
+            await self._store_entry(tenant, selected_text, url, device_id, request_id)
+
+    async def _store_entry(
+        self,
+        tenant: TenantState,
+        selected_text: str,
+        url: str,
+        device_id: Optional[str],
+        request_id: Optional[str],
+    ) -> None:
+        """Fetch page context, save the entry and report the result."""
+        # A near-duplicate of a recent copy is counted on the existing entry
+        match = tenant.duplicates.find(selected_text)
+        if match:
+            copy_count = tenant.duplicates.record_hit(match.key)
+            await self._update_copy_count(tenant, match.key, copy_count)
+            await self._notify(
+                device_id,
+                Notification(
+                    request_id=request_id,
+                    title="Daily Digest",
+                    detail=f"Already in digest (copied {copy_count} times)",
+                    content="",
+                    status=NotificationStatus.READY,
+                ),
+            )
+            return
+
         title = ""
         content = selected_text
+        key = ""
 
         if url:
             title, webpage_content = await self._extract_webpage_info(url)
             if webpage_content:
-                content = f"{selected_text}\n\nContext from article:\n{webpage_content}"
+                key = article_hash(url, webpage_content)
+                if not await self._save_article(
+                    tenant, key, url, title, webpage_content
+                ):
+                    # Fall back to inlining the article into the entry
+                    key = ""
+                    content = (
+                        f"{selected_text}\n\nContext from article:\n{webpage_content}"
+                    )
 
         # Create new entry
         entry = DigestEntry(
             url=url,
             title=title,
             content=content,
-            timestamp=datetime.now().isoformat()
+            timestamp=datetime.now().isoformat(),
+            article_hash=key,
         )
-        
-        # Save to Airtable
-        success = await self._save_to_airtable(entry)
 
-        if not success:
-            return CopyResponse(
-                notification=Notification(
-                    request_id=request_id,
-                    title="Daily Digest",
-                    detail="Failed to save to Airtable",
-                    content="",
-                    status=NotificationStatus.ERROR,
-                )
-            )
-
-        return CopyResponse(
-            notification=Notification(
+        # Save to Airtable
+        record_id = await self._save_to_airtable(tenant, entry)
+
+        if record_id is not None:
+            self.context_cache.invalidate(tenant.config.cache_key)
+            if record_id:
+                tenant.duplicates.add(record_id, selected_text)
+            self.scheduler.record_entry(tenant.config.tenant_key)
+            notification = Notification(
                 request_id=request_id,
                 title="Daily Digest",
                 detail=f"Added to digest: {title or 'New entry'}",
                 content="",
                 status=NotificationStatus.READY,
             )
-        )
+        else:
+            notification = Notification(
+                request_id=request_id,
+                title="Daily Digest",
+                detail="Failed to save to Airtable",
+                content="",
+                status=NotificationStatus.ERROR,
+            )
+
+        await self._notify(device_id, notification)
+
+    async def _notify(self, device_id: Optional[str], notification: Notification) -> None:
+        try:
+            await self.send_push_notification(
+                device_id=device_id, notification=notification
+            )
+        except Exception as e:
+            log.error(f"Failed to send digest notification: {e}")
 
     async def on_paste(self, context: Dict[str, Any]) -> PasteResponse:
         """
         Generate an AI analysis of today's collected content.
+        Returns the precomputed digest at once when one is available.
         """
         log.info(f"[{self.extension_id}] on_paste called")
 
@@ -239,13 +438,48 @@ class DailyDigestExtension(ExtensionInterface):
 
         # Get dependencies
         dependencies = context.get("dependencies", {})
-        self.airtable_api_key = dependencies.get("airtable_api_key")
-        self.airtable_base_id = dependencies.get("airtable_base_id")
-        self.airtable_table_name = dependencies.get("airtable_table_name")
-        self.custom_prompt = dependencies.get("daily_digest_prompt")
+        digest_config = DigestConfig.from_dependencies(dependencies)
+        self.scheduler.register(digest_config.tenant_key, dependencies)
+        with self.tenants.lease(digest_config) as tenant:
+            return await self._paste_digest(tenant, digest_config, request_id)
+
+    async def _paste_digest(
+        self,
+        tenant: TenantState,
+        digest_config: DigestConfig,
+        request_id: Optional[str],
+    ) -> PasteResponse:
+        """Serve the stored digest if it is current, generating it otherwise."""
+        tenant_key = digest_config.tenant_key
+
+        # Fast path: serve the precomputed digest, refreshing it in the background
+        # if entries were copied since it was generated. Without precomputation
+        # configured, a stale digest is brought up to date now instead.
+        stored = tenant.analysis_store.load(
+            datetime.now().strftime("%Y-%m-%d"), tenant_key
+        )
+        pending = self.scheduler.pending_entries(tenant_key)
+        if (
+            stored
+            and stored.prompt_hash == fingerprint(digest_config.prompt)
+            and self.scheduler.is_fresh_since(tenant_key, stored.generated_at)
+            and (not pending or self.scheduler.precompute_enabled(tenant_key))
+        ):
+            if pending:
+                self.scheduler.trigger(tenant_key)
+            return PasteResponse(
+                paste=Notification(
+                    request_id=request_id,
+                    title="Daily Digest",
+                    detail=self._freshness(stored, pending),
+                    content=stored.analysis,
+                    status=NotificationStatus.READY,
+                )
+            )
 
         # Load today's entries from Airtable
-        entries = await self._load_todays_entries()
+        covered = self.scheduler.pending_entries(tenant_key)
+        entries = await self._load_todays_entries(tenant)
 
         if not entries:
             return PasteResponse(
@@ -258,40 +492,20 @@ class DailyDigestExtension(ExtensionInterface):
                 )
             )
 
-        # Prepare content for analysis
-        content_for_analysis = "\n\n---\n\n".join([
-            f"Title: {entry.title}\nURL: {entry.url}\nTime: {entry.timestamp}\n\nContent:\n{entry.content}"
-            for entry in entries
-        ])
-
-        # Default prompt if none provided
-        if not self.custom_prompt:
-            self.custom_prompt = """
-            You are an intelligent content analyzer. Review the collected content and:
-            1. Identify key themes and insights
-            2. Highlight the most important points
-            3. Suggest connections between different pieces
-            4. Note any action items or follow-ups
-            
-            Format your response in a clear, organized way.
-            """
-
         try:
-            # Use LLM to analyze content
-            analysis = await self.llm_processor.process(
-                system_prompt=self.custom_prompt,
-                message=f"Analyze the following collected content:\n\n{content_for_analysis}",
-                contexts=[],
-                model=LLMModel.GEMINI_FLASH,
-            )
+            digest = await self._update_digest(tenant, digest_config.prompt, entries)
+            if digest:
+                self.scheduler.mark_computed(tenant_key, covered)
 
             return PasteResponse(
                 paste=Notification(
                     request_id=request_id,
                     title="Daily Digest",
                     detail="Generated digest analysis",
-                    content=analysis or "Error generating analysis",
-                    status=NotificationStatus.READY if analysis else NotificationStatus.ERROR,
+                    content=digest.analysis if digest else "Error generating analysis",
+                    status=(
+                        NotificationStatus.READY if digest else NotificationStatus.ERROR
+                    ),
                 )
             )
 
@@ -307,6 +521,163 @@ class DailyDigestExtension(ExtensionInterface):
                 )
             )
 
+    @staticmethod
+    def _freshness(digest: DigestAnalysis, pending: int) -> str:
+        """Describe how current a stored digest is."""
+        try:
+            as_of = datetime.fromisoformat(digest.generated_at).strftime("%H:%M")
+        except ValueError:
+            as_of = "earlier today"
+        detail = f"Digest as of {as_of}"
+        if pending:
+            detail += (
+                f" ({pending} newer entr{'y' if pending == 1 else 'ies'} being added)"
+            )
+        return detail
+
+    async def _precompute_digest(self, dependencies: Dict[str, Any]) -> bool:
+        """Scheduler callback: bring the stored digest up to date."""
+        digest_config = DigestConfig.from_dependencies(dependencies)
+        with self.tenants.lease(digest_config) as tenant:
+            entries = await self._load_todays_entries(tenant)
+            if not entries:
+                return False
+            digest = await self._update_digest(tenant, digest_config.prompt, entries)
+            return digest is not None
+
+    async def _update_digest(
+        self, tenant: TenantState, prompt: str, entries: List[DigestEntry]
+    ) -> Optional[DigestAnalysis]:
+        """
+        Bring the stored analysis for today up to date with `entries`, analyzing
+        only the entries newer than its watermark, and store the result.
+        """
+        today = datetime.now().strftime("%Y-%m-%d")
+        tenant_key = tenant.config.tenant_key
+        prompt_hash = fingerprint(prompt)
+
+        # Reuse the last analysis if it was made with the same prompt and
+        # still covers exactly the entries below its watermark.
+        previous = tenant.analysis_store.load(today, tenant_key)
+        new_entries = entries
+        if previous and previous.prompt_hash == prompt_hash:
+            new_entries = [e for e in entries if e.timestamp > previous.watermark]
+            if len(entries) - len(new_entries) != previous.entry_count:
+                log.info(f"[{self.extension_id}] Stored analysis is stale, rebuilding")
+                previous = None
+                new_entries = entries
+        else:
+            previous = None
+
+        if previous and not new_entries:
+            log.info(f"[{self.extension_id}] No new entries since last digest")
+            return previous
+
+        # Articles referenced by older entries are already reflected in `previous`
+        covered_articles = set()
+        if previous:
+            covered_articles = {
+                e.article_hash for e in entries if e.timestamp <= previous.watermark
+            }
+        analysis = await self._generate_analysis(
+            tenant, prompt, new_entries, previous, covered_articles
+        )
+        if not analysis:
+            return None
+
+        digest = DigestAnalysis(
+            date=today,
+            prompt_hash=prompt_hash,
+            watermark=max(entry.timestamp for entry in entries),
+            entry_count=len(entries),
+            analysis=analysis,
+            generated_at=datetime.now().isoformat(),
+        )
+        tenant.analysis_store.save(digest, tenant_key)
+        return digest
+
+    async def _generate_analysis(
+        self,
+        tenant: TenantState,
+        prompt: str,
+        entries: List[DigestEntry],
+        previous: Optional[DigestAnalysis] = None,
+        covered_articles: Optional[Set[str]] = None,
+    ) -> Optional[str]:
+        """
+        Analyze `entries`, merging them into `previous` when given. Each
+        referenced article is included once, after the entries citing it.
+        """
+        covered_articles = covered_articles or set()
+        entries = self._collapse_duplicates(entries)
+        keys = list(
+            dict.fromkeys(
+                e.article_hash
+                for e in entries
+                if e.article_hash and e.article_hash not in covered_articles
+            )
+        )
+        articles = await self._load_articles(tenant, keys)
+
+        def describe(entry: DigestEntry) -> str:
+            text = (
+                f"Title: {entry.title}\nURL: {entry.url}\nTime: {entry.timestamp}"
+                f"\n\nContent:\n{entry.content}"
+            )
+            if entry.copy_count > 1:
+                text += f"\n\n(Copied {entry.copy_count} times)"
+            if entry.article_hash:
+                text += f"\n\nFrom article: [{entry.article_hash[:8]}]"
+            return text
+
+        content_for_analysis = "\n\n---\n\n".join(
+            [describe(entry) for entry in entries]
+        )
+        if articles:
+            content_for_analysis += (
+                "\n\n===\n\nArticles referenced above:\n\n"
+                + "\n\n---\n\n".join(
+                    f"[{key[:8]}]\n{body}" for key, body in articles.items()
+                )
+            )
+
+        if previous:
+            message = (
+                f"Here is your earlier analysis of today's collected content:\n\n"
+                f"{previous.analysis}\n\n"
+                f"Update it to incorporate the following newly collected content "
+                f"and return the complete, updated analysis:\n\n{content_for_analysis}"
+            )
+        else:
+            message = (
+                f"Analyze the following collected content:\n\n{content_for_analysis}"
+            )
+
+        analysis = await self.llm_processor.process(
+            system_prompt=prompt,
+            message=message,
+            contexts=[],
+            model=LLMModel.GEMINI_FLASH,
+        )
+        return cast(Optional[str], analysis)
+
+    @staticmethod
+    def _collapse_duplicates(entries: List[DigestEntry]) -> List[DigestEntry]:
+        """Merge near-duplicate entries, keeping the first and summing copy counts."""
+        # Keyed by position in `kept`
+        index: NearDuplicateIndex[int] = NearDuplicateIndex(
+            max_entries=len(entries) or 1
+        )
+        kept: List[DigestEntry] = []
+        for entry in entries:
+            match = index.find(entry.content)
+            if match:
+                kept[match.key].copy_count += entry.copy_count
+                continue
+            index.add(len(kept), entry.content)
+            kept.append(DigestEntry.from_dict(entry.to_dict()))
+        return kept
+
     async def on_context_request(
         self, source_extension_id: str, context_query: Dict[str, Any]
     ) -> OnContextResponse:
@@ -315,8 +686,20 @@ class DailyDigestExtension(ExtensionInterface):
         """
         log.info(f"[{self.extension_id}] Received context request from '{source_extension_id}'")
 
-        # Load today's entries from Airtable
-        entries = await self._load_todays_entries()
+        digest_config = DigestConfig.from_dependencies(
+            context_query.get("dependencies", {})
+        )
+        return await self.context_cache.get_or_compute(
+            source_extension_id,
+            context_query,
+            lambda: self._build_context(digest_config),
+            scope=digest_config.cache_key,
+        )
+
+    async def _build_context(self, digest_config: DigestConfig) -> OnContextResponse:
+        """Summarize today's entries from Airtable."""
+        with self.tenants.lease(digest_config) as tenant:
+            entries = await self._load_todays_entries(tenant)
 
         digest_info = {
             "entry_count": len(entries),
@@ -327,8 +710,7 @@ class DailyDigestExtension(ExtensionInterface):
         return OnContextResponse(
             contexts=[
                 OnContextResponse.ExtensionContext(
-                    description="daily_digest_info",
-                    context=json.dumps(digest_info)
+                    description="daily_digest_info", context=json.dumps(digest_info)
                 )
             ]
-        ) 
\ No newline at end of file
+        )
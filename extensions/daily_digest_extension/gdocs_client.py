@@ -1,41 +1,53 @@
 """Google Docs client for the Daily Digest Extension."""
 
-import requests
 from datetime import datetime
 from typing import Dict, Any, Optional, List
 
+import aiohttp
+
 from . import config
+from .http_client import PooledClient, RateLimiter
+
 
-class GoogleDocsClient:
-    def __init__(self, mcp_url: Optional[str] = None):
+class GoogleDocsClient(PooledClient):
+    def __init__(
+        self,
+        mcp_url: Optional[str] = None,
+        session: Optional[aiohttp.ClientSession] = None,
+    ):
         """Initialize the Google Docs client.
-        
+
         Args:
             mcp_url: Optional MCP URL. If not provided, uses the one from config.
+            session: Optional shared session; one is created on first use otherwise.
         """
+        super().__init__(
+            headers={"Content-Type": "application/json"},
+            limiter=RateLimiter(config.GDOCS_REQUESTS_PER_SECOND),
+            session=session,
+        )
         self.mcp_url = mcp_url or config.GDOCS_MCP_URL
-        self.headers = {
-            "Content-Type": "application/json"
-        }
-    
-    def create_entry(self, title: str, content: str, source_url: str, summary: str) -> Dict[str, Any]:
+
+    async def create_entry(
+        self, title: str, content: str, source_url: str, summary: str
+    ) -> Dict[str, Any]:
         """Create a new entry in the Google Doc.
-        
+
         Args:
             title: The title of the digest entry
             content: The content of the digest entry
             source_url: The source URL of the content
             summary: A summary of the content
-            
+
         Returns:
             The response from the MCP
-            
+
         Raises:
-            requests.exceptions.RequestException: If the API request fails
+            HTTPError: If the API request fails
         """
         timestamp = datetime.now().strftime(config.TIMESTAMP_FORMAT)
         date = datetime.now().strftime(config.DATE_FORMAT)
-        
+
         data = {
             "content": [
                 {
@@ -68,35 +80,33 @@ class GoogleDocsClient:
                 }
             ]
         }
-        
-        response = requests.post(
-            self.mcp_url,
-            headers=self.headers,
-            json=data
-        )
-        response.raise_for_status()
-        return response.json()
-    
-    def get_entries(self, date: Optional[str] = None) -> List[Dict[str, Any]]:
-        """Retrieve entries from the Google Doc.
-        
+
+        return await self._request("POST", self.mcp_url, json=data)
+
+    async def get_entries(self, date: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Retrieve entries from the Google Doc, following `nextPageToken` pagination.
+
         Args:
             date: Optional date to filter entries by (YYYY-MM-DD format)
-            
+
         Returns:
             List of entries from the document
-            
+
         Raises:
-            requests.exceptions.RequestException: If the API request fails
+            HTTPError: If the API request fails
         """
         params = {}
         if date:
             params["date"] = date
-            
-        response = requests.get(
-            self.mcp_url,
-            headers=self.headers,
-            params=params
-        )
-        response.raise_for_status()
-        return response.json() 
\ No newline at end of file
+
+        entries: List[Dict[str, Any]] = []
+        while True:
+            data = await self._request("GET", self.mcp_url, params=params)
+            if isinstance(data, list):
+                entries.extend(data)
+                return entries
+            entries.extend(data.get("entries", []))
+            page_token = data.get("nextPageToken")
+            if not page_token:
+                return entries
+            params["pageToken"] = page_token
@@ -0,0 +1,123 @@
+"""Webpage parsing for the Daily Digest Extension, run in a worker process."""
+
+import asyncio
+import logging
+import signal
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Optional, Tuple
+
+# SoupStrainer is importable from bs4 in every version, but not declared an
+# export since 4.13
+from bs4 import BeautifulSoup, SoupStrainer  # type: ignore[attr-defined]
+
+from . import config
+
+try:
+    import lxml  # noqa: F401
+
+    HTML_PARSER = "lxml"
+except ImportError:
+    HTML_PARSER = "html.parser"
+
+log = logging.getLogger(__name__)
+
+_executor: Optional[ProcessPoolExecutor] = None
+
+# Extra time the caller waits for a worker to enforce its own deadline
+_DEADLINE_GRACE_SECONDS = 1.0
+
+
+class ParseTimeout(Exception):
+    """Raised in a worker whose parse ran past its deadline."""
+
+
+def extract_title_and_text(html: str, fallback_title: str) -> Tuple[str, str]:
+    """Return the page title and the text of its paragraphs."""
+    # Only build the nodes we read instead of the whole document tree
+    soup = BeautifulSoup(html, HTML_PARSER, parse_only=SoupStrainer(["title", "p"]))
+
+    title = soup.title.string if soup.title and soup.title.string else fallback_title
+    content = "\n".join(p.get_text() for p in soup.find_all("p"))
+    if content:
+        content += "\n"
+    return str(title), content
+
+
+def _parse_with_deadline(
+    html: str, fallback_title: str, timeout: float
+) -> Tuple[str, str]:
+    """
+    Run `extract_title_and_text` in a worker, interrupting it after `timeout`
+    seconds so a pathological page doesn't keep the worker busy.
+    """
+    if not hasattr(signal, "SIGALRM"):
+        return extract_title_and_text(html, fallback_title)
+
+    def expire(signum: int, frame: Any) -> None:
+        raise ParseTimeout(f"Parsing took longer than {timeout}s")
+
+    previous = signal.signal(signal.SIGALRM, expire)
+    signal.setitimer(signal.ITIMER_REAL, timeout)
+    try:
+        return extract_title_and_text(html, fallback_title)
+    finally:
+        signal.setitimer(signal.ITIMER_REAL, 0)
+        signal.signal(signal.SIGALRM, previous)
+
+
+def _get_executor() -> ProcessPoolExecutor:
+    global _executor
+    if _executor is None:
+        _executor = ProcessPoolExecutor(max_workers=config.PARSE_WORKERS)
+    return _executor
+
+
+async def parse_webpage(html: str, fallback_title: str) -> Tuple[str, str]:
+    """
+    Parse `html` in the worker pool so large pages don't block the event loop.
+    Input beyond MAX_HTML_BYTES characters is dropped and parsing is abandoned after
+    PARSE_TIMEOUT_SECONDS.
+    """
+    html = html[: config.MAX_HTML_BYTES]
+    loop = asyncio.get_running_loop()
+    try:
+        return await asyncio.wait_for(
+            loop.run_in_executor(
+                _get_executor(),
+                _parse_with_deadline,
+                html,
+                fallback_title,
+                config.PARSE_TIMEOUT_SECONDS,
+            ),
+            timeout=config.PARSE_TIMEOUT_SECONDS + _DEADLINE_GRACE_SECONDS,
+        )
+    except ParseTimeout:
+        log.warning(f"Parsing webpage timed out after {config.PARSE_TIMEOUT_SECONDS}s")
+    except asyncio.TimeoutError:
+        # The worker couldn't interrupt itself and is still parsing
+        log.warning(
+            f"Parsing webpage timed out after {config.PARSE_TIMEOUT_SECONDS}s; "
+            "restarting parse workers"
+        )
+        shutdown(terminate=True)
+    except Exception as e:
+        log.error(f"Error parsing webpage: {e}")
+    return fallback_title, ""
+
+
+def shutdown(terminate: bool = False) -> None:
+    """
+    Stop the worker pool; it is recreated on next use. Parses already queued
+    still run, since on a hot reload they may belong to the instance that
+    replaced the one stopping. With `terminate`, queued parses are cancelled
+    and workers still parsing are killed instead.
+    """
+    global _executor
+    if _executor is None:
+        return
+    executor, _executor = _executor, None
+    # ProcessPoolExecutor has no public way to stop a running task
+    workers = list(getattr(executor, "_processes", {}).values()) if terminate else []
+    executor.shutdown(wait=False, cancel_futures=terminate)
+    for worker in workers:
+        worker.terminate()
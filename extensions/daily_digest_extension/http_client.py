@@ -0,0 +1,159 @@
+"""Shared async HTTP plumbing for the Daily Digest clients."""
+
+import asyncio
+import logging
+import random
+from types import TracebackType
+from typing import Any, Dict, Optional, Type, TypeVar
+
+import aiohttp
+
+from . import config
+
+log = logging.getLogger(__name__)
+
+RETRYABLE_STATUSES = {429, 500, 502, 503, 504}
+# Methods safe to send again after a failure whose outcome is unknown. Other
+# methods (POST) are retried only when the server can't have acted on them.
+RETRYABLE_METHODS = {"GET", "PATCH", "DELETE"}
+
+
+class HTTPError(Exception):
+    """Raised on a non-retryable status, or when a request runs out of retries."""
+
+    def __init__(self, status: int, message: str):
+        super().__init__(f"HTTP {status}: {message}")
+        self.status = status
+        self.message = message
+
+    @property
+    def is_unknown_field(self) -> bool:
+        """True if Airtable rejected the request for naming a missing field."""
+        return self.status == 422 and "UNKNOWN_FIELD_NAME" in self.message
+
+
+class RateLimiter:
+    """Token bucket allowing `rate` requests per second with bursts up to `burst`."""
+
+    def __init__(self, rate: float, burst: Optional[int] = None):
+        self.rate = rate
+        self.burst = burst or max(1, int(rate))
+        self._tokens = float(self.burst)
+        self._updated: Optional[float] = None
+        self._lock = asyncio.Lock()
+
+    async def acquire(self) -> None:
+        async with self._lock:
+            loop = asyncio.get_running_loop()
+            now = loop.time()
+            if self._updated is not None:
+                self._tokens = min(
+                    self.burst, self._tokens + (now - self._updated) * self.rate
+                )
+            self._updated = now
+            if self._tokens < 1:
+                await asyncio.sleep((1 - self._tokens) / self.rate)
+                self._updated = loop.time()
+                self._tokens = 1
+            self._tokens -= 1
+
+
+ClientT = TypeVar("ClientT", bound="PooledClient")
+
+
+class PooledClient:
+    """
+    Base for clients that share one aiohttp session, retry transient failures
+    with exponential backoff and optionally pace requests with a RateLimiter.
+    POSTs are retried only when they can't have been processed, so a retry
+    never creates a record twice.
+    """
+
+    def __init__(
+        self,
+        headers: Optional[Dict[str, str]] = None,
+        limiter: Optional[RateLimiter] = None,
+        session: Optional[aiohttp.ClientSession] = None,
+    ):
+        self.headers = headers or {}
+        self.limiter = limiter
+        self._session = session
+        self._owns_session = session is None
+
+    async def __aenter__(self: ClientT) -> ClientT:
+        return self
+
+    async def __aexit__(
+        self,
+        exc_type: Optional[Type[BaseException]],
+        exc_val: Optional[BaseException],
+        exc_tb: Optional[TracebackType],
+    ) -> bool:
+        await self.close()
+        return False
+
+    def _get_session(self) -> aiohttp.ClientSession:
+        if self._session is None or self._session.closed:
+            self._session = aiohttp.ClientSession(
+                headers=self.headers,
+                timeout=aiohttp.ClientTimeout(total=config.HTTP_TIMEOUT_SECONDS),
+            )
+            self._owns_session = True
+        return self._session
+
+    async def _request(
+        self,
+        method: str,
+        url: str,
+        params: Optional[Dict[str, Any]] = None,
+        json: Optional[Any] = None,
+    ) -> Any:
+        """Send a request and return its decoded JSON body ({} if empty)."""
+        attempt = 0
+        while True:
+            if self.limiter:
+                await self.limiter.acquire()
+            try:
+                async with self._get_session().request(
+                    method, url, params=params, json=json
+                ) as response:
+                    if response.status < 400:
+                        # A 204, or a delete answered with no body
+                        if not (await response.read()).strip():
+                            return {}
+                        return await response.json(content_type=None)
+                    message = await response.text()
+                    retry_after = response.headers.get("Retry-After")
+                    if response.status not in RETRYABLE_STATUSES:
+                        raise HTTPError(response.status, message)
+                    error: Exception = HTTPError(response.status, message)
+                    # Rate limited requests were rejected before being processed
+                    not_processed = response.status == 429
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                retry_after = None
+                error = e
+                # Failing to connect means nothing was sent
+                not_processed = isinstance(e, aiohttp.ClientConnectorError)
+
+            attempt += 1
+            retryable = method.upper() in RETRYABLE_METHODS or not_processed
+            if not retryable or attempt > config.HTTP_MAX_RETRIES:
+                raise error
+            delay = config.HTTP_BACKOFF_SECONDS * 2 ** (attempt - 1)
+            if retry_after and retry_after.isdigit():
+                delay = max(delay, float(retry_after))
+            delay += random.uniform(0, delay / 2)
+            log.warning(
+                f"{method} {url} failed ({error}); "
+                f"retry {attempt}/{config.HTTP_MAX_RETRIES} in {delay:.1f}s"
+            )
+            await asyncio.sleep(delay)
+
+    async def close(self) -> None:
+        if (
+            self._owns_session
+            and self._session is not None
+            and not self._session.closed
+        ):
+            await self._session.close()
+        self._session = None
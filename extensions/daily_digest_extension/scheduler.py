@@ -0,0 +1,156 @@
+"""Background digest precomputation for the Daily Digest Extension."""
+
+import asyncio
+import logging
+from datetime import datetime, time
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from . import config
+
+log = logging.getLogger(__name__)
+
+
+def parse_schedule(schedule: Optional[str]) -> List[time]:
+    """Parse a comma-separated list of `HH:MM` times, skipping invalid ones."""
+    times = []
+    for part in (schedule or "").split(","):
+        part = part.strip()
+        if not part:
+            continue
+        try:
+            times.append(datetime.strptime(part, "%H:%M").time())
+        except ValueError:
+            log.warning(f"Ignoring invalid digest schedule time: '{part}'")
+    return sorted(times)
+
+
+class TenantSchedule:
+    """Scheduling state for a single Airtable base/table."""
+
+    def __init__(self, dependencies: Dict[str, Any]):
+        self.dependencies = dependencies
+        self.times: List[time] = []
+        self.precompute_after = config.DEFAULT_PRECOMPUTE_AFTER_ENTRIES
+        # Entries copied in this process that no stored digest covers yet
+        self.pending_entries = 0
+        self.tracking_since = datetime.now()
+        self.last_scheduled_run = self.tracking_since
+        self.task: Optional["asyncio.Task[None]"] = None
+        self.update(dependencies)
+
+    def update(self, dependencies: Dict[str, Any]) -> None:
+        self.dependencies = dependencies
+        self.times = parse_schedule(
+            dependencies.get("daily_digest_schedule")
+            or config.DEFAULT_PRECOMPUTE_SCHEDULE
+        )
+        try:
+            self.precompute_after = int(
+                dependencies.get("daily_digest_precompute_after")
+                or config.DEFAULT_PRECOMPUTE_AFTER_ENTRIES
+            )
+        except (TypeError, ValueError):
+            self.precompute_after = config.DEFAULT_PRECOMPUTE_AFTER_ENTRIES
+
+    def is_due(self, now: datetime) -> bool:
+        """True if a scheduled time has passed since the last scheduled run."""
+        for scheduled in self.times:
+            slot = datetime.combine(now.date(), scheduled)
+            if self.last_scheduled_run < slot <= now:
+                return True
+        return False
+
+
+class DigestScheduler:
+    """
+    Precomputes digests off the paste path, at configured times of day or
+    once enough new entries have been copied.
+    """
+
+    def __init__(self, precompute: Callable[[Dict[str, Any]], Awaitable[bool]]):
+        self._precompute = precompute
+        self._tenants: Dict[str, TenantSchedule] = {}
+        self._loop_task: Optional["asyncio.Task[None]"] = None
+
+    def register(self, tenant: str, dependencies: Dict[str, Any]) -> None:
+        """Start (or refresh) scheduling for `tenant` with its latest dependencies."""
+        schedule = self._tenants.get(tenant)
+        if schedule:
+            schedule.update(dependencies)
+        else:
+            schedule = self._tenants[tenant] = TenantSchedule(dependencies)
+        # Count-based precompute needs no loop; only scheduled times do
+        if schedule.times and (self._loop_task is None or self._loop_task.done()):
+            self._loop_task = asyncio.create_task(self._run())
+
+    def record_entry(self, tenant: str) -> None:
+        """Count a newly stored entry and precompute once enough have piled up."""
+        schedule = self._tenants.get(tenant)
+        if not schedule:
+            return
+        schedule.pending_entries += 1
+        if 0 < schedule.precompute_after <= schedule.pending_entries:
+            self.trigger(tenant)
+
+    def precompute_enabled(self, tenant: str) -> bool:
+        """Whether `tenant` configured a schedule or an entry count to precompute at."""
+        schedule = self._tenants.get(tenant)
+        return bool(schedule and (schedule.times or schedule.precompute_after > 0))
+
+    def pending_entries(self, tenant: str) -> int:
+        schedule = self._tenants.get(tenant)
+        return schedule.pending_entries if schedule else 0
+
+    def is_fresh_since(self, tenant: str, generated_at: str) -> bool:
+        """
+        True if the pending entry count is exact for a digest generated at
+        `generated_at`, i.e. every copy since then was seen by this process.
+        """
+        schedule = self._tenants.get(tenant)
+        if not schedule or not generated_at:
+            return False
+        try:
+            return datetime.fromisoformat(generated_at) >= schedule.tracking_since
+        except ValueError:
+            return False
+
+    def mark_computed(self, tenant: str, covered_entries: int) -> None:
+        """Drop `covered_entries` from the pending count after a digest was stored."""
+        schedule = self._tenants.get(tenant)
+        if schedule:
+            schedule.pending_entries = max(
+                0, schedule.pending_entries - covered_entries
+            )
+
+    def trigger(self, tenant: str) -> None:
+        """Precompute the digest for `tenant` now, unless a run is in flight."""
+        schedule = self._tenants.get(tenant)
+        if not schedule or (schedule.task and not schedule.task.done()):
+            return
+        schedule.task = asyncio.create_task(self._precompute_tenant(tenant, schedule))
+
+    async def _precompute_tenant(self, tenant: str, schedule: TenantSchedule) -> None:
+        covered = schedule.pending_entries
+        try:
+            if await self._precompute(schedule.dependencies):
+                self.mark_computed(tenant, covered)
+                log.info(f"Precomputed daily digest ({covered} new entries)")
+        except Exception as e:
+            log.error(f"Error precomputing daily digest: {e}", exc_info=True)
+
+    async def _run(self) -> None:
+        while self._tenants:
+            now = datetime.now()
+            for tenant, schedule in list(self._tenants.items()):
+                if schedule.is_due(now):
+                    schedule.last_scheduled_run = now
+                    self.trigger(tenant)
+            await asyncio.sleep(config.SCHEDULER_TICK_SECONDS)
+
+    def stop(self) -> None:
+        """Cancel the scheduling loop and any precomputation in flight."""
+        if self._loop_task:
+            self._loop_task.cancel()
+        for schedule in self._tenants.values():
+            if schedule.task:
+                schedule.task.cancel()
@@ -0,0 +1,135 @@
+"""Request-scoped configuration and per-tenant state for the Daily Digest Extension."""
+
+import logging
+from typing import Any, ContextManager, Dict, Optional, Set
+
+from extensions.leased_cache import LeasedCache
+from extensions.near_duplicate import NearDuplicateIndex
+
+from . import config
+from .airtable_client import AirtableClient
+from .analysis_store import AnalysisStore, fingerprint
+from .articles import ArticleCache
+
+log = logging.getLogger(__name__)
+
+DEFAULT_DIGEST_PROMPT = """
+            You are an intelligent content analyzer. Review the collected content and:
+            1. Identify key themes and insights
+            2. Highlight the most important points
+            3. Suggest connections between different pieces
+            4. Note any action items or follow-ups
+
+            Format your response in a clear, organized way.
+            """
+
+
+class DigestConfig:
+    """Settings for a single request, read from its dependencies and never mutated."""
+
+    def __init__(
+        self,
+        airtable_api_key: Optional[str],
+        airtable_base_id: Optional[str],
+        airtable_table_name: Optional[str],
+        airtable_articles_table_name: str,
+        prompt: str,
+        storage_path: Optional[str],
+    ):
+        self.airtable_api_key = airtable_api_key
+        self.airtable_base_id = airtable_base_id
+        self.airtable_table_name = airtable_table_name
+        self.airtable_articles_table_name = airtable_articles_table_name
+        self.prompt = prompt
+        self.storage_path = storage_path
+
+    @staticmethod
+    def from_dependencies(dependencies: Dict[str, Any]) -> "DigestConfig":
+        return DigestConfig(
+            airtable_api_key=dependencies.get("airtable_api_key"),
+            airtable_base_id=dependencies.get("airtable_base_id"),
+            airtable_table_name=dependencies.get("airtable_table_name"),
+            airtable_articles_table_name=(
+                dependencies.get("airtable_articles_table_name")
+                or config.ARTICLES_TABLE_NAME
+            ),
+            prompt=dependencies.get("daily_digest_prompt") or DEFAULT_DIGEST_PROMPT,
+            storage_path=dependencies.get("daily_digest_storage_path"),
+        )
+
+    @property
+    def is_configured(self) -> bool:
+        return all(
+            [self.airtable_api_key, self.airtable_base_id, self.airtable_table_name]
+        )
+
+    @property
+    def tenant_key(self) -> str:
+        """Identifies whose data this is; used for stored analyses and scheduling."""
+        return f"{self.airtable_base_id}/{self.airtable_table_name}"
+
+    @property
+    def cache_key(self) -> str:
+        """Identifies everything per-tenant state depends on, credentials included."""
+        return fingerprint(
+            "\n".join(
+                str(value)
+                for value in (
+                    self.airtable_api_key,
+                    self.airtable_base_id,
+                    self.airtable_table_name,
+                    self.airtable_articles_table_name,
+                    self.storage_path,
+                )
+            )
+        )
+
+
+class TenantState:
+    """
+    State shared by every request made with the same credentials. Only the
+    credential fields of `config` may be relied on; request-specific settings
+    such as the prompt come from each request's own DigestConfig.
+    """
+
+    def __init__(self, digest_config: DigestConfig):
+        self.config = digest_config
+        # Only used once the config is complete; see DigestConfig.is_configured
+        self.airtable = AirtableClient(
+            api_key=digest_config.airtable_api_key or "",
+            base_id=digest_config.airtable_base_id or "",
+            table_name=digest_config.airtable_table_name,
+        )
+        self.articles = ArticleCache()
+        # Keyed by Airtable record id
+        self.duplicates: NearDuplicateIndex[str] = NearDuplicateIndex(
+            max_entries=config.DUPLICATE_INDEX_SIZE
+        )
+        self.analysis_store = AnalysisStore(digest_config.storage_path)
+        # Optional entry fields (Article, CopyCount) the table turned out to lack
+        self.missing_fields: Set[str] = set()
+
+    async def close(self) -> None:
+        await self.airtable.close()
+
+
+class TenantCache:
+    """
+    LRU cache of TenantState keyed by credentials. An evicted tenant's
+    connections are closed once the last request or job using it is done.
+    """
+
+    def __init__(self, max_tenants: int = config.MAX_CACHED_TENANTS):
+        self._tenants: LeasedCache[TenantState] = LeasedCache(
+            TenantState.close, max_entries=max_tenants, name="tenant state"
+        )
+
+    def lease(self, digest_config: DigestConfig) -> ContextManager[TenantState]:
+        """Use the state for `digest_config`'s credentials until the block exits."""
+        return self._tenants.lease(
+            digest_config.cache_key, lambda: TenantState(digest_config)
+        )
+
+    async def close(self) -> None:
+        """Close every cached tenant's connections."""
+        await self._tenants.close()
@@ -0,0 +1,231 @@
+"""In-memory index over the fashion collection."""
+
+import bisect
+from collections import Counter, OrderedDict
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+DEFAULT_CATEGORY = "uncategorized"
+
+
+class FashionItem:
+    """A saved fashion item. Unknown fields are kept in `extra`, unchanged."""
+
+    __slots__ = (
+        "id",
+        "title",
+        "category",
+        "description",
+        "price",
+        "source",
+        "date_added",
+        "has_image",
+        "image_path",
+        "image_hash",
+        "thumbnail_path",
+        "notes",
+        "needs_details",
+        "version",
+        "extra",
+    )
+
+    FIELDS = __slots__[:-1]
+
+    def __init__(
+        self,
+        id: str,
+        title: str = "Untitled fashion item",
+        category: Optional[str] = None,
+        description: str = "",
+        price: Optional[str] = None,
+        source: Optional[str] = None,
+        date_added: str = "",
+        has_image: bool = False,
+        image_path: Optional[str] = None,
+        image_hash: Optional[str] = None,
+        thumbnail_path: Optional[str] = None,
+        notes: Optional[str] = None,
+        needs_details: Optional[bool] = None,
+        version: Optional[int] = None,
+        extra: Optional[Dict[str, Any]] = None,
+    ):
+        self.id = id
+        self.title = title
+        self.category = category
+        self.description = description
+        self.price = price
+        self.source = source
+        self.date_added = date_added
+        self.has_image = has_image
+        self.image_path = image_path
+        self.image_hash = image_hash
+        self.thumbnail_path = thumbnail_path
+        self.notes = notes
+        self.needs_details = needs_details
+        # Collection version at which this item was added or last changed
+        self.version = version
+        self.extra = extra or {}
+
+    @property
+    def category_key(self) -> str:
+        return self.category if self.category is not None else DEFAULT_CATEGORY
+
+    def to_dict(self) -> Dict[str, Any]:
+        data = dict(self.extra)
+        for field in self.FIELDS:
+            value = getattr(self, field)
+            if value is not None:
+                data[field] = value
+        return data
+
+    @staticmethod
+    def from_dict(data: Dict[str, Any]) -> "FashionItem":
+        known = {k: v for k, v in data.items() if k in FashionItem.FIELDS}
+        extra = {k: v for k, v in data.items() if k not in FashionItem.FIELDS}
+        known.setdefault("id", "")
+        return FashionItem(**known, extra=extra)
+
+    def update(self, fields: Dict[str, Any]) -> None:
+        for key, value in fields.items():
+            if key in self.FIELDS:
+                setattr(self, key, value)
+            else:
+                self.extra[key] = value
+
+
+class FashionCollection:
+    """
+    Fashion items indexed by id, by date added and by last change, with
+    per-category counts kept up to date as items change. Lookups are O(1),
+    "last N", page and "changes since" views are O(k), and stats cost only the
+    number of categories.
+
+    Every add or update bumps `version` and stamps the item with it, so
+    clients holding version V can ask for just the items changed after V.
+    """
+
+    def __init__(self, items: Iterable[FashionItem] = ()):
+        self._by_id: Dict[str, FashionItem] = {}
+        # Ids and sort keys in date-added order. Items are never removed and new
+        # ones land at the end, so positions double as page cursors
+        self._order: List[str] = []
+        self._keys: List[Tuple[str, int]] = []
+        self._sequence = 0
+        self._categories: "Counter[str]" = Counter()
+        self.version = 0
+        # Ids ordered by the version at which each item last changed
+        self._changes: "OrderedDict[str, None]" = OrderedDict()
+        for item in items:
+            self.add(item)
+        if self._changes:
+            # Loaded items keep their stored versions; order them once
+            for item_id in sorted(
+                self._changes, key=lambda i: self._by_id[i].version or 0
+            ):
+                self._changes.move_to_end(item_id)
+
+    @staticmethod
+    def from_dicts(items: Iterable[Dict[str, Any]]) -> "FashionCollection":
+        return FashionCollection(FashionItem.from_dict(item) for item in items)
+
+    def __len__(self) -> int:
+        return len(self._order)
+
+    def __iter__(self) -> Iterator[FashionItem]:
+        return (self._by_id[item_id] for item_id in self._order)
+
+    def __contains__(self, item_id: str) -> bool:
+        return item_id in self._by_id
+
+    def get(self, item_id: str) -> Optional[FashionItem]:
+        return self._by_id.get(item_id)
+
+    def _stamp(self, item: FashionItem) -> None:
+        if item.version is None:
+            self.version += 1
+            item.version = self.version
+        else:
+            self.version = max(self.version, item.version)
+        self._changes[item.id] = None
+        self._changes.move_to_end(item.id)
+
+    def add(self, item: FashionItem) -> None:
+        """Add an item; new items (without a version) get the next version."""
+        self._stamp(item)
+        existing = self._by_id.get(item.id)
+        if existing is not None:
+            # Same id replayed from the log: replace in place, keep its position
+            self._categories[existing.category_key] -= 1
+            if not self._categories[existing.category_key]:
+                del self._categories[existing.category_key]
+            self._by_id[item.id] = item
+            self._categories[item.category_key] += 1
+            return
+
+        key = (item.date_added, self._sequence)
+        self._sequence += 1
+        if not self._keys or key >= self._keys[-1]:
+            self._keys.append(key)
+            self._order.append(item.id)
+        else:
+            position = bisect.bisect(self._keys, key)
+            self._keys.insert(position, key)
+            self._order.insert(position, item.id)
+        self._by_id[item.id] = item
+        self._categories[item.category_key] += 1
+
+    def update(self, item_id: str, fields: Dict[str, Any]) -> Optional[FashionItem]:
+        """Apply `fields` to an item, returning it, or None if there is no such item."""
+        item = self._by_id.get(item_id)
+        if item is None:
+            return None
+        old_category = item.category_key
+        item.update(fields)
+        item.version = None
+        self._stamp(item)
+        if item.category_key != old_category:
+            self._categories[old_category] -= 1
+            if not self._categories[old_category]:
+                del self._categories[old_category]
+            self._categories[item.category_key] += 1
+        return item
+
+    def categories(self) -> Dict[str, int]:
+        """Item counts by category."""
+        return dict(self._categories)
+
+    def last(self, count: int) -> List[FashionItem]:
+        """The `count` most recently added items, oldest first."""
+        if count <= 0:
+            return []
+        return [self._by_id[item_id] for item_id in self._order[-count:]]
+
+    def page(
+        self, cursor: Optional[str] = None, limit: int = 10
+    ) -> Tuple[List[FashionItem], Optional[str]]:
+        """
+        A page of items, newest first. Pass the returned cursor back to get the
+        next (older) page; it is None once there are no more items.
+        """
+        end = len(self._order)
+        if cursor:
+            try:
+                end = max(0, min(end, int(cursor)))
+            except ValueError:
+                pass
+        start = max(0, end - limit)
+        items = [self._by_id[item_id] for item_id in reversed(self._order[start:end])]
+        return items, (str(start) if start > 0 else None)
+
+    def changes_since(self, version: int) -> List[FashionItem]:
+        """Items added or changed after `version`, oldest change first."""
+        changed = []
+        for item_id in reversed(self._changes):
+            item = self._by_id[item_id]
+            if (item.version or 0) <= version:
+                break
+            changed.append(item)
+        changed.reverse()
+        return changed
+
+    def to_dicts(self) -> List[Dict[str, Any]]:
+        return [item.to_dict() for item in self]
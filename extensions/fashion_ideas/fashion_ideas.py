@@ -1,11 +1,10 @@
 import logging
-from typing import Any, Dict, Optional, List
+from typing import Any, Dict, Optional, List, cast
 import asyncio
 import aiohttp
 import json
 import os
 import datetime
-import re
 
 # TabTabTab library imports
 from tabtabtab_lib.extension_interface import (
@@ -23,14 +22,58 @@ from tabtabtab_lib.llm import LLMModel
 from tabtabtab_lib.llm_interface import LLMProcessorInterface, LLMContext
 from tabtabtab_lib.sse_interface import SSESenderInterface
 
+from extensions.context_cache import ContextCache
+from extensions.structured_output import StructuredOutputError, parse_llm_json
+from extensions.lifecycle import LifecycleMixin
+
+from .fashion_collection import FashionCollection, FashionItem
+from . import fashion_images
+from .fashion_images import ImageStore, StoredImage
+from .fashion_store import FashionStore
+from .structured_data import PageData, extract_page_data
+
 # Set up logging
 logging.basicConfig(level=logging.INFO)
 log = logging.getLogger(__name__)
 
 # Define storage path for fashion ideas
 FASHION_STORAGE_DIR = os.path.expanduser("~/fashion_ideas")
+COLLECTION_PAGE_SIZE = 10
+MAX_SYNC_PAGE_SIZE = 100
+
+# Background work for a copy or paste is abandoned after this long
+BACKGROUND_TASK_DEADLINE_SECONDS = 120
+
+# Stats only change when items are saved, which invalidates them
+CONTEXT_CACHE_TTL_SECONDS = 600
+
+FASHION_DETECTION_SCHEMA = {
+    "type": "object",
+    "required": ["is_fashion"],
+    "properties": {
+        "is_fashion": {"type": "boolean"},
+        "items": {
+            "type": "array",
+            "items": {
+                "type": "object",
+                "required": ["title"],
+                "properties": {
+                    "title": {"type": "string"},
+                    "category": {"type": "string"},
+                    "description": {"type": "string"},
+                    "price": {"type": ["string", "number", "null"]},
+                },
+            },
+        },
+    },
+}
+
+
+def _new_item_id(index: int) -> str:
+    return f"item_{index}_{int(datetime.datetime.now().timestamp())}"
+
 
-class FashionIdeasExtension(ExtensionInterface):
+class FashionIdeasExtension(LifecycleMixin, ExtensionInterface):
     """
     A TabTabTab extension for collecting fashion ideas from images and URLs.
     It saves fashion items you're interested in and organizes them for later viewing.
@@ -38,30 +81,64 @@ class FashionIdeasExtension(ExtensionInterface):
 
     def __init__(self, llm_processor: LLMProcessorInterface, sse_sender: SSESenderInterface, extension_id: str):
         super().__init__(sse_sender, llm_processor, extension_id)
-        # Create storage directory if it doesn't exist
-        os.makedirs(FASHION_STORAGE_DIR, exist_ok=True)
-        self.fashion_items = self._load_fashion_items()
+        self.store = FashionStore(FASHION_STORAGE_DIR)
+        self.images = ImageStore(FASHION_STORAGE_DIR)
+        # Storage is read on first use, not at construction; see _ensure_loaded
+        self.fashion_items: Optional[FashionCollection] = None
+        self._load_lock = asyncio.Lock()
+        self.context_cache = ContextCache(
+            "fashion_ideas", ttl=CONTEXT_CACHE_TTL_SECONDS
+        )
         self.llm_processor = llm_processor
-        
-    def _load_fashion_items(self) -> List[Dict]:
+
+    async def close_resources(self) -> None:
+        """Record the latest stats for the next start and stop the image workers"""
+        await super().close_resources()
+        if self.fashion_items is not None:
+            await self.store.write_manifest(self.fashion_items)
+        fashion_images.shutdown()
+
+    async def _ensure_loaded(self) -> FashionCollection:
+        """Load the collection and image index in a worker thread on first use"""
+        if self.fashion_items is None:
+            async with self._load_lock:
+                if self.fashion_items is None:
+                    items = await asyncio.to_thread(self._load_fashion_items)
+                    await self.store.write_manifest(items)
+                    self.fashion_items = items
+        return self.fashion_items
+
+    def _load_fashion_items(self) -> FashionCollection:
         """Load saved fashion items from storage"""
-        storage_file = os.path.join(FASHION_STORAGE_DIR, "fashion_items.json")
-        if os.path.exists(storage_file):
-            try:
-                with open(storage_file, "r") as f:
-                    return json.load(f)
-            except Exception as e:
-                log.error(f"Error loading fashion items: {e}")
-        return []
-    
-    def _save_fashion_items(self):
-        """Save fashion items to storage"""
-        storage_file = os.path.join(FASHION_STORAGE_DIR, "fashion_items.json")
         try:
-            with open(storage_file, "w") as f:
-                json.dump(self.fashion_items, f)
+            self.images.load()
+        except Exception as e:
+            log.error(f"Error loading fashion image index: {e}")
+        try:
+            return FashionCollection.from_dicts(self.store.load())
         except Exception as e:
-            log.error(f"Error saving fashion items: {e}")
+            log.error(f"Error loading fashion items: {e}")
+        return FashionCollection()
+
+    async def _save_new_items(self, items: List[FashionItem]) -> None:
+        """Persist newly added fashion items"""
+        collection = await self._ensure_loaded()
+        self.context_cache.invalidate()
+        await self.store.add_items(items)
+        await self.store.maybe_compact(collection)
+        await self.store.write_manifest(collection)
+
+    async def _get_stats(self) -> Dict[str, Any]:
+        """Item counts, from memory once loaded and from the manifest before that"""
+        if self.fashion_items is None:
+            manifest = await asyncio.to_thread(self.store.read_manifest)
+            if manifest is not None:
+                return {
+                    "total_items": manifest.get("total_items", 0),
+                    "categories": manifest.get("categories", {}),
+                }
+        items = await self._ensure_loaded()
+        return {"total_items": len(items), "categories": items.categories()}
 
     async def on_context_request(
         self, source_extension_id: str, context_query: Dict[str, Any]
@@ -73,28 +150,22 @@ class FashionIdeasExtension(ExtensionInterface):
 
         # Return information about saved fashion items if requested
         if context_query.get("type") == "fashion_stats":
-            stats = {
-                "total_items": len(self.fashion_items),
-                "categories": self._get_fashion_categories()
-            }
-            return OnContextResponse(
-                contexts=[
-                    OnContextResponse.ExtensionContext(
-                        description="fashion_stats", 
-                        context=json.dumps(stats)
-                    )
-                ]
+            return await self.context_cache.get_or_compute(
+                source_extension_id, context_query, self._build_stats_context
             )
 
         return OnContextResponse(contexts=[])
-    
-    def _get_fashion_categories(self) -> Dict[str, int]:
-        """Get counts of fashion items by category"""
-        categories = {}
-        for item in self.fashion_items:
-            category = item.get("category", "uncategorized")
-            categories[category] = categories.get(category, 0) + 1
-        return categories
+
+    async def _build_stats_context(self) -> OnContextResponse:
+        """Item counts for other extensions"""
+        stats = await self._get_stats()
+        return OnContextResponse(
+            contexts=[
+                OnContextResponse.ExtensionContext(
+                    description="fashion_stats", context=json.dumps(stats)
+                )
+            ]
+        )
 
     async def on_copy(self, context: Dict[str, Any]) -> CopyResponse:
         """
@@ -115,10 +186,14 @@ class FashionIdeasExtension(ExtensionInterface):
         # Check if we have a URL or screenshot to process
         if browser_url and device_id and request_id:
             # Start background task to analyze the URL for fashion content
-            asyncio.create_task(
-                self._analyze_fashion_content(browser_url, device_id, request_id, screenshot_data)
+            self.tasks.submit(
+                self._analyze_fashion_content(
+                    browser_url, device_id, request_id, screenshot_data
+                ),
+                device_id=device_id,
+                deadline=BACKGROUND_TASK_DEADLINE_SECONDS,
             )
-            
+
             return CopyResponse(
                 notification=Notification(
                     request_id=request_id,
@@ -130,10 +205,12 @@ class FashionIdeasExtension(ExtensionInterface):
             )
         elif screenshot_data and device_id and request_id:
             # Process screenshot data
-            asyncio.create_task(
-                self._analyze_screenshot(screenshot_data, device_id, request_id)
+            self.tasks.submit(
+                self._analyze_screenshot(screenshot_data, device_id, request_id),
+                device_id=device_id,
+                deadline=BACKGROUND_TASK_DEADLINE_SECONDS,
             )
-            
+
             return CopyResponse(
                 notification=Notification(
                     request_id=request_id,
@@ -143,7 +220,7 @@ class FashionIdeasExtension(ExtensionInterface):
                     status=NotificationStatus.PENDING,
                 ),
             )
-            
+
         return CopyResponse()
 
     async def on_paste(self, context: Dict[str, Any]) -> PasteResponse:
@@ -155,33 +232,76 @@ class FashionIdeasExtension(ExtensionInterface):
         device_id = context.get("device_id")
         request_id = context.get("request_id")
         extensions_context = context.get("extensions_context", {})
-        
+
         # Check if this is a request to view fashion collection
         command = extensions_context.get("command", "")
         if command == "show_collection":
             # Return a summary of saved fashion items
-            return self._generate_collection_response(request_id)
+            return self._generate_collection_response(
+                await self._ensure_loaded(),
+                request_id,
+                extensions_context.get("cursor"),
+            )
+        elif command == "get_collection":
+            # Return a page of the full collection as JSON, for clients to sync from
+            return self._generate_collection_page(
+                await self._ensure_loaded(),
+                request_id,
+                extensions_context.get("cursor"),
+                extensions_context.get("limit"),
+            )
+        elif command == "get_changes":
+            # Return items added or changed after the client's version
+            since_version = extensions_context.get("since_version")
+            if isinstance(since_version, int):
+                collection = await self._ensure_loaded()
+                return PasteResponse(
+                    paste=Notification(
+                        request_id=request_id,
+                        title="Fashion Ideas",
+                        detail=f"Collection version {collection.version}",
+                        content=self._collection_delta(
+                            since_version,
+                            collection.version,
+                            len(collection),
+                            collection.changes_since(since_version),
+                        ),
+                        status=NotificationStatus.READY,
+                    )
+                )
         elif command == "add_note":
             # Add a note to a specific fashion item
             item_id = extensions_context.get("item_id")
             note = extensions_context.get("note")
             if item_id and note:
-                return self._add_note_to_item(request_id, item_id, note)
-                
+                return await self._add_note_to_item(request_id, item_id, note)
+
         # Default response with instructions
         return PasteResponse(
             paste=Notification(
                 request_id=request_id,
                 title="Fashion Ideas",
                 detail="Fashion Collection Helper",
-                content="Commands:\n- show_collection: View your saved items\n- add_note: Add notes to items",
+                content=(
+                    "Commands:\n"
+                    "- show_collection: View your saved items\n"
+                    "- add_note: Add notes to items\n"
+                    "- get_collection: Fetch a page of the collection (cursor, limit)\n"
+                    "- get_changes: Fetch items changed since a collection version "
+                    "(since_version)"
+                ),
                 status=NotificationStatus.READY,
             )
         )
-    
-    def _generate_collection_response(self, request_id: str) -> PasteResponse:
-        """Generate a response showing the fashion collection"""
-        if not self.fashion_items:
+
+    def _generate_collection_response(
+        self,
+        collection: FashionCollection,
+        request_id: str,
+        cursor: Optional[str] = None,
+    ) -> PasteResponse:
+        """Generate a response showing a page of the fashion collection, newest first"""
+        if not collection:
             return PasteResponse(
                 paste=Notification(
                     request_id=request_id,
@@ -191,43 +311,104 @@ class FashionIdeasExtension(ExtensionInterface):
                     status=NotificationStatus.READY,
                 )
             )
-        
+
         # Create a formatted list of fashion items
+        items, next_cursor = collection.page(cursor, limit=COLLECTION_PAGE_SIZE)
         content = "Your Fashion Collection:\n\n"
-        for i, item in enumerate(self.fashion_items[-10:]):  # Show last 10 items
-            content += f"{i+1}. {item.get('title', 'Untitled')}\n"
-            content += f"   Category: {item.get('category', 'Uncategorized')}\n"
-            content += f"   Source: {item.get('source', 'Unknown')}\n"
-            if item.get('notes'):
-                content += f"   Notes: {item['notes']}\n"
-            content += f"   Added: {item.get('date_added', 'Unknown')}\n\n"
-        
+        for i, item in enumerate(items):
+            content += f"{i+1}. {item.title or 'Untitled'}\n"
+            content += f"   Category: {item.category or 'Uncategorized'}\n"
+            content += f"   Source: {item.source or 'Unknown'}\n"
+            if item.thumbnail_path:
+                content += f"   Image: {item.thumbnail_path}\n"
+            if item.notes:
+                content += f"   Notes: {item.notes}\n"
+            content += f"   Added: {item.date_added or 'Unknown'}\n\n"
+        if next_cursor:
+            content += f"More items: show_collection with cursor={next_cursor}\n"
+
         return PasteResponse(
             paste=Notification(
                 request_id=request_id,
                 title="Fashion Ideas",
-                detail=f"Your collection ({len(self.fashion_items)} items)",
+                detail=f"Your collection ({len(collection)} items)",
                 content=content,
                 status=NotificationStatus.READY,
             )
         )
-    
-    def _add_note_to_item(self, request_id: str, item_id: str, note: str) -> PasteResponse:
+
+    def _generate_collection_page(
+        self,
+        collection: FashionCollection,
+        request_id: str,
+        cursor: Optional[str] = None,
+        limit: Optional[int] = None,
+    ) -> PasteResponse:
+        """Return a page of the collection, newest first, with the collection version"""
+        if not isinstance(limit, int) or limit <= 0:
+            limit = COLLECTION_PAGE_SIZE
+        items, next_cursor = collection.page(
+            cursor, limit=min(limit, MAX_SYNC_PAGE_SIZE)
+        )
+        page = {
+            "version": collection.version,
+            "total_items": len(collection),
+            "items": [item.to_dict() for item in items],
+            "next_cursor": next_cursor,
+        }
+        return PasteResponse(
+            paste=Notification(
+                request_id=request_id,
+                title="Fashion Ideas",
+                detail=f"Collection version {collection.version}",
+                content=json.dumps(page),
+                status=NotificationStatus.READY,
+            )
+        )
+
+    @staticmethod
+    def _collection_delta(
+        base_version: int, version: int, total_items: int, items: List[FashionItem]
+    ) -> str:
+        """
+        Serialize the items added or changed since `base_version`. A client holding
+        `base_version` upserts `items` by id to reach `version`; any other client
+        should request get_changes with its own version, or get_collection.
+
+        `version` and `total_items` must be read together with `items`, before any
+        await: other tasks keep adding to the collection, and a delta claiming a
+        later version would hide their items from the client.
+        """
+        return json.dumps(
+            {
+                "version": version,
+                "base_version": base_version,
+                "total_items": total_items,
+                "items": [item.to_dict() for item in items],
+            }
+        )
+
+    async def _add_note_to_item(
+        self, request_id: str, item_id: str, note: str
+    ) -> PasteResponse:
         """Add a note to a specific fashion item"""
-        for item in self.fashion_items:
-            if item.get("id") == item_id:
-                item["notes"] = note
-                self._save_fashion_items()
-                return PasteResponse(
-                    paste=Notification(
-                        request_id=request_id,
-                        title="Fashion Ideas",
-                        detail="Note added successfully",
-                        content=f"Added note to: {item.get('title', 'item')}",
-                        status=NotificationStatus.READY,
-                    )
+        collection = await self._ensure_loaded()
+        item = collection.update(item_id, {"notes": note})
+        if item is not None:
+            await self.store.update_item(
+                item_id, {"notes": note, "version": item.version}
+            )
+            await self.store.write_manifest(collection)
+            return PasteResponse(
+                paste=Notification(
+                    request_id=request_id,
+                    title="Fashion Ideas",
+                    detail="Note added successfully",
+                    content=f"Added note to: {item.title or 'item'}",
+                    status=NotificationStatus.READY,
                 )
-                
+            )
+
         return PasteResponse(
             paste=Notification(
                 request_id=request_id,
@@ -271,7 +452,93 @@ class FashionIdeasExtension(ExtensionInterface):
             log.error(f"{log_prefix} Error fetching URL content: {e}")
             return
 
-        # Use LLM to determine if this is fashion-related content
+        # Build items straight from the page's product markup when it is complete,
+        # otherwise ask the LLM about the relevant parts of the page
+        page = await asyncio.to_thread(extract_page_data, text_content)
+        result: Optional[Dict[str, Any]]
+        if page.is_complete:
+            log.info(
+                f"{log_prefix} Found {len(page.products)} product(s) in structured "
+                "data, skipping LLM"
+            )
+            result = {"is_fashion": True, "items": page.fashion_items()}
+        else:
+            result = await self._detect_fashion_items(page, log_prefix)
+            if result is None:
+                return
+
+        try:
+            if result.get("is_fashion"):
+                collection = await self._ensure_loaded()
+
+                # Store the screenshot once; every item from this page references it
+                stored_image = (
+                    await self.images.save(screenshot_data) if screenshot_data else None
+                )
+
+                # Save fashion items to collection
+                base_version = collection.version
+                new_items = []
+                for item in result.get("items", []):
+                    fashion_item = FashionItem(
+                        id=_new_item_id(len(collection)),
+                        title=item.get("title", "Untitled fashion item"),
+                        category=item.get("category", "Uncategorized"),
+                        description=item.get("description", ""),
+                        price=item.get("price", "Unknown"),
+                        source=url,
+                        date_added=datetime.datetime.now().strftime(
+                            "%Y-%m-%d %H:%M:%S"
+                        ),
+                        has_image=screenshot_data is not None,
+                    )
+                    if stored_image:
+                        self._attach_image(fashion_item, stored_image)
+
+                    collection.add(fashion_item)
+                    new_items.append(fashion_item)
+                version, total_items = collection.version, len(collection)
+
+                await self._save_new_items(new_items)
+
+                # Notify the user with just the new items, not the whole collection
+                items_added = len(result.get("items", []))
+                await self.send_push_notification(
+                    device_id=device_id,
+                    notification=Notification(
+                        request_id=request_id,
+                        title="Fashion Ideas",
+                        detail=(
+                            f"Added {items_added} fashion item(s) to your collection!"
+                        ),
+                        content=self._collection_delta(
+                            base_version, version, total_items, new_items
+                        ),
+                        status=NotificationStatus.READY,
+                    ),
+                )
+            else:
+                # Not fashion content
+                await self.send_push_notification(
+                    device_id=device_id,
+                    notification=Notification(
+                        request_id=request_id,
+                        title="Fashion Ideas",
+                        detail="No fashion content detected",
+                        content="The page doesn't appear to contain fashion items.",
+                        status=NotificationStatus.INFO,
+                    ),
+                )
+        except Exception as e:
+            log.error(f"{log_prefix} Error saving fashion items: {e}")
+
+    async def _detect_fashion_items(
+        self, page: PageData, log_prefix: str
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Use the LLM to determine if a page contains fashion items. Only the page's
+        product data and readable text are sent, not its HTML.
+        """
         fashion_detection_prompt = """
         You are an AI assistant that specializes in identifying fashion content.
         Analyze the provided web page content and determine if it contains fashion items.
@@ -300,11 +567,11 @@ class FashionIdeasExtension(ExtensionInterface):
 
         if not self.llm_processor:
             log.error(f"{log_prefix} LLM Processor not configured")
-            return
+            return None
 
         try:
             log.info(f"{log_prefix} Using LLM to analyze fashion content...")
-            llm_context = LLMContext(text=text_content)
+            llm_context = LLMContext(text=page.relevant_text())
             llm_response = await self.llm_processor.process(
                 system_prompt=fashion_detection_prompt,
                 message="Analyze this web page content for fashion items:",
@@ -313,70 +580,33 @@ class FashionIdeasExtension(ExtensionInterface):
                 stream=False,
             )
 
-            # Clean the response using regex to ensure we only have valid JSON
-            cleaned_response = re.sub(r'^[^{]*({.*})[^}]*$', r'\1', llm_response.strip())
-            logging.info(f"LLM response (cleaned): {cleaned_response}")
-            
-            # Parse the JSON response
+            # Extract and validate the JSON, asking again only for parts that fail
             try:
-                result = json.loads(cleaned_response)
-                if result.get("is_fashion"):
-                    # Save fashion items to collection
-                    for item in result.get("items", []):
-                        fashion_item = {
-                            "id": f"item_{len(self.fashion_items)}_{int(datetime.datetime.now().timestamp())}",
-                            "title": item.get("title", "Untitled fashion item"),
-                            "category": item.get("category", "Uncategorized"),
-                            "description": item.get("description", ""),
-                            "price": item.get("price", "Unknown"),
-                            "source": url,
-                            "date_added": datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
-                            "has_image": screenshot_data is not None
-                        }
-                        
-                        # Save screenshot if available
-                        if screenshot_data:
-                            image_filename = f"{fashion_item['id']}.png"
-                            image_path = os.path.join(FASHION_STORAGE_DIR, image_filename)
-                            with open(image_path, "wb") as f:
-                                f.write(screenshot_data)
-                            fashion_item["image_path"] = image_path
-                        
-                        self.fashion_items.append(fashion_item)
-                    
-                    self._save_fashion_items()
-
-                    fashion_Items_as_json = json.dumps(self.fashion_items)
-                    
-                    # Notify the user
-                    items_added = len(result.get("items", []))
-                    await self.send_push_notification(
-                        device_id=device_id,
-                        notification=Notification(
-                            request_id=request_id,
-                            title="Fashion Ideas",
-                            detail=f"Added {items_added} fashion item(s) to your collection!",
-                            content=fashion_Items_as_json,
-                            status=NotificationStatus.READY,
-                        ),
-                    )
-                else:
-                    # Not fashion content
-                    await self.send_push_notification(
-                        device_id=device_id,
-                        notification=Notification(
-                            request_id=request_id,
-                            title="Fashion Ideas",
-                            detail="No fashion content detected",
-                            content="The page doesn't appear to contain fashion items.",
-                            status=NotificationStatus.INFO,
-                        ),
-                    )
-            except json.JSONDecodeError:
-                log.error(f"{log_prefix} Failed to parse LLM response as JSON")
-                
+                return cast(
+                    Dict[str, Any],
+                    await parse_llm_json(
+                        llm_response, schema=FASHION_DETECTION_SCHEMA, ask=self._ask_llm
+                    ),
+                )
+            except StructuredOutputError as e:
+                log.error(
+                    f"{log_prefix} Failed to parse LLM response as JSON: {e} {e.errors}"
+                )
+
         except Exception as e:
             log.error(f"{log_prefix} Error during LLM processing: {e}")
+        return None
+
+    async def _ask_llm(self, system_prompt: str, message: str) -> str:
+        """Send a follow-up prompt, used to repair malformed structured output"""
+        response = await self.llm_processor.process(
+            system_prompt=system_prompt,
+            message=message,
+            contexts=[],
+            model=LLMModel.GEMINI_FLASH,
+            stream=False,
+        )
+        return cast(str, response)
 
     async def _analyze_screenshot(
         self, screenshot_data: bytes, device_id: str, request_id: str
@@ -387,33 +617,33 @@ class FashionIdeasExtension(ExtensionInterface):
         """
         log_prefix = f"[{self.extension_id}][Req:{request_id}]"
         log.info(f"{log_prefix} Analyzing screenshot for fashion items")
-        
+
         # Since we don't have image recognition in this basic example,
         # we'll assume the screenshot is fashion-related and ask for details
-        
+
+        collection = await self._ensure_loaded()
+
         # Generate a fashion item entry
-        fashion_item = {
-            "id": f"item_{len(self.fashion_items)}_{int(datetime.datetime.now().timestamp())}",
-            "title": "Screenshot fashion item",
-            "category": "Uncategorized", 
-            "description": "Fashion item from screenshot",
-            "source": "Screenshot",
-            "date_added": datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
-            "has_image": True,
-            "needs_details": True  # Flag that this item needs user input
-        }
-        
+        fashion_item = FashionItem(
+            id=_new_item_id(len(collection)),
+            title="Screenshot fashion item",
+            category="Uncategorized",
+            description="Fashion item from screenshot",
+            source="Screenshot",
+            date_added=datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+            has_image=True,
+            needs_details=True,  # Flag that this item needs user input
+        )
+
         # Save the screenshot
-        image_filename = f"{fashion_item['id']}.png"
-        image_path = os.path.join(FASHION_STORAGE_DIR, image_filename)
-        with open(image_path, "wb") as f:
-            f.write(screenshot_data)
-        fashion_item["image_path"] = image_path
-        
+        self._attach_image(fashion_item, await self.images.save(screenshot_data))
+
         # Add to collection
-        self.fashion_items.append(fashion_item)
-        self._save_fashion_items()
-        
+        base_version = collection.version
+        collection.add(fashion_item)
+        version, total_items = collection.version, len(collection)
+        await self._save_new_items([fashion_item])
+
         # Send notification asking for details
         await self.send_push_notification(
             device_id=device_id,
@@ -421,7 +651,16 @@ class FashionIdeasExtension(ExtensionInterface):
                 request_id=request_id,
                 title="Fashion Ideas",
                 detail="Fashion item saved",
-                content=json.dumps(fashion_item),
+                content=self._collection_delta(
+                    base_version, version, total_items, [fashion_item]
+                ),
                 status=NotificationStatus.READY,
             ),
         )
+
+    @staticmethod
+    def _attach_image(fashion_item: FashionItem, stored_image: StoredImage) -> None:
+        """Point an item at a stored screenshot and its thumbnail"""
+        fashion_item.image_path = stored_image.path
+        fashion_item.image_hash = stored_image.hash
+        fashion_item.thumbnail_path = stored_image.thumbnail_path
@@ -0,0 +1,189 @@
+"""
+Content-addressed screenshot storage for the fashion collection.
+
+Images are stored once under the SHA-256 of their bytes. When Pillow is
+installed, each new image also gets a downscaled thumbnail, made in a worker
+process. Only byte-identical screenshots are deduplicated: screenshots of
+different products on the same shop page can differ in just a small region,
+so near matches are kept as separate images.
+"""
+
+import asyncio
+import hashlib
+import io
+import json
+import logging
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, NamedTuple, Optional
+
+try:
+    from PIL import Image
+except ImportError:
+    Image = None  # type: ignore[assignment]
+
+log = logging.getLogger(__name__)
+
+IMAGES_DIRNAME = "images"
+THUMBNAILS_DIRNAME = "thumbnails"
+INDEX_FILENAME = "index.jsonl"
+
+THUMBNAIL_SIZE = (256, 256)
+THUMBNAIL_QUALITY = 80
+PROCESS_WORKERS = 2
+PROCESS_TIMEOUT_SECONDS = 10
+
+_executor: Optional[ProcessPoolExecutor] = None
+
+
+class StoredImage(NamedTuple):
+    hash: str
+    path: str
+    thumbnail_path: Optional[str]
+
+
+def make_thumbnail(data: bytes) -> Optional[bytes]:
+    """A JPEG thumbnail of `data`, or None if it can't be decoded."""
+    if Image is None:
+        return None
+    try:
+        with Image.open(io.BytesIO(data)) as image:
+            thumbnail = image.convert("RGB")
+            thumbnail.thumbnail(THUMBNAIL_SIZE)
+            output = io.BytesIO()
+            thumbnail.save(output, format="JPEG", quality=THUMBNAIL_QUALITY)
+            return output.getvalue()
+    except Exception:
+        return None
+
+
+def _get_executor() -> ProcessPoolExecutor:
+    global _executor
+    if _executor is None:
+        _executor = ProcessPoolExecutor(max_workers=PROCESS_WORKERS)
+    return _executor
+
+
+def shutdown() -> None:
+    """
+    Stop the worker pool; it is recreated on next use. Work already queued
+    still runs, since on a hot reload it may belong to the new instance.
+    """
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(wait=False)
+        _executor = None
+
+
+def _write_atomic(path: str, data: bytes) -> None:
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+
+
+class ImageStore:
+    """
+    Stores screenshots by content hash, writing each distinct image once.
+
+    Usage:
+        images = ImageStore(storage_dir)
+        stored = await images.save(screenshot_data)
+        item.image_path, item.thumbnail_path = stored.path, stored.thumbnail_path
+    """
+
+    def __init__(self, storage_dir: str):
+        self.images_dir = os.path.join(storage_dir, IMAGES_DIRNAME)
+        self.thumbnails_dir = os.path.join(storage_dir, THUMBNAILS_DIRNAME)
+        self.index_path = os.path.join(self.images_dir, INDEX_FILENAME)
+        # Content hash -> thumbnail path (None when no thumbnail could be made)
+        self._images: Dict[str, Optional[str]] = {}
+        self._lock = asyncio.Lock()
+
+    def load(self) -> None:
+        """Read the index of stored images."""
+        if not os.path.exists(self.index_path):
+            return
+        with open(self.index_path, "r") as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    continue
+                self._images[record["hash"]] = record.get("thumbnail")
+
+    def image_path(self, content_hash: str) -> str:
+        return os.path.join(self.images_dir, content_hash[:2], f"{content_hash}.png")
+
+    def _thumbnail_path(self, content_hash: str) -> str:
+        return os.path.join(
+            self.thumbnails_dir, content_hash[:2], f"{content_hash}.jpg"
+        )
+
+    def _stored(self, content_hash: str) -> StoredImage:
+        return StoredImage(
+            hash=content_hash,
+            path=self.image_path(content_hash),
+            thumbnail_path=self._images.get(content_hash),
+        )
+
+    async def _make_thumbnail(self, data: bytes) -> Optional[bytes]:
+        if Image is None:
+            return None
+        loop = asyncio.get_running_loop()
+        try:
+            return await asyncio.wait_for(
+                loop.run_in_executor(_get_executor(), make_thumbnail, data),
+                timeout=PROCESS_TIMEOUT_SECONDS,
+            )
+        except asyncio.TimeoutError:
+            log.warning(
+                f"Processing screenshot timed out after {PROCESS_TIMEOUT_SECONDS}s"
+            )
+        except Exception as e:
+            log.error(f"Error processing screenshot: {e}")
+        return None
+
+    def _write(
+        self,
+        content_hash: str,
+        data: bytes,
+        thumbnail: Optional[bytes],
+        thumbnail_path: Optional[str],
+    ) -> None:
+        _write_atomic(self.image_path(content_hash), data)
+        if thumbnail is not None and thumbnail_path:
+            _write_atomic(thumbnail_path, thumbnail)
+        with open(self.index_path, "a") as f:
+            f.write(
+                json.dumps(
+                    {
+                        "hash": content_hash,
+                        "thumbnail": thumbnail_path,
+                    }
+                )
+                + "\n"
+            )
+
+    async def save(self, data: bytes) -> StoredImage:
+        """Store `data` unless an identical image is already stored."""
+        content_hash = await asyncio.to_thread(lambda: hashlib.sha256(data).hexdigest())
+        if content_hash in self._images:
+            return self._stored(content_hash)
+
+        thumbnail = await self._make_thumbnail(data)
+
+        async with self._lock:
+            # Re-check now that concurrent saves of the same image have settled
+            if content_hash in self._images:
+                return self._stored(content_hash)
+
+            thumbnail_path = (
+                self._thumbnail_path(content_hash) if thumbnail is not None else None
+            )
+            await asyncio.to_thread(
+                self._write, content_hash, data, thumbnail, thumbnail_path
+            )
+            self._images[content_hash] = thumbnail_path
+            return self._stored(content_hash)
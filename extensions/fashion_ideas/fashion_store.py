@@ -0,0 +1,184 @@
+"""Append-only storage for the fashion collection."""
+
+import asyncio
+import json
+import logging
+import os
+from typing import Any, Dict, Iterable, List, Optional
+
+from .fashion_collection import FashionCollection, FashionItem
+
+log = logging.getLogger(__name__)
+
+LOG_FILENAME = "fashion_items.jsonl"
+LEGACY_FILENAME = "fashion_items.json"
+MANIFEST_FILENAME = "manifest.json"
+
+# Compact once the log holds this many records and at least twice as many
+# records as live items
+COMPACT_MIN_RECORDS = 200
+COMPACT_RATIO = 2
+
+
+class FashionStore:
+    """
+    Persists the collection as a JSONL log of changes: each added item or
+    updated field is one appended line, so a save costs the same no matter how
+    large the collection is. The log is periodically rewritten as a snapshot
+    (atomically, via a temp file and rename). All file I/O runs in a worker
+    thread.
+    """
+
+    def __init__(self, storage_dir: str):
+        self.storage_dir = storage_dir
+        self.log_path = os.path.join(storage_dir, LOG_FILENAME)
+        self.legacy_path = os.path.join(storage_dir, LEGACY_FILENAME)
+        self.manifest_path = os.path.join(storage_dir, MANIFEST_FILENAME)
+        self._lock = asyncio.Lock()
+        self._log_records = 0
+
+    def load(self) -> List[Dict[str, Any]]:
+        """Replay the log into a list of items, migrating the legacy JSON file."""
+        if not os.path.exists(self.log_path) and os.path.exists(self.legacy_path):
+            self._migrate_legacy()
+
+        items: Dict[str, Dict[str, Any]] = {}
+        self._log_records = 0
+        if not os.path.exists(self.log_path):
+            return []
+
+        torn_at: Optional[int] = None
+        needs_newline = False
+        with open(self.log_path, "rb") as f:
+            offset = 0
+            for line in f:
+                start, offset = offset, offset + len(line)
+                # Only the final line can lack its newline
+                needs_newline = not line.endswith(b"\n")
+                if not line.strip():
+                    continue
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    log.warning("Skipping unreadable fashion log record")
+                    if needs_newline:
+                        # A torn final line from an interrupted append
+                        torn_at, needs_newline = start, False
+                    continue
+                self._log_records += 1
+                self._apply(items, record)
+        # Appends must start on a line of their own, or they'd be lost with it
+        if torn_at is not None:
+            with open(self.log_path, "r+b") as f:
+                f.truncate(torn_at)
+        elif needs_newline:
+            self._append_lines("\n")
+        return list(items.values())
+
+    @staticmethod
+    def _apply(items: Dict[str, Dict[str, Any]], record: Dict[str, Any]) -> None:
+        op = record.get("op")
+        if op == "put":
+            item = record.get("item", {})
+            items[item.get("id", f"item_{len(items)}")] = item
+        elif op == "update":
+            item = items.get(str(record.get("id")))
+            if item is not None:
+                item.update(record.get("fields", {}))
+
+    def _migrate_legacy(self) -> None:
+        try:
+            with open(self.legacy_path, "r") as f:
+                legacy_items = json.load(f)
+        except Exception as e:
+            log.error(f"Error loading fashion items: {e}")
+            return
+        self._write_snapshot(legacy_items)
+        log.info(f"Migrated {len(legacy_items)} fashion items to {LOG_FILENAME}")
+
+    def _append_lines(self, lines: str) -> None:
+        os.makedirs(self.storage_dir, exist_ok=True)
+        with open(self.log_path, "a") as f:
+            f.write(lines)
+            f.flush()
+
+    def _write_snapshot(self, items: Iterable[Dict[str, Any]]) -> int:
+        os.makedirs(self.storage_dir, exist_ok=True)
+        tmp_path = f"{self.log_path}.tmp"
+        count = 0
+        with open(tmp_path, "w") as f:
+            for item in items:
+                f.write(json.dumps({"op": "put", "item": item}) + "\n")
+                count += 1
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.log_path)
+        return count
+
+    async def _append(self, records: List[Dict[str, Any]]) -> None:
+        # Serialize on the loop, where the items are mutated
+        lines = "".join(json.dumps(record) + "\n" for record in records)
+        async with self._lock:
+            try:
+                await asyncio.to_thread(self._append_lines, lines)
+                self._log_records += len(records)
+            except Exception as e:
+                log.error(f"Error saving fashion items: {e}")
+
+    async def add_items(self, items: List[FashionItem]) -> None:
+        """Append newly added items."""
+        await self._append([{"op": "put", "item": item.to_dict()} for item in items])
+
+    async def update_item(self, item_id: str, fields: Dict[str, Any]) -> None:
+        """Append a change to some fields of an existing item."""
+        await self._append([{"op": "update", "id": item_id, "fields": fields}])
+
+    async def maybe_compact(self, items: FashionCollection) -> None:
+        """Rewrite the log as a snapshot of `items` once it has grown enough."""
+        if self._log_records < max(COMPACT_MIN_RECORDS, COMPACT_RATIO * len(items)):
+            return
+        async with self._lock:
+            # Changes made after this snapshot are still appended afterwards;
+            # replaying a put or update twice is harmless.
+            snapshot = items.to_dicts()
+            try:
+                self._log_records = await asyncio.to_thread(
+                    self._write_snapshot, snapshot
+                )
+                log.info(f"Compacted fashion log to {self._log_records} records")
+            except Exception as e:
+                log.error(f"Error compacting fashion items: {e}")
+
+    def read_manifest(self) -> Optional[Dict[str, Any]]:
+        """
+        Return the item counts recorded by the last write_manifest, or None if
+        there is no readable manifest. Reading it is cheap; replaying the log is not.
+        """
+        try:
+            with open(self.manifest_path, "r") as f:
+                manifest: Dict[str, Any] = json.load(f)
+            return manifest
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError) as e:
+            log.warning(f"Ignoring unreadable fashion manifest: {e}")
+            return None
+
+    def _write_manifest(self, manifest: Dict[str, Any]) -> None:
+        os.makedirs(self.storage_dir, exist_ok=True)
+        tmp_path = f"{self.manifest_path}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(manifest, f)
+        os.replace(tmp_path, self.manifest_path)
+
+    async def write_manifest(self, items: FashionCollection) -> None:
+        """Record the collection's size, category counts and version."""
+        manifest = {
+            "total_items": len(items),
+            "categories": items.categories(),
+            "version": items.version,
+        }
+        try:
+            await asyncio.to_thread(self._write_manifest, manifest)
+        except Exception as e:
+            log.error(f"Error writing fashion manifest: {e}")
@@ -0,0 +1,366 @@
+"""
+Local extraction of product data from shop pages.
+
+Most shop pages describe their products with schema.org `Product` JSON-LD or
+OpenGraph `product` tags. When those are complete and the page files the
+products under an apparel category, fashion items are built from them
+directly; otherwise the page is reduced to its product data and readable text
+before it is sent to the LLM.
+"""
+
+import json
+import re
+from html.parser import HTMLParser
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+# Upper bound on the text sent to the LLM when structured data is incomplete
+MAX_RELEVANT_CHARS = 8000
+
+# Content inside these tags is never shown to the user, so it is not relevant text
+_SKIPPED_TAGS = {
+    "script",
+    "style",
+    "noscript",
+    "template",
+    "svg",
+    "nav",
+    "footer",
+    "header",
+}
+_WHITESPACE_RE = re.compile(r"\s+")
+
+_CATEGORY_KEYWORDS = {
+    "shoes": (
+        "shoe",
+        "sneaker",
+        "boot",
+        "sandal",
+        "heel",
+        "loafer",
+        "trainer",
+        "slipper",
+    ),
+    "accessories": (
+        "bag",
+        "handbag",
+        "tote",
+        "wallet",
+        "belt",
+        "hat",
+        "cap",
+        "scarf",
+        "sunglasses",
+        "watch",
+        "jewelry",
+        "jewellery",
+        "necklace",
+        "earring",
+        "bracelet",
+        "ring",
+    ),
+    "clothing": (
+        "shirt",
+        "t-shirt",
+        "tee",
+        "top",
+        "blouse",
+        "dress",
+        "skirt",
+        "jeans",
+        "trousers",
+        "pants",
+        "shorts",
+        "jacket",
+        "coat",
+        "sweater",
+        "jumper",
+        "cardigan",
+        "hoodie",
+        "suit",
+        "blazer",
+    ),
+}
+
+
+# Words that mark a declared product category as apparel. Accessory keywords
+# alone don't: "Watches" or "Rings" are just as often electronics
+_APPAREL_CATEGORY_WORDS = {
+    "apparel",
+    "clothing",
+    "clothes",
+    "fashion",
+    "footwear",
+    "jewelry",
+    "jewellery",
+    "handbags",
+    "menswear",
+    "womenswear",
+}
+# Google product taxonomy ids for Apparel & Accessories, Clothing, Shoes, Jewelry
+_APPAREL_TAXONOMY_IDS = {"166", "1604", "187", "188"}
+
+
+def _words(*texts: Optional[str]) -> Set[str]:
+    return set(re.findall(r"[a-z-]+", " ".join(t for t in texts if t).lower()))
+
+
+def _match_category(words: Set[str], categories: Iterable[str]) -> Optional[str]:
+    for category in categories:
+        for keyword in _CATEGORY_KEYWORDS[category]:
+            if words & {keyword, f"{keyword}s", f"{keyword}es"}:
+                return category
+    return None
+
+
+def guess_category(*texts: Optional[str]) -> Optional[str]:
+    """Pick a broad category from whole keywords in the product name or category."""
+    category = _match_category(_words(*texts), _CATEGORY_KEYWORDS)
+    return category.capitalize() if category else None
+
+
+def is_apparel_category(category_path: Optional[str]) -> bool:
+    """
+    Whether a category the page declares for a product (schema.org `category`,
+    `product:category` or a Google product category) is apparel.
+    """
+    if not category_path:
+        return False
+    if category_path.strip() in _APPAREL_TAXONOMY_IDS:
+        return True
+    words = _words(category_path)
+    return bool(words & _APPAREL_CATEGORY_WORDS) or bool(
+        _match_category(words, ("clothing", "shoes"))
+    )
+
+
+class _PageParser(HTMLParser):
+    def __init__(self) -> None:
+        super().__init__(convert_charrefs=True)
+        self.json_ld: List[str] = []
+        self.meta: Dict[str, str] = {}
+        self.title = ""
+        self.text: List[str] = []
+        self._skip_depth = 0
+        self._in_json_ld = False
+        self._in_title = False
+        self._buffer: List[str] = []
+
+    def handle_starttag(self, tag: str, attrs: List[Tuple[str, Optional[str]]]) -> None:
+        attributes = dict(attrs)
+        if tag == "meta":
+            key = attributes.get("property") or attributes.get("name")
+            content = attributes.get("content")
+            if key and content:
+                self.meta.setdefault(key.lower(), content)
+        elif (
+            tag == "script"
+            and (attributes.get("type") or "").lower() == "application/ld+json"
+        ):
+            self._in_json_ld = True
+            self._buffer = []
+        elif tag == "title":
+            self._in_title = True
+        if tag in _SKIPPED_TAGS:
+            self._skip_depth += 1
+
+    def handle_endtag(self, tag: str) -> None:
+        if tag == "script" and self._in_json_ld:
+            self.json_ld.append("".join(self._buffer))
+            self._in_json_ld = False
+        elif tag == "title":
+            self._in_title = False
+        if tag in _SKIPPED_TAGS and self._skip_depth:
+            self._skip_depth -= 1
+
+    def handle_data(self, data: str) -> None:
+        if self._in_json_ld:
+            self._buffer.append(data)
+        elif self._in_title:
+            self.title += data
+        elif not self._skip_depth:
+            text = _WHITESPACE_RE.sub(" ", data).strip()
+            if text:
+                self.text.append(text)
+
+
+def _types(node: Dict[str, Any]) -> List[str]:
+    value = node.get("@type", [])
+    return [value] if isinstance(value, str) else list(value)
+
+
+def _walk_json_ld(node: Any) -> Iterable[Dict[str, Any]]:
+    """Yield every object in a JSON-LD document, including @graph and nested lists."""
+    if isinstance(node, list):
+        for child in node:
+            yield from _walk_json_ld(child)
+    elif isinstance(node, dict):
+        yield node
+        for key in ("@graph", "itemListElement", "item"):
+            if key in node:
+                yield from _walk_json_ld(node[key])
+
+
+def _text(value: Any) -> Optional[str]:
+    if isinstance(value, dict):
+        value = value.get("name")
+    if isinstance(value, list):
+        value = ", ".join(str(v) for v in value if v)
+    if value is None or value == "":
+        return None
+    return _WHITESPACE_RE.sub(" ", str(value)).strip()
+
+
+def _format_price(amount: Any, currency: Any) -> Optional[str]:
+    if amount in (None, ""):
+        return None
+    return f"{amount} {currency}".strip() if currency else str(amount)
+
+
+def _offer_price(offers: Any) -> Optional[str]:
+    for offer in offers if isinstance(offers, list) else [offers]:
+        if not isinstance(offer, dict):
+            continue
+        price = offer.get("price", offer.get("lowPrice"))
+        if price in (None, "") and isinstance(offer.get("priceSpecification"), dict):
+            price = offer["priceSpecification"].get("price")
+        formatted = _format_price(price, offer.get("priceCurrency"))
+        if formatted:
+            return formatted
+    return None
+
+
+def _product_from_json_ld(node: Dict[str, Any]) -> Dict[str, Optional[str]]:
+    title = _text(node.get("name"))
+    category_path = _text(node.get("category"))
+    return {
+        "title": title,
+        # Only set when the product is recognisably fashion
+        "category": guess_category(title, category_path),
+        "category_path": category_path,
+        "description": _text(node.get("description")),
+        "price": _offer_price(node.get("offers")),
+        "brand": _text(node.get("brand")),
+    }
+
+
+def _product_from_meta(meta: Dict[str, str]) -> Optional[Dict[str, Optional[str]]]:
+    if meta.get("og:type", "").lower() not in ("product", "og:product", "product.item"):
+        return None
+    title = meta.get("og:title")
+    category_path = (
+        meta.get("product:category")
+        or meta.get("product:google_product_category")
+        or meta.get("google_product_category")
+    )
+    return {
+        "title": title,
+        "category": guess_category(title, category_path),
+        "category_path": category_path,
+        "description": meta.get("og:description"),
+        "price": _format_price(
+            meta.get("product:price:amount") or meta.get("og:price:amount"),
+            meta.get("product:price:currency") or meta.get("og:price:currency"),
+        ),
+        "brand": meta.get("product:brand"),
+    }
+
+
+class PageData:
+    """Product data and readable text extracted from a page."""
+
+    def __init__(
+        self,
+        title: str,
+        description: Optional[str],
+        products: List[Dict[str, Optional[str]]],
+        text: str,
+    ):
+        self.title = title
+        self.description = description
+        self.products = products
+        self.text = text
+
+    @property
+    def is_complete(self) -> bool:
+        """
+        Whether every product found has a title and price and is filed under an
+        apparel category by the page itself. A keyword in the product name isn't
+        enough: "Apple Watch" or "Smart Ring" are not fashion.
+        """
+        return bool(self.products) and all(
+            product.get("title")
+            and product.get("price")
+            and product.get("category")
+            and is_apparel_category(product.get("category_path"))
+            for product in self.products
+        )
+
+    def fashion_items(self) -> List[Dict[str, str]]:
+        """The products in the shape the LLM analysis returns."""
+        items = []
+        for product in self.products:
+            description = product.get("description") or ""
+            brand = product.get("brand")
+            if brand and brand not in description:
+                description = f"{brand}. {description}".strip()
+            items.append(
+                {
+                    "title": product.get("title") or "",
+                    "category": product.get("category") or "",
+                    "description": description,
+                    "price": product.get("price") or "",
+                }
+            )
+        return items
+
+    def relevant_text(self, limit: int = MAX_RELEVANT_CHARS) -> str:
+        """What the LLM needs to analyze the page: product data, then page text."""
+        parts = [f"Title: {self.title}"] if self.title else []
+        if self.description:
+            parts.append(f"Description: {self.description}")
+        for product in self.products:
+            known = {k: v for k, v in product.items() if v}
+            if known:
+                parts.append(f"Product data: {json.dumps(known)}")
+        parts.append(self.text)
+        return "\n".join(parts)[:limit]
+
+
+def extract_page_data(html: str) -> PageData:
+    """
+    Parse `html` for schema.org Product JSON-LD, OpenGraph product tags and
+    visible text.
+    """
+    parser = _PageParser()
+    try:
+        parser.feed(html)
+        parser.close()
+    except Exception:
+        # Keep whatever was parsed before the markup became unreadable
+        pass
+
+    products = []
+    seen_titles = set()
+    for block in parser.json_ld:
+        try:
+            document = json.loads(block)
+        except json.JSONDecodeError:
+            continue
+        for node in _walk_json_ld(document):
+            if "Product" in _types(node) or "ProductGroup" in _types(node):
+                product = _product_from_json_ld(node)
+                if product["title"] and product["title"] not in seen_titles:
+                    seen_titles.add(product["title"])
+                    products.append(product)
+
+    if not products:
+        meta_product = _product_from_meta(parser.meta)
+        if meta_product and meta_product["title"]:
+            products.append(meta_product)
+
+    return PageData(
+        title=_text(parser.title) or parser.meta.get("og:title", ""),
+        description=parser.meta.get("og:description") or parser.meta.get("description"),
+        products=products,
+        text=" ".join(parser.text),
+    )
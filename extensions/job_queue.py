@@ -0,0 +1,704 @@
+"""
+Durable background jobs for extensions.
+
+Work submitted to a TaskSupervisor lives only in memory, so a reload or a
+crash loses every copy that was still being processed. A DurableJobsMixin
+extension records each job in a local SQLite database before acknowledging
+the event, runs it through its supervisor, and marks it done only once the
+handler returns. Jobs left unfinished by a previous process are picked up
+again by `resume_jobs()` when the extension starts. Jobs submitted while the
+extension is stopping are recorded but left for its successor, which starts
+them in `take_over()`.
+
+A job is started again only if running it twice is harmless: kinds whose
+handler is flagged idempotent are retried after an error, and re-queued when
+shutdown interrupts them or a crash leaves them unfinished. A job of any other
+kind that was interrupted or missed its deadline is marked failed, since it
+may already have had its effect (created an event, appended to a page). A job
+that never started always runs, and a job submitted twice with the same
+idempotency key (the same request delivered again) runs once.
+
+Usage:
+    class MyExtension(DurableJobsMixin, ExtensionInterface):
+        JOB_HANDLERS = {
+            "process": JobHandler("_process_in_background", idempotent=True),
+        }
+
+        async def on_copy(self, context):
+            await self.submit_job(
+                "process",
+                {"request_id": request_id, "text": text, ...},
+                device_id=device_id,
+                idempotency_key=f"copy:{request_id}",
+            )
+
+Payloads are stored as JSON and passed to the handler as keyword arguments.
+They include the request's dependencies (API keys among them), so the
+database is created readable by its owner only.
+"""
+
+import asyncio
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from typing import (
+    Any,
+    Dict,
+    Hashable,
+    List,
+    NamedTuple,
+    Optional,
+    Set,
+    Union,
+    cast,
+)
+
+from extensions.lifecycle import LifecycleMixin
+from extensions.task_supervisor import PRIORITY_NORMAL
+
+log = logging.getLogger(__name__)
+
+DEFAULT_JOB_QUEUE_PATH = os.path.expanduser(
+    os.getenv("TABTABTAB_JOB_QUEUE_PATH", "~/.tabtabtab/jobs.sqlite3")
+)
+DEFAULT_MAX_ATTEMPTS = 3
+# A claimed job whose process died is claimable again after this long if it
+# was submitted without a deadline
+DEFAULT_LEASE_SECONDS = 300
+# Finished jobs are kept this long so their idempotency keys still apply
+DONE_RETENTION_SECONDS = 24 * 60 * 60
+# Unfinished jobs older than this are given up at startup; their result would
+# arrive too late to be useful
+MAX_RESUME_AGE_SECONDS = 60 * 60
+RETRY_BACKOFF_SECONDS = 2.0
+
+STATUS_PENDING = "pending"
+STATUS_LEASED = "leased"
+STATUS_DONE = "done"
+STATUS_FAILED = "failed"
+STATUS_SUPERSEDED = "superseded"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    queue TEXT NOT NULL,
+    kind TEXT NOT NULL,
+    payload TEXT NOT NULL,
+    idempotency_key TEXT,
+    supersede_key TEXT,
+    device_id TEXT,
+    priority INTEGER NOT NULL DEFAULT 0,
+    deadline REAL,
+    status TEXT NOT NULL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    max_attempts INTEGER NOT NULL,
+    owner TEXT,
+    lease_until REAL,
+    last_error TEXT,
+    created_at REAL NOT NULL,
+    updated_at REAL NOT NULL
+);
+CREATE UNIQUE INDEX IF NOT EXISTS jobs_idempotency
+    ON jobs (queue, idempotency_key) WHERE idempotency_key IS NOT NULL;
+CREATE INDEX IF NOT EXISTS jobs_status ON jobs (queue, status);
+"""
+
+
+class JobHandler(NamedTuple):
+    """
+    The coroutine method handling a job kind, and whether running it again
+    after an interruption is harmless.
+    """
+
+    method: str
+    idempotent: bool = False
+
+
+class StoredJob:
+    """A job as recorded in the store."""
+
+    __slots__ = (
+        "id",
+        "queue",
+        "kind",
+        "payload",
+        "supersede_key",
+        "device_id",
+        "priority",
+        "deadline",
+        "attempts",
+        "max_attempts",
+    )
+
+    def __init__(
+        self,
+        id: int,
+        queue: str,
+        kind: str,
+        payload: Dict[str, Any],
+        supersede_key: Optional[Hashable] = None,
+        device_id: Optional[str] = None,
+        priority: int = PRIORITY_NORMAL,
+        deadline: Optional[float] = None,
+        attempts: int = 0,
+        max_attempts: int = DEFAULT_MAX_ATTEMPTS,
+    ):
+        self.id = id
+        self.queue = queue
+        self.kind = kind
+        self.payload = payload
+        self.supersede_key = supersede_key
+        self.device_id = device_id
+        self.priority = priority
+        self.deadline = deadline
+        self.attempts = attempts
+        self.max_attempts = max_attempts
+
+    @classmethod
+    def from_row(cls, row: sqlite3.Row) -> "StoredJob":
+        supersede_key = row["supersede_key"]
+        return cls(
+            id=row["id"],
+            queue=row["queue"],
+            kind=row["kind"],
+            payload=json.loads(row["payload"]),
+            supersede_key=(
+                _decode_key(supersede_key) if supersede_key is not None else None
+            ),
+            device_id=row["device_id"],
+            priority=row["priority"],
+            deadline=row["deadline"],
+            attempts=row["attempts"],
+            max_attempts=row["max_attempts"],
+        )
+
+
+def _encode_key(key: Hashable) -> str:
+    return json.dumps(list(key) if isinstance(key, tuple) else key)
+
+
+def _decode_key(value: str) -> Hashable:
+    key = json.loads(value)
+    return tuple(key) if isinstance(key, list) else key
+
+
+class JobStore:
+    """
+    SQLite-backed job records shared by every extension using the same file.
+
+    Methods are synchronous and safe to call from worker threads; callers on
+    the event loop use `asyncio.to_thread`. Each store has its own owner id,
+    which it writes on the jobs it claims.
+    """
+
+    def __init__(self, path: str = DEFAULT_JOB_QUEUE_PATH):
+        self.path = path
+        self.owner = f"{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self._lock = threading.Lock()
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        # Payloads carry API keys; don't let other users read them
+        fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o600)
+        os.close(fd)
+        self._conn = sqlite3.connect(
+            path, check_same_thread=False, isolation_level=None
+        )
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_SCHEMA)
+
+    def enqueue(
+        self,
+        queue: str,
+        kind: str,
+        payload: Dict[str, Any],
+        idempotency_key: Optional[str] = None,
+        supersede_key: Optional[Hashable] = None,
+        supersede_running: bool = True,
+        device_id: Optional[str] = None,
+        priority: int = PRIORITY_NORMAL,
+        deadline: Optional[float] = None,
+        max_attempts: int = DEFAULT_MAX_ATTEMPTS,
+    ) -> Optional[StoredJob]:
+        """
+        Record a job and return it, or None if a job with the same idempotency
+        key already exists. Earlier unfinished jobs with the same supersede key
+        are marked superseded (only unclaimed ones unless `supersede_running`).
+        """
+        now = time.time()
+        encoded_key = _encode_key(supersede_key) if supersede_key is not None else None
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                cursor = self._conn.execute(
+                    "INSERT OR IGNORE INTO jobs (queue, kind, payload,"
+                    " idempotency_key, supersede_key, device_id, priority, deadline,"
+                    " status, max_attempts, created_at, updated_at)"
+                    " VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    (
+                        queue,
+                        kind,
+                        json.dumps(payload),
+                        idempotency_key,
+                        encoded_key,
+                        device_id,
+                        priority,
+                        deadline,
+                        STATUS_PENDING,
+                        max_attempts,
+                        now,
+                        now,
+                    ),
+                )
+                if not cursor.rowcount:
+                    self._conn.execute("COMMIT")
+                    return None
+                job_id = cast(int, cursor.lastrowid)
+                if encoded_key is not None:
+                    statuses = (
+                        (STATUS_PENDING, STATUS_LEASED)
+                        if supersede_running
+                        else (STATUS_PENDING, STATUS_PENDING)
+                    )
+                    self._conn.execute(
+                        "UPDATE jobs SET status = ?, updated_at = ? WHERE queue = ?"
+                        " AND supersede_key = ? AND id != ? AND status IN (?, ?)",
+                        (STATUS_SUPERSEDED, now, queue, encoded_key, job_id, *statuses),
+                    )
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+        return StoredJob(
+            id=job_id,
+            queue=queue,
+            kind=kind,
+            payload=payload,
+            supersede_key=supersede_key,
+            device_id=device_id,
+            priority=priority,
+            deadline=deadline,
+            max_attempts=max_attempts,
+        )
+
+    def claim(self, job_id: int) -> bool:
+        """
+        Lease a job to this store's owner. Fails if it is finished, superseded
+        or leased to someone else whose lease hasn't expired.
+        """
+        now = time.time()
+        with self._lock:
+            cursor = self._conn.execute(
+                "UPDATE jobs SET status = ?, owner = ?, attempts = attempts + 1,"
+                " lease_until = ? + COALESCE(deadline, ?), updated_at = ?"
+                " WHERE id = ? AND (status = ? OR (status = ? AND lease_until < ?))",
+                (
+                    STATUS_LEASED,
+                    self.owner,
+                    now,
+                    DEFAULT_LEASE_SECONDS,
+                    now,
+                    job_id,
+                    STATUS_PENDING,
+                    STATUS_LEASED,
+                    now,
+                ),
+            )
+            return cursor.rowcount == 1
+
+    def complete(self, job_id: int) -> None:
+        self._finish(job_id, STATUS_DONE, None)
+
+    def release(self, job_id: int, error: str, retry: bool = True) -> bool:
+        """
+        Give back a job this owner holds after it failed or was interrupted.
+        Returns True if it will be tried again, False once it has run out of
+        attempts (or `retry` is off) and is marked failed.
+        """
+        now = time.time()
+        with self._lock:
+            cursor = self._conn.execute(
+                "UPDATE jobs SET status = CASE WHEN ? AND attempts < max_attempts"
+                " THEN ? ELSE ? END, owner = NULL, lease_until = NULL, last_error = ?,"
+                " updated_at = ? WHERE id = ? AND status = ? AND owner = ?",
+                (
+                    retry,
+                    STATUS_PENDING,
+                    STATUS_FAILED,
+                    error,
+                    now,
+                    job_id,
+                    STATUS_LEASED,
+                    self.owner,
+                ),
+            )
+            if not cursor.rowcount:
+                return False
+            row = self._conn.execute(
+                "SELECT status FROM jobs WHERE id = ?", (job_id,)
+            ).fetchone()
+        return row is not None and row["status"] == STATUS_PENDING
+
+    def abandon(self, job_id: int, error: str) -> bool:
+        """
+        Mark a job failed that was interrupted by a process that is gone, if it
+        is still unfinished and nobody holds a current lease on it.
+        """
+        now = time.time()
+        with self._lock:
+            cursor = self._conn.execute(
+                "UPDATE jobs SET status = ?, owner = NULL, lease_until = NULL,"
+                " last_error = ?, updated_at = ? WHERE id = ? AND (status = ?"
+                " OR (status = ? AND lease_until < ?))",
+                (
+                    STATUS_FAILED,
+                    error,
+                    now,
+                    job_id,
+                    STATUS_PENDING,
+                    STATUS_LEASED,
+                    now,
+                ),
+            )
+            return cursor.rowcount == 1
+
+    def _finish(self, job_id: int, status: str, error: Optional[str]) -> None:
+        with self._lock:
+            self._conn.execute(
+                "UPDATE jobs SET status = ?, owner = NULL, lease_until = NULL,"
+                " last_error = ?, updated_at = ? WHERE id = ? AND status = ?"
+                " AND owner = ?",
+                (status, error, time.time(), job_id, STATUS_LEASED, self.owner),
+            )
+
+    def expire(self, queue: str, max_age: float = MAX_RESUME_AGE_SECONDS) -> int:
+        """Fail unfinished jobs in `queue` created more than `max_age` seconds ago."""
+        now = time.time()
+        with self._lock:
+            cursor = self._conn.execute(
+                "UPDATE jobs SET status = ?, last_error = ?, updated_at = ?"
+                " WHERE queue = ? AND created_at < ? AND (status = ?"
+                " OR (status = ? AND lease_until < ?))",
+                (
+                    STATUS_FAILED,
+                    "expired",
+                    now,
+                    queue,
+                    now - max_age,
+                    STATUS_PENDING,
+                    STATUS_LEASED,
+                    now,
+                ),
+            )
+            return cursor.rowcount
+
+    def runnable(self, queue: str) -> List[StoredJob]:
+        """Jobs in `queue` that can be claimed now, by priority, then oldest first."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT * FROM jobs WHERE queue = ? AND (status = ?"
+                " OR (status = ? AND lease_until < ?)) ORDER BY priority DESC, id",
+                (queue, STATUS_PENDING, STATUS_LEASED, time.time()),
+            ).fetchall()
+        return [StoredJob.from_row(row) for row in rows]
+
+    def next_lease_expiry(self, queue: str) -> Optional[float]:
+        """When the earliest lease held by another owner in `queue` runs out."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT MIN(lease_until) AS expiry FROM jobs WHERE queue = ?"
+                " AND status = ? AND owner != ?",
+                (queue, STATUS_LEASED, self.owner),
+            ).fetchone()
+        return row["expiry"] if row is not None else None
+
+    def purge(self, older_than: float = DONE_RETENTION_SECONDS) -> int:
+        """Delete finished jobs last updated more than `older_than` seconds ago."""
+        with self._lock:
+            cursor = self._conn.execute(
+                "DELETE FROM jobs WHERE status IN (?, ?, ?) AND updated_at < ?",
+                (
+                    STATUS_DONE,
+                    STATUS_FAILED,
+                    STATUS_SUPERSEDED,
+                    time.time() - older_than,
+                ),
+            )
+            return cursor.rowcount
+
+    def counts(self, queue: str) -> Dict[str, int]:
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT status, COUNT(*) AS n FROM jobs WHERE queue = ?"
+                " GROUP BY status",
+                (queue,),
+            ).fetchall()
+        return {row["status"]: row["n"] for row in rows}
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+_stores: Dict[str, JobStore] = {}
+_stores_lock = threading.Lock()
+
+
+def get_job_store(path: str = DEFAULT_JOB_QUEUE_PATH) -> JobStore:
+    """The process-wide store for `path`, opened on first use."""
+    with _stores_lock:
+        store = _stores.get(path)
+        if store is None:
+            store = JobStore(path)
+            _stores[path] = store
+        return store
+
+
+class DurableJobsMixin(LifecycleMixin):
+    """
+    Gives an extension durable background jobs run by its `tasks` supervisor.
+
+    `JOB_HANDLERS` maps each job kind to a JobHandler naming the coroutine
+    method that handles it, or just the method name for a kind that isn't
+    idempotent. Handlers are looked up by name when the job runs, so a
+    reloaded class handles jobs recorded by its predecessor.
+    """
+
+    JOB_HANDLERS: Dict[str, Union[str, JobHandler]] = {}
+    JOB_QUEUE_PATH: Optional[str] = None
+    JOB_MAX_ATTEMPTS = DEFAULT_MAX_ATTEMPTS
+
+    @property
+    def job_store(self) -> JobStore:
+        return get_job_store(self.JOB_QUEUE_PATH or DEFAULT_JOB_QUEUE_PATH)
+
+    def job_handler(self, kind: str) -> JobHandler:
+        handler = self.JOB_HANDLERS[kind]
+        return JobHandler(handler) if isinstance(handler, str) else handler
+
+    @property
+    def job_queue_name(self) -> str:
+        return str(getattr(self, "extension_id", type(self).__name__))
+
+    async def submit_job(
+        self,
+        kind: str,
+        payload: Dict[str, Any],
+        device_id: Optional[str] = None,
+        idempotency_key: Optional[str] = None,
+        priority: int = PRIORITY_NORMAL,
+        deadline: Optional[float] = None,
+        supersede_key: Optional[Hashable] = None,
+        cancel_running: bool = True,
+    ) -> None:
+        """
+        Record a job and start it through the supervisor. The arguments after
+        `payload` mean the same as for `TaskSupervisor.submit`. If the store
+        can't be written the job still runs, just without surviving a restart.
+        """
+        if kind not in self.JOB_HANDLERS:
+            raise ValueError(f"No handler registered for job kind {kind!r}")
+        if self.accepting_work:
+            await self.resume_jobs()
+        try:
+            job = await asyncio.to_thread(
+                self.job_store.enqueue,
+                self.job_queue_name,
+                kind,
+                payload,
+                idempotency_key=idempotency_key,
+                supersede_key=supersede_key,
+                supersede_running=cancel_running,
+                device_id=device_id,
+                priority=priority,
+                deadline=deadline,
+                max_attempts=self.JOB_MAX_ATTEMPTS,
+            )
+        except Exception as e:
+            log.error(
+                f"[{self.job_queue_name}] Could not record {kind} job, "
+                f"running it in memory only: {e}",
+                exc_info=True,
+            )
+            self.tasks.submit(
+                getattr(self, self.job_handler(kind).method)(**payload),
+                device_id=device_id,
+                priority=priority,
+                deadline=deadline,
+                supersede_key=supersede_key,
+                cancel_running=cancel_running,
+                on_superseded=lambda: self.on_job_superseded(kind, payload),
+            )
+            return
+
+        if job is None:
+            log.info(
+                f"[{self.job_queue_name}] Ignoring duplicate {kind} job "
+                f"{idempotency_key}"
+            )
+            return
+        if not self.accepting_work:
+            log.info(
+                f"[{self.job_queue_name}] Stopping; {kind} job {job.id} "
+                "left for the next start"
+            )
+            return
+        self._dispatch_stored_job(job, cancel_running=cancel_running)
+
+    async def on_start(self) -> None:
+        await super().on_start()
+        await self.resume_jobs()
+
+    async def take_over(self) -> None:
+        """Start the jobs the replaced instance released while stopping."""
+        await super().take_over()
+        if self.accepting_work:
+            await self._resume_runnable_jobs()
+
+    async def resume_jobs(self) -> int:
+        """
+        Start the jobs a previous process left unfinished. Only the first call
+        does anything; returns how many jobs were resumed.
+        """
+        if self.__dict__.get("_jobs_resumed"):
+            return 0
+        self._jobs_resumed = True
+        try:
+            await asyncio.to_thread(self.job_store.purge)
+            expired = await asyncio.to_thread(
+                self.job_store.expire, self.job_queue_name
+            )
+            if expired:
+                log.info(f"[{self.job_queue_name}] Gave up {expired} stale job(s)")
+        except Exception as e:
+            log.warning(f"[{self.job_queue_name}] Could not tidy stored jobs: {e}")
+        return await self._resume_runnable_jobs()
+
+    async def _resume_runnable_jobs(self) -> int:
+        try:
+            jobs = await asyncio.to_thread(self.job_store.runnable, self.job_queue_name)
+            expiry = await asyncio.to_thread(
+                self.job_store.next_lease_expiry, self.job_queue_name
+            )
+        except Exception as e:
+            log.error(f"[{self.job_queue_name}] Could not read stored jobs: {e}")
+            return 0
+
+        resumed = 0
+        for job in jobs:
+            if job.kind in self.JOB_HANDLERS and not self._can_rerun(job):
+                # Started before but never finished; it may have had its effect
+                if await asyncio.to_thread(
+                    self.job_store.abandon, job.id, "interrupted"
+                ):
+                    log.warning(
+                        f"[{self.job_queue_name}] Not resuming interrupted "
+                        f"{job.kind} job {job.id}; it isn't idempotent"
+                    )
+                continue
+            if self._dispatch_stored_job(job):
+                resumed += 1
+        if resumed:
+            log.info(f"[{self.job_queue_name}] Resumed {resumed} unfinished job(s)")
+        if expiry is not None:
+            # Jobs still leased to a process that may have died; look again
+            # once the lease runs out
+            delay = max(expiry - time.time(), 0) + 1
+            asyncio.get_running_loop().call_later(delay, self._schedule_resume)
+        return resumed
+
+    def _can_rerun(self, job: StoredJob) -> bool:
+        """Whether `job` may run (again): it never started, or is idempotent."""
+        return job.attempts == 0 or self.job_handler(job.kind).idempotent
+
+    def _schedule_resume(self) -> None:
+        if self.accepting_work:
+            self.tasks.submit(self._resume_runnable_jobs())
+
+    def _dispatch_stored_job(
+        self, job: StoredJob, cancel_running: bool = True, supersede: bool = True
+    ) -> bool:
+        dispatched: Set[int] = self.__dict__.setdefault("_dispatched_job_ids", set())
+        if job.id in dispatched or not self.accepting_work:
+            return False
+        if job.kind not in self.JOB_HANDLERS:
+            log.error(
+                f"[{self.job_queue_name}] No handler for stored {job.kind} job {job.id}"
+            )
+            return False
+        dispatched.add(job.id)
+        self.tasks.submit(
+            self._run_stored_job(job),
+            device_id=job.device_id,
+            priority=job.priority,
+            deadline=job.deadline,
+            name=f"{job.kind}#{job.id}",
+            supersede_key=job.supersede_key if supersede else None,
+            cancel_running=cancel_running,
+            on_superseded=lambda: self.on_job_superseded(job.kind, job.payload),
+        )
+        return True
+
+    async def on_job_superseded(self, kind: str, payload: Dict[str, Any]) -> None:
+        """
+        Called once a newer job with the same supersede key has replaced a
+        `kind` job, whether it had started or not, or once a full supervisor
+        queue dropped it unstarted. Override to give the request a final
+        notification.
+        """
+
+    async def _run_stored_job(self, job: StoredJob) -> None:
+        store = self.job_store
+        try:
+            if not await asyncio.to_thread(store.claim, job.id):
+                # Finished, superseded or taken by another process meanwhile
+                return
+            job_handler = self.job_handler(job.kind)
+            handler = getattr(self, job_handler.method)
+            try:
+                await handler(**job.payload)
+            except asyncio.CancelledError:
+                # Superseded jobs are already marked in the store and stay
+                # finished. One interrupted by shutdown is left for the next
+                # start if it is idempotent; one that missed its deadline is
+                # failed. Synchronous so it is recorded even as the loop winds
+                # down.
+                stopping = not self.accepting_work
+                store.release(
+                    job.id,
+                    "interrupted by shutdown" if stopping else "deadline exceeded",
+                    retry=stopping and job_handler.idempotent,
+                )
+                raise
+            except Exception as e:
+                if await asyncio.to_thread(
+                    store.release, job.id, repr(e), job_handler.idempotent
+                ):
+                    delay = RETRY_BACKOFF_SECONDS * 2**job.attempts
+                    log.warning(
+                        f"[{self.job_queue_name}] {job.kind} job {job.id} failed, "
+                        f"retrying in {delay:.0f}s: {e!r}"
+                    )
+                    job.attempts += 1
+                    asyncio.get_running_loop().call_later(
+                        delay, self._redispatch_stored_job, job
+                    )
+                    return
+                raise
+            await asyncio.to_thread(store.complete, job.id)
+        finally:
+            self.__dict__.get("_dispatched_job_ids", set()).discard(job.id)
+
+    def _redispatch_stored_job(self, job: StoredJob) -> None:
+        # A retry must not supersede newer work with the same key; if a newer
+        # job superseded this one meanwhile, the claim fails and it is dropped
+        self._dispatch_stored_job(job, supersede=False)
+
+    def job_stats(self) -> Dict[str, int]:
+        return self.job_store.counts(self.job_queue_name)
@@ -0,0 +1,116 @@
+"""
+LRU cache of per-account resources that are closed once nobody uses them.
+
+Clients and per-tenant state hold connection pools, so a bounded cache keeps
+one per account and closes the least recently used when it grows too large.
+A value evicted while a request or background job is still using it must not
+be closed under that user: callers take a lease for as long as they use the
+value, and an evicted value is closed when its last lease is released.
+
+Usage:
+    self.anthropic_clients = LeasedCache(lambda client: client.close())
+
+    with self.anthropic_clients.lease(
+        api_key, lambda: anthropic.AsyncAnthropic(api_key=api_key)
+    ) as client:
+        response = await client.messages.create(...)
+
+    # When the extension stops
+    await self.anthropic_clients.close()
+"""
+
+import asyncio
+import logging
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Awaitable, Callable, Generic, Iterator, Set, TypeVar
+
+log = logging.getLogger(__name__)
+
+V = TypeVar("V")
+
+DEFAULT_MAX_ENTRIES = 32
+
+
+class _Slot(Generic[V]):
+    __slots__ = ("value", "leases", "evicted")
+
+    def __init__(self, value: V):
+        self.value = value
+        self.leases = 0
+        self.evicted = False
+
+
+class LeasedCache(Generic[V]):
+    """LRU cache of values keyed by account, closed when evicted and unused."""
+
+    def __init__(
+        self,
+        close: Callable[[V], Awaitable[None]],
+        max_entries: int = DEFAULT_MAX_ENTRIES,
+        name: str = "resource",
+    ):
+        self.max_entries = max_entries
+        self.name = name
+        self._close = close
+        self._slots: "OrderedDict[str, _Slot[V]]" = OrderedDict()
+        # Evicted values still leased; closed on their last release
+        self._retired: Set[_Slot[V]] = set()
+        # Referenced so pending closes aren't garbage collected, and awaited on close
+        self._closing: Set["asyncio.Task[None]"] = set()
+
+    def __len__(self) -> int:
+        return len(self._slots)
+
+    @contextmanager
+    def lease(self, key: str, create: Callable[[], V]) -> Iterator[V]:
+        """
+        Use the value for `key`, creating it with `create` on a miss. The value
+        stays open until the block exits, even if it is evicted meanwhile.
+        """
+        slot = self._slots.get(key)
+        if slot is None:
+            slot = self._slots[key] = _Slot(create())
+        self._slots.move_to_end(key)
+        slot.leases += 1
+        try:
+            self._evict()
+            yield slot.value
+        finally:
+            slot.leases -= 1
+            if slot.evicted and not slot.leases:
+                self._retired.discard(slot)
+                self._schedule_close(slot.value)
+
+    def _evict(self) -> None:
+        while len(self._slots) > self.max_entries:
+            _, slot = self._slots.popitem(last=False)
+            slot.evicted = True
+            if slot.leases:
+                self._retired.add(slot)
+            else:
+                self._schedule_close(slot.value)
+
+    def _schedule_close(self, value: V) -> None:
+        task = asyncio.create_task(self._close_quietly(value))
+        self._closing.add(task)
+        task.add_done_callback(self._closing.discard)
+
+    async def _close_quietly(self, value: V) -> None:
+        try:
+            await self._close(value)
+        except Exception as e:
+            log.warning(f"Error closing {self.name}: {e}")
+
+    async def close(self) -> None:
+        """Close every value, leased or not, and wait for pending closes."""
+        slots = list(self._slots.values()) + list(self._retired)
+        self._slots.clear()
+        self._retired.clear()
+        for slot in slots:
+            # Already handled here; a lease released later mustn't close it again
+            slot.leases = 0
+            slot.evicted = False
+            await self._close_quietly(slot.value)
+        if self._closing:
+            await asyncio.gather(*self._closing)
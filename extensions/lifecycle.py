@@ -0,0 +1,101 @@
+"""
+Start, drain and stop for extensions.
+
+Extensions hand their background work to a TaskSupervisor and often hold
+pooled resources (HTTP sessions, LLM clients, worker processes). Whoever
+loads an extension — the server on reload, the local runner — drives it
+through these steps:
+
+    await extension.start()   # resume stored work, start schedulers
+    ...                       # serve events
+    await extension.stop()    # refuse new work, let in-flight work finish
+                              # within a deadline, close pooled resources
+
+When replacing an extension with a newer instance, route events to the new
+instance and start it before stopping the old one, so nothing is refused
+while the old one drains. Once the old one has stopped, call `take_over()` on
+the new one to pick up the work its predecessor left behind:
+
+    await new.start()
+    await old.stop()
+    await new.take_over()
+
+Extensions override `on_start`, `take_over` and `close_resources`, calling
+super().
+"""
+
+import logging
+from typing import Optional, cast
+
+from extensions.task_supervisor import BackgroundTasksMixin
+
+log = logging.getLogger(__name__)
+
+DEFAULT_DRAIN_TIMEOUT_SECONDS = 30
+
+STATE_CREATED = "created"
+STATE_RUNNING = "running"
+STATE_DRAINING = "draining"
+STATE_STOPPED = "stopped"
+
+
+class LifecycleMixin(BackgroundTasksMixin):
+    """
+    Adds `start`, `drain` and `stop` to an extension using a `tasks` supervisor.
+    Each step is safe to call more than once.
+    """
+
+    DRAIN_TIMEOUT_SECONDS = DEFAULT_DRAIN_TIMEOUT_SECONDS
+
+    @property
+    def lifecycle_state(self) -> str:
+        return cast(str, self.__dict__.get("_lifecycle_state", STATE_CREATED))
+
+    @property
+    def accepting_work(self) -> bool:
+        return self.lifecycle_state in (STATE_CREATED, STATE_RUNNING)
+
+    async def start(self) -> None:
+        if self.lifecycle_state != STATE_CREATED:
+            return
+        self._lifecycle_state = STATE_RUNNING
+        await self.on_start()
+
+    async def on_start(self) -> None:
+        """Hook run once by `start`."""
+
+    async def take_over(self) -> None:
+        """Hook run once the instance this one replaced has stopped."""
+
+    async def drain(self, timeout: Optional[float] = None) -> bool:
+        """
+        Refuse new background work and wait up to `timeout` seconds (by
+        default DRAIN_TIMEOUT_SECONDS) for in-flight work, cancelling what is
+        left. Returns True if everything finished in time.
+        """
+        if self.lifecycle_state == STATE_STOPPED:
+            return True
+        self._lifecycle_state = STATE_DRAINING
+        timeout = self.DRAIN_TIMEOUT_SECONDS if timeout is None else timeout
+        name = getattr(self, "extension_id", type(self).__name__)
+        log.info(f"[{name}] Draining background work (up to {timeout}s)")
+        drained = await self.tasks.shutdown(timeout)
+        if not drained:
+            log.warning(f"[{name}] Background work cancelled after {timeout}s")
+        return drained
+
+    async def stop(self, timeout: Optional[float] = None) -> bool:
+        """Drain, then close pooled resources. Returns what `drain` returned."""
+        if self.lifecycle_state == STATE_STOPPED:
+            return True
+        drained = await self.drain(timeout)
+        try:
+            await self.close_resources()
+        except Exception as e:
+            name = getattr(self, "extension_id", type(self).__name__)
+            log.error(f"[{name}] Error closing resources: {e}", exc_info=True)
+        self._lifecycle_state = STATE_STOPPED
+        return drained
+
+    async def close_resources(self) -> None:
+        """Hook run by `stop` once background work has drained."""
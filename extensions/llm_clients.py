@@ -0,0 +1,41 @@
+"""
+Pooled Anthropic clients.
+
+Each AsyncAnthropic client holds its own HTTP connection pool. Creating one per
+request leaves those connections open until garbage collection; keeping one
+per API key reuses them, and `close()` shuts them all down when the extension
+stops. A client evicted from the pool is closed once the last request using
+it is done.
+"""
+
+from contextlib import contextmanager
+from typing import Iterator
+
+import anthropic
+
+from extensions.leased_cache import LeasedCache
+
+DEFAULT_MAX_CLIENTS = 32
+
+
+class AnthropicClientPool:
+    """LRU cache of AsyncAnthropic clients keyed by API key."""
+
+    def __init__(self, max_clients: int = DEFAULT_MAX_CLIENTS):
+        self._clients: LeasedCache[anthropic.AsyncAnthropic] = LeasedCache(
+            anthropic.AsyncAnthropic.close,
+            max_entries=max_clients,
+            name="Anthropic client",
+        )
+
+    @contextmanager
+    def lease(self, api_key: str) -> Iterator[anthropic.AsyncAnthropic]:
+        """Use the client for `api_key` until the block exits."""
+        with self._clients.lease(
+            api_key, lambda: anthropic.AsyncAnthropic(api_key=api_key)
+        ) as client:
+            yield client
+
+    async def close(self) -> None:
+        """Close every pooled client's connections."""
+        await self._clients.close()
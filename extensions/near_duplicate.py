@@ -0,0 +1,149 @@
+"""
+Near-duplicate detection for copied text.
+
+Texts are fingerprinted with a 64-bit SimHash over word shingles. Recent
+fingerprints are kept in a bounded LSH index: all 64 bits of each fingerprint
+are split into `max_distance + 1` bands, so any two fingerprints within
+`max_distance` bits of each other share at least one identical band and lookups
+only compare against the few candidates in matching buckets.
+"""
+
+import hashlib
+import re
+from collections import OrderedDict
+from typing import Dict, Generic, Hashable, List, NamedTuple, Optional, Set, TypeVar
+
+FINGERPRINT_BITS = 64
+
+K = TypeVar("K", bound=Hashable)
+
+_TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+
+
+def _hash64(value: str) -> int:
+    return int.from_bytes(
+        hashlib.blake2b(value.encode("utf-8"), digest_size=8).digest(), "big"
+    )
+
+
+def simhash(text: str, shingle_size: int = 3) -> int:
+    """Return the 64-bit SimHash of `text`, ignoring case, punctuation and spacing."""
+    tokens = _TOKEN_RE.findall(text.lower())
+    if len(tokens) >= shingle_size:
+        features = [
+            " ".join(tokens[i : i + shingle_size])
+            for i in range(len(tokens) - shingle_size + 1)
+        ]
+    else:
+        features = tokens
+
+    weights = [0] * FINGERPRINT_BITS
+    for feature in features:
+        h = _hash64(feature)
+        for bit in range(FINGERPRINT_BITS):
+            weights[bit] += 1 if h >> bit & 1 else -1
+
+    fingerprint = 0
+    for bit, weight in enumerate(weights):
+        if weight > 0:
+            fingerprint |= 1 << bit
+    return fingerprint
+
+
+def hamming_distance(a: int, b: int) -> int:
+    return bin(a ^ b).count("1")
+
+
+class DuplicateMatch(NamedTuple, Generic[K]):
+    key: K
+    distance: int
+    copy_count: int
+
+
+class NearDuplicateIndex(Generic[K]):
+    """
+    In-memory index over the most recent `max_entries` texts, each under a key
+    of type K.
+
+    Usage:
+        index = NearDuplicateIndex()
+        match = index.find(text)
+        if match:
+            index.record_hit(match.key)
+        else:
+            index.add(record_id, text)
+    """
+
+    def __init__(self, max_entries: int = 500, max_distance: int = 6):
+        self.max_entries = max_entries
+        self.max_distance = max_distance
+        self._bands = max_distance + 1
+        self._band_bits = FINGERPRINT_BITS // self._bands
+        self._fingerprints: "OrderedDict[K, int]" = OrderedDict()
+        self._counts: Dict[K, int] = {}
+        self._buckets: List[Dict[int, Set[K]]] = [{} for _ in range(self._bands)]
+
+    def __len__(self) -> int:
+        return len(self._fingerprints)
+
+    def _band_values(self, fingerprint: int) -> List[int]:
+        mask = (1 << self._band_bits) - 1
+        values = [
+            fingerprint >> (band * self._band_bits) & mask
+            for band in range(self._bands - 1)
+        ]
+        # The last band also takes the bits left over by the division
+        values.append(fingerprint >> ((self._bands - 1) * self._band_bits))
+        return values
+
+    def find(self, text: str) -> Optional[DuplicateMatch[K]]:
+        """Return the closest indexed text within `max_distance`, if any."""
+        return self.find_fingerprint(simhash(text))
+
+    def find_fingerprint(self, fingerprint: int) -> Optional[DuplicateMatch[K]]:
+        candidates: Set[K] = set()
+        for band, value in enumerate(self._band_values(fingerprint)):
+            candidates |= self._buckets[band].get(value, set())
+
+        best: Optional[DuplicateMatch[K]] = None
+        for key in candidates:
+            distance = hamming_distance(fingerprint, self._fingerprints[key])
+            if distance <= self.max_distance and (
+                best is None or distance < best.distance
+            ):
+                best = DuplicateMatch(key, distance, self._counts[key])
+        return best
+
+    def add(self, key: K, text: str, count: int = 1) -> int:
+        """Index `text` under `key`, evicting the oldest entry when full."""
+        fingerprint = simhash(text)
+        self.add_fingerprint(key, fingerprint, count)
+        return fingerprint
+
+    def add_fingerprint(self, key: K, fingerprint: int, count: int = 1) -> None:
+        if key in self._fingerprints:
+            self.remove(key)
+        self._fingerprints[key] = fingerprint
+        self._counts[key] = count
+        for band, value in enumerate(self._band_values(fingerprint)):
+            self._buckets[band].setdefault(value, set()).add(key)
+        while len(self._fingerprints) > self.max_entries:
+            self.remove(next(iter(self._fingerprints)))
+
+    def record_hit(self, key: K) -> int:
+        """Count another occurrence of `key`, mark it recent and return its count."""
+        self._counts[key] += 1
+        self._fingerprints.move_to_end(key)
+        return self._counts[key]
+
+    def remove(self, key: K) -> None:
+        fingerprint = self._fingerprints.pop(key, None)
+        if fingerprint is None:
+            return
+        self._counts.pop(key, None)
+        for band, value in enumerate(self._band_values(fingerprint)):
+            bucket = self._buckets[band].get(value)
+            if bucket is not None:
+                bucket.discard(key)
+                if not bucket:
+                    del self._buckets[band][value]
@@ -1,6 +1,5 @@
-import asyncio
 import logging
-from typing import Any, Dict
+from typing import Any, Dict, List
 
 from tabtabtab_lib.extension_interface import (
     ExtensionInterface,
@@ -17,8 +16,22 @@ from extensions.mcp_extension_lib import (
     DEFAULT_MAX_TOKENS,
     DEFAULT_TEMPERATURE,
 )
-import anthropic
 from extension_constants import EXTENSION_DEPENDENCIES
+from extensions.single_flight import SingleFlight, flight_key
+from extensions.job_queue import DurableJobsMixin
+from extensions.llm_clients import AnthropicClientPool
+from extensions.relevance import (
+    DEVELOPER_APPS,
+    PASSWORD_MANAGERS,
+    AppRule,
+    CheckRule,
+    KeywordRule,
+    RelevanceClassifier,
+    is_url_only,
+    looks_like_code,
+    looks_like_secret,
+    word_count_below,
+)
 
 # Configure logging
 logging.basicConfig(
@@ -27,6 +40,9 @@ logging.basicConfig(
 
 logger = logging.getLogger(__name__)
 
+# Background work for a copy or paste is abandoned after this long
+BACKGROUND_TASK_DEADLINE_SECONDS = 120
+
 # Define tools that might be disabled during paste, if any.
 # Example: PASTE_DISABLED_TOOLS = {"create_page", "update_page"}
 PASTE_DISABLED_TOOLS = set(
@@ -34,12 +50,53 @@ PASTE_DISABLED_TOOLS = set(
 )  # Adjust as needed for Notion tools
 NOTION_NOTIFICATION_TITLE = "Notion"
 
+# The same text pushed from two devices at once is only added to Notion once
+_pushes_in_flight = SingleFlight("notion")
+
+# Most prose is worth keeping; skip what is clearly not a note before
+# starting an agent run
+NOTION_RELEVANCE = RelevanceClassifier(
+    "notion",
+    prior=0.6,
+    rules=[
+        KeywordRule("note_keyword", ["note", "notes", "todo", "idea", "remember"], 0.3),
+        CheckRule("too_short", word_count_below(4), -0.7),
+        CheckRule("code", looks_like_code, -0.7),
+        CheckRule("secret", looks_like_secret, -1.0),
+        CheckRule("url_only", is_url_only, -0.6),
+        # Text copied out of Notion is already there
+        AppRule("notion_app", ["notion.id"], -0.9),
+        AppRule("developer_app", DEVELOPER_APPS, -0.6),
+        AppRule("password_manager", PASSWORD_MANAGERS, -1.0),
+    ],
+)
+
 
-class NotionMCPExtension(ExtensionInterface):
+class NotionMCPExtension(DurableJobsMixin, ExtensionInterface):
     """
     TabTabTab extension that integrates with Notion via MCP (Model Context Protocol)
     """
 
+    # Copies queue behind a running push so a burst can be merged into one
+    MAX_TASKS_PER_DEVICE = 1
+    # Not idempotent: running it again would add the text to the page twice
+    JOB_HANDLERS = {"push": "_process_pending_copies"}
+    # Handed to the new instance on a hot reload
+    TRANSFERABLE_STATE = ("anthropic_clients",)
+    # Shared with the new instance on a hot reload, so a push the old instance
+    # still runs clears the texts it carries for both
+    SHARED_STATE = ("_pending_copies",)
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        # Copied texts not yet picked up by a push, per device
+        self._pending_copies: Dict[str, List[str]] = {}
+        self.anthropic_clients = AnthropicClientPool()
+
+    async def close_resources(self) -> None:
+        await super().close_resources()
+        await self.anthropic_clients.close()
+
     async def on_context_request(
         self, source_extension_id: str, context_query: Dict[str, Any]
     ) -> OnContextResponse:
@@ -65,14 +122,36 @@ class NotionMCPExtension(ExtensionInterface):
             )
             return None
 
+        relevance = NOTION_RELEVANCE.classify(selected_text, context.get("window_info"))
+        if not relevance.relevant:
+            logger.info(
+                f"{self.extension_id}: Skipping copy, not note-like "
+                f"({', '.join(relevance.reasons)}) (Request ID: {request_id})"
+            )
+            return None
+
         # Start background processing, passing dependencies
         logger.info(
             f"{self.extension_id}: Starting background processing for copy (Request ID: {request_id})"
         )
-        asyncio.create_task(
-            self._process_in_background(
-                request_id, selected_text, device_id, dependencies
-            )
+        # A queued push for this device is replaced by one that also carries its
+        # text; a push that has already started is left to finish. Each push
+        # records the texts it carries so it can be resumed after a restart.
+        pending = self._pending_copies.setdefault(device_id, [])
+        pending.append(selected_text)
+        await self.submit_job(
+            "push",
+            {
+                "request_id": request_id,
+                "device_id": device_id,
+                "dependencies": dependencies,
+                "texts": list(pending),
+            },
+            device_id=device_id,
+            idempotency_key=f"copy:{request_id}",
+            deadline=BACKGROUND_TASK_DEADLINE_SECONDS,
+            supersede_key=("copy", device_id),
+            cancel_running=False,
         )
 
         # Return pending notification immediately
@@ -90,6 +169,43 @@ class NotionMCPExtension(ExtensionInterface):
         # We don't provide paste based functionality for Notion
         return None
 
+    async def on_job_superseded(self, kind: str, payload: Dict[str, Any]) -> None:
+        """A queued push replaced by a newer one; its texts go with the newer push."""
+        await self.send_push_notification(
+            device_id=payload["device_id"],
+            notification=Notification(
+                request_id=payload["request_id"],
+                title=NOTION_NOTIFICATION_TITLE,
+                detail="Replaced by a newer copy",
+                content="Will be added to Notion together with the newer copy",
+                status=NotificationStatus.INFO,
+            ),
+        )
+
+    async def _process_pending_copies(
+        self,
+        request_id: str,
+        device_id: str,
+        dependencies: Dict[str, Any],
+        texts: List[str],
+    ) -> None:
+        """Push every text copied on the device since the last push started."""
+        # Copies made from now on go to the next push
+        self._pending_copies.pop(device_id, None)
+        if not texts:
+            return
+        if len(texts) > 1:
+            logger.info(
+                f"{self.extension_id}: Merging {len(texts)} copies into one push "
+                f"(Request ID: {request_id})"
+            )
+            text = "\n\n".join(
+                f"Snippet {i + 1}:\n{snippet}" for i, snippet in enumerate(texts)
+            )
+        else:
+            text = texts[0]
+        await self._process_in_background(request_id, text, device_id, dependencies)
+
     async def _process_in_background(
         self,
         request_id: str,
@@ -107,18 +223,93 @@ class NotionMCPExtension(ExtensionInterface):
         final_notification: Notification = None
 
         try:
+            notion_mcp_url = dependencies[EXTENSION_DEPENDENCIES.notion_mcp_url.name]
+            anthropic_api_key = dependencies[
+                EXTENSION_DEPENDENCIES.anthropic_api_key.name
+            ]
+            # Progress goes to the request that started the push; requests that
+            # join it only get the final result
+            final_content = await _pushes_in_flight.do(
+                flight_key(self.extension_id, text, notion_mcp_url, anthropic_api_key),
+                lambda: self._push_to_notion(
+                    text,
+                    notion_mcp_url,
+                    anthropic_api_key,
+                    log_prefix,
+                    request_id,
+                    device_id,
+                ),
+            )
+
+            final_notification = Notification(
+                request_id=request_id,
+                title=NOTION_NOTIFICATION_TITLE,
+                detail="Here's what we found in Notion based on your request:",
+                content=final_content,
+                status=NotificationStatus.READY,
+            )
+
+        except ValueError as e:
+            logger.error(f"{log_prefix}: Initialization Error - {e}", exc_info=True)
+            final_notification = Notification(
+                request_id=request_id,
+                title=NOTION_NOTIFICATION_TITLE,
+                detail="Initialization Error",
+                content=f"Failed to initialize Notion connection: {str(e)}",
+                status=NotificationStatus.ERROR,
+            )
+        except Exception as e:
+            logger.error(f"{log_prefix}: Error during processing: {e}", exc_info=True)
+            final_notification = Notification(
+                request_id=request_id,
+                title=NOTION_NOTIFICATION_TITLE,
+                detail="Processing Error",
+                content=f"Error: {str(e)}",
+                status=NotificationStatus.ERROR,
+            )
+
+        if final_notification:
+            logger.info(
+                f"{log_prefix}: Sending final notification (Status: {final_notification.status})."
+            )
+            try:
+                await self.send_push_notification(
+                    device_id=device_id,
+                    notification=final_notification,
+                )
+                logger.info(f"{log_prefix}: Final notification sent successfully.")
+            except Exception as e:
+                logger.error(
+                    f"{log_prefix}: Failed to send final notification: {e}",
+                    exc_info=True,
+                )
+        else:
+            logger.error(
+                f"{log_prefix}: Processing finished but no final notification was generated."
+            )
+
+    async def _push_to_notion(
+        self,
+        text: str,
+        notion_mcp_url: str,
+        anthropic_api_key: str,
+        log_prefix: str,
+        request_id: str,
+        device_id: str,
+    ) -> str:
+        """
+        Runs the tool loop that adds `text` to Notion and returns the model's
+        final answer, pushing progress to the given request.
+        """
+        with self.anthropic_clients.lease(anthropic_api_key) as client:
             async with MCPToolProvider() as tool_provider:
                 logger.info(f"{log_prefix}: Initializing MCPToolProvider...")
-                await tool_provider.initialize(
-                    dependencies[EXTENSION_DEPENDENCIES.notion_mcp_url.name]
-                )
+                await tool_provider.initialize(notion_mcp_url)
                 logger.info(
                     f"{log_prefix}: MCPToolProvider initialized. Processing text..."
                 )
 
-                client = anthropic.Anthropic(
-                    api_key=dependencies[EXTENSION_DEPENDENCIES.anthropic_api_key.name]
-                )
+                # Async so that cancelling this task also cancels the request in flight
 
                 tools_dict = await tool_provider.get_tools_as_dicts([])
                 tools_dict = [
@@ -133,8 +324,10 @@ class NotionMCPExtension(ExtensionInterface):
                 Given this text: {text}
 
                 I would like to add the following text to my Notion page,
-                search for the page that is relevant to the text, and add the text to the page.
-                If no relevant page is found, pick one page of the available pages and add the text there.
+                search for the page that is relevant to the text,
+                and add the text to the page.
+                If no relevant page is found, pick one page of the available pages
+                and add the text there.
                 """
 
                 messages = [
@@ -143,11 +336,16 @@ class NotionMCPExtension(ExtensionInterface):
 
                 while True:
                     # Make a direct call to Anthropic using tools parameter
-                    response = client.messages.create(
+                    response = await client.messages.create(
                         model=DEFAULT_MODEL,
                         max_tokens=DEFAULT_MAX_TOKENS,
                         temperature=DEFAULT_TEMPERATURE,
-                        system="You are a helpful assistant specialized in Notion queries and actions. You can use the following tools to interact with Notion.",  # Notion-specific system prompt
+                        # Notion-specific system prompt
+                        system=(
+                            "You are a helpful assistant specialized in Notion "
+                            "queries and actions. You can use the following tools to "
+                            "interact with Notion."
+                        ),
                         tools=tools_dict,
                         messages=messages,
                     )
@@ -180,52 +378,5 @@ class NotionMCPExtension(ExtensionInterface):
                         }
                     )
 
-                final_content = result
-                logger.info(f"{self.extension_id}: Final content: {final_content}")
-
-                final_notification = Notification(
-                    request_id=request_id,
-                    title=NOTION_NOTIFICATION_TITLE,
-                    detail="Here's what we found in Notion based on your request:",
-                    content=final_content,
-                    status=NotificationStatus.READY,
-                )
-
-        except ValueError as e:
-            logger.error(f"{log_prefix}: Initialization Error - {e}", exc_info=True)
-            final_notification = Notification(
-                request_id=request_id,
-                title=NOTION_NOTIFICATION_TITLE,
-                detail="Initialization Error",
-                content=f"Failed to initialize Notion connection: {str(e)}",
-                status=NotificationStatus.ERROR,
-            )
-        except Exception as e:
-            logger.error(f"{log_prefix}: Error during processing: {e}", exc_info=True)
-            final_notification = Notification(
-                request_id=request_id,
-                title=NOTION_NOTIFICATION_TITLE,
-                detail="Processing Error",
-                content=f"Error: {str(e)}",
-                status=NotificationStatus.ERROR,
-            )
-
-        if final_notification:
-            logger.info(
-                f"{log_prefix}: Sending final notification (Status: {final_notification.status})."
-            )
-            try:
-                await self.send_push_notification(
-                    device_id=device_id,
-                    notification=final_notification,
-                )
-                logger.info(f"{log_prefix}: Final notification sent successfully.")
-            except Exception as e:
-                logger.error(
-                    f"{log_prefix}: Failed to send final notification: {e}",
-                    exc_info=True,
-                )
-        else:
-            logger.error(
-                f"{log_prefix}: Processing finished but no final notification was generated."
-            )
+                logger.info(f"{self.extension_id}: Final content: {result}")
+                return result
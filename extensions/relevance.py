@@ -0,0 +1,242 @@
+"""
+Offline relevance prefilter for extension events.
+
+Extensions whose copy or paste handling starts an MCP or LLM agent run use a
+RelevanceClassifier to decide, in microseconds and without network calls,
+whether an event is worth that cost. A classifier combines rules:
+
+    KeywordRule   whole-word keyword matches ("time" but not "sometimes")
+    PatternRule   regular expressions, e.g. DATE_PATTERN and TIME_PATTERN
+    AppRule       the frontmost app's bundle id from window_info
+    CheckRule     any predicate on the text, e.g. looks_like_code
+
+Positive rule weights (0..1] are evidence for relevance and combine as
+independent signals: score = 1 - prod(1 - w), starting from `prior`. Negative
+weights [-1..0) scale the score down. An optional local `model`, any callable
+mapping text to a probability, is consulted only when the rules leave the
+score within `model_band` of uncertainty.
+
+Usage:
+    CALENDAR_RELEVANCE = RelevanceClassifier("calendar", rules=[...])
+
+    if not CALENDAR_RELEVANCE.is_relevant(text, window_info):
+        return None
+"""
+
+import re
+from typing import Any, Callable, Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+# Only the start of long texts is scored, so cost doesn't grow with the copy
+MAX_SCORED_CHARS = 2000
+
+DEFAULT_THRESHOLD = 0.5
+
+_MONTHS = (
+    r"jan(?:uary)?|feb(?:ruary)?|mar(?:ch)?|apr(?:il)?|may|june?|july?|"
+    r"aug(?:ust)?|sep(?:t(?:ember)?)?|oct(?:ober)?|nov(?:ember)?|dec(?:ember)?"
+)
+# "sat" and "sun" are left out: as words they are rarely days
+_WEEKDAYS = (
+    r"monday|tuesday|wednesday|thursday|friday|saturday|sunday|"
+    r"mon|tues?|wed|thu(?:rs?)?|fri"
+)
+
+# 2025-04-16, 16/04/2025, 4/16, April 16, 16th of April, next Monday, tomorrow
+DATE_PATTERN = re.compile(
+    r"\b(?:"
+    r"\d{4}-\d{1,2}-\d{1,2}"
+    r"|\d{1,2}/\d{1,2}(?:/\d{2,4})?"
+    rf"|(?:{_MONTHS})\.?\s+\d{{1,2}}(?:st|nd|rd|th)?\b"
+    rf"|\d{{1,2}}(?:st|nd|rd|th)?\s+(?:of\s+)?(?:{_MONTHS})\b"
+    rf"|(?:(?:next|this|last|on)\s+)?(?:{_WEEKDAYS})\b"
+    r"|today|tonight|tomorrow|yesterday|next\s+(?:week|month)"
+    r")",
+    re.IGNORECASE,
+)
+
+# 3pm, 3:30 pm, 15:30, at 5, noon, midnight
+TIME_PATTERN = re.compile(
+    r"\b(?:"
+    r"\d{1,2}(?::\d{2})?\s*(?:a\.?m\.?|p\.?m\.?)"
+    r"|(?:[01]?\d|2[0-3]):[0-5]\d"
+    r"|at\s+\d{1,2}\b"
+    r"|noon|midnight"
+    r")",
+    re.IGNORECASE,
+)
+
+_CODE_RE = re.compile(r"[{};]|=>|->|\bdef |\bfunction\b|\breturn\b|\bimport\b|</?\w+>")
+_SECRET_RE = re.compile(r"^\s*[A-Za-z0-9_\-+/=.]{24,}\s*$")
+_URL_ONLY_RE = re.compile(r"^\s*https?://\S+\s*$")
+
+
+class RelevanceResult(NamedTuple):
+    score: float
+    relevant: bool
+    # Names of the rules that fired, for logging
+    reasons: Tuple[str, ...]
+
+
+class KeywordRule:
+    """Fires when any of `keywords` appears as a whole word (case-insensitive)."""
+
+    def __init__(self, name: str, keywords: Iterable[str], weight: float):
+        self.name = name
+        self.weight = weight
+        alternatives = "|".join(
+            re.escape(k) for k in sorted(keywords, key=len, reverse=True)
+        )
+        self._pattern = re.compile(rf"\b(?:{alternatives})\b", re.IGNORECASE)
+
+    def matches(self, text: str, window_info: Dict[str, Any]) -> bool:
+        return self._pattern.search(text) is not None
+
+
+class PatternRule:
+    """Fires when `pattern` matches anywhere in the text."""
+
+    def __init__(self, name: str, pattern: "re.Pattern[str]", weight: float):
+        self.name = name
+        self.weight = weight
+        self._pattern = pattern
+
+    def matches(self, text: str, window_info: Dict[str, Any]) -> bool:
+        return self._pattern.search(text) is not None
+
+
+class AppRule:
+    """Fires when the frontmost app's bundle id starts with one of `bundle_prefixes`."""
+
+    def __init__(self, name: str, bundle_prefixes: Iterable[str], weight: float):
+        self.name = name
+        self.weight = weight
+        self._prefixes = tuple(prefix.lower() for prefix in bundle_prefixes)
+
+    def matches(self, text: str, window_info: Dict[str, Any]) -> bool:
+        bundle_id = window_info.get("bundleIdentifier") or ""
+        return bool(bundle_id) and bundle_id.lower().startswith(self._prefixes)
+
+
+class CheckRule:
+    """Fires when `check(text)` is true."""
+
+    def __init__(self, name: str, check: Callable[[str], bool], weight: float):
+        self.name = name
+        self.weight = weight
+        self._check = check
+
+    def matches(self, text: str, window_info: Dict[str, Any]) -> bool:
+        return self._check(text)
+
+
+def looks_like_code(text: str) -> bool:
+    """Several lines of which a good share carry code punctuation or keywords."""
+    lines = [line for line in text.splitlines() if line.strip()]
+    if len(lines) < 2:
+        return bool(_CODE_RE.search(text)) and len(text.split()) < 8
+    code_lines = sum(1 for line in lines if _CODE_RE.search(line))
+    return code_lines / len(lines) >= 0.4
+
+
+def looks_like_secret(text: str) -> bool:
+    """A single long token without spaces, like an API key or password."""
+    return bool(_SECRET_RE.match(text)) and any(c.isdigit() for c in text)
+
+
+def is_url_only(text: str) -> bool:
+    return bool(_URL_ONLY_RE.match(text))
+
+
+def word_count_below(n: int) -> Callable[[str], bool]:
+    return lambda text: len(text.split()) < n
+
+
+class RelevanceClassifier:
+    """Scores events for one extension with rules and an optional local model."""
+
+    def __init__(
+        self,
+        name: str,
+        rules: List[Any],
+        prior: float = 0.0,
+        threshold: float = DEFAULT_THRESHOLD,
+        model: Optional[Callable[[str], float]] = None,
+        model_weight: float = 0.5,
+        model_band: Tuple[float, float] = (0.2, 0.8),
+    ):
+        self.name = name
+        self.rules = rules
+        self.prior = prior
+        self.threshold = threshold
+        self.model = model
+        self.model_weight = model_weight
+        self.model_band = model_band
+
+    def classify(
+        self,
+        text: Optional[str],
+        window_info: Optional[Dict[str, Any]] = None,
+        threshold: Optional[float] = None,
+    ) -> RelevanceResult:
+        threshold = self.threshold if threshold is None else threshold
+        if not text or not text.strip():
+            return RelevanceResult(0.0, False, ())
+        text = text[:MAX_SCORED_CHARS]
+        window_info = window_info if isinstance(window_info, dict) else {}
+
+        miss = 1.0 - self.prior
+        scale = 1.0
+        reasons: List[str] = []
+        for rule in self.rules:
+            if not rule.matches(text, window_info):
+                continue
+            reasons.append(rule.name)
+            if rule.weight >= 0:
+                miss *= 1.0 - rule.weight
+            else:
+                scale *= 1.0 + rule.weight
+        score = (1.0 - miss) * scale
+
+        low, high = self.model_band
+        if self.model is not None and scale > 0 and low <= score <= high:
+            score = (1 - self.model_weight) * score + self.model_weight * self.model(
+                text
+            )
+            reasons.append("model")
+
+        return RelevanceResult(score, score >= threshold, tuple(reasons))
+
+    def is_relevant(
+        self,
+        text: Optional[str],
+        window_info: Optional[Dict[str, Any]] = None,
+        threshold: Optional[float] = None,
+    ) -> bool:
+        return self.classify(text, window_info, threshold).relevant
+
+
+# Apps where copied text is almost never meant for a notes or calendar agent
+DEVELOPER_APPS = (
+    "com.apple.Terminal",
+    "com.googlecode.iterm2",
+    "com.microsoft.VSCode",
+    "com.jetbrains.",
+    "com.sublimetext.",
+    "dev.warp.",
+    "dev.zed.",
+)
+PASSWORD_MANAGERS = (
+    "com.1password.",
+    "com.agilebits.",
+    "com.bitwarden.",
+    "com.lastpass.",
+    "com.apple.keychainaccess",
+)
+CALENDAR_APPS = (
+    "com.apple.iCal",
+    "com.apple.mail",
+    "com.microsoft.Outlook",
+    "com.readdle.smartemail",
+    "com.flexibits.fantastical",
+    "com.tinyspeck.slackmacgap",
+)
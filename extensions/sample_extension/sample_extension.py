@@ -19,13 +19,22 @@ from tabtabtab_lib.extension_interface import (
 from tabtabtab_lib.llm import LLMModel
 from tabtabtab_lib.llm_interface import LLMProcessorInterface, LLMContext
 from tabtabtab_lib.sse_interface import SSESenderInterface
+from extensions.single_flight import SingleFlight, flight_key
+from extensions.job_queue import DurableJobsMixin, JobHandler
 
 # Set up basic logging for the sample extension
 logging.basicConfig(level=logging.INFO)
 log = logging.getLogger(__name__)
 
+# Background work for a copy or paste is abandoned after this long
+BACKGROUND_TASK_DEADLINE_SECONDS = 60
 
-class SampleExtension(ExtensionInterface):
+# A URL copied again (or on another device) while it is being summarized
+# shares the summary already in progress
+_summaries_in_flight = SingleFlight("sample")
+
+
+class SampleExtension(DurableJobsMixin, ExtensionInterface):
     """
     A sample extension demonstrating the implementation of ExtensionInterface.
     This version uses an LLM to summarize the content of a URL
@@ -33,6 +42,10 @@ class SampleExtension(ExtensionInterface):
     summary back via an injected SSE sender.
     """
 
+    JOB_HANDLERS = {
+        "summarize_url": JobHandler("_summarize_url_content_async", idempotent=True)
+    }
+
     async def on_context_request(
         self, source_extension_id: str, context_query: Dict[str, Any]
     ) -> OnContextResponse:
@@ -107,10 +120,18 @@ class SampleExtension(ExtensionInterface):
                 )
             else:
                 try:
-                    asyncio.create_task(
-                        self._summarize_url_content_async(
-                            browser_url, device_id, request_id
-                        )
+                    await self.submit_job(
+                        "summarize_url",
+                        {
+                            "browser_url": browser_url,
+                            "device_id": device_id,
+                            "request_id": request_id,
+                        },
+                        device_id=device_id,
+                        idempotency_key=f"copy:{request_id}",
+                        deadline=BACKGROUND_TASK_DEADLINE_SECONDS,
+                        # Only the latest copied page from a device is summarized
+                        supersede_key=("summarize", device_id),
                     )
                     log.info(
                         f"[{self.extension_id}][Req:{request_id}] Background task created successfully."
@@ -164,7 +185,11 @@ class SampleExtension(ExtensionInterface):
 
         # example of doing a long running task
         try:
-            asyncio.create_task(self._sample_long_running_task(device_id, request_id))
+            self.tasks.submit(
+                self._sample_long_running_task(device_id, request_id),
+                device_id=device_id,
+                deadline=BACKGROUND_TASK_DEADLINE_SECONDS,
+            )
             log.info(
                 f"[{self.extension_id}][Req:{request_id}] Background task created successfully."
             )
@@ -195,6 +220,19 @@ class SampleExtension(ExtensionInterface):
             )
         )
 
+    async def on_job_superseded(self, kind: str, payload: Dict[str, Any]) -> None:
+        """Tell a copy replaced by a newer one that its page won't be summarized."""
+        await self.send_push_notification(
+            device_id=payload["device_id"],
+            notification=Notification(
+                request_id=payload["request_id"],
+                title="Sample",
+                detail="Replaced by a newer copy",
+                content="",
+                status=NotificationStatus.INFO,
+            ),
+        )
+
     async def _summarize_url_content_async(
         self, browser_url: str, device_id: str, request_id: str
     ) -> None:
@@ -212,8 +250,50 @@ class SampleExtension(ExtensionInterface):
 
         log.info(f"{log_prefix} Starting background processing for URL: {browser_url}")
 
+        try:
+            summary_result = await _summaries_in_flight.do(
+                flight_key(self.extension_id, browser_url),
+                lambda: self._summarize_url(browser_url, log_prefix),
+            )
+        except ValueError as e:
+            await self.send_push_notification(
+                device_id=device_id,
+                notification=Notification(
+                    request_id=request_id,
+                    title="Sample",
+                    detail=str(e),
+                    content="",
+                    status=NotificationStatus.ERROR,
+                ),
+            )
+            return
+
+        if not summary_result:
+            return
+
+        # --- Send Final Result via SSE ---
+        try:
+            await self.send_push_notification(
+                device_id=device_id,
+                notification=Notification(
+                    request_id=request_id,
+                    title="Sample",
+                    detail="Content summary generated",
+                    content=summary_result,
+                    status=NotificationStatus.READY,
+                ),
+            )
+        except Exception as e:
+            log.exception(f"{log_prefix} Error sending summary: {e}")
+
+    async def _summarize_url(self, browser_url: str, log_prefix: str) -> Optional[str]:
+        """
+        Fetches the URL and summarizes it with the LLM. Returns None if there was
+        nothing to summarize; raises ValueError if the page could not be fetched.
+        """
         # --- Fetch URL Content ---
         text_content: Optional[str] = None
+        fetch_error: Optional[str] = None
         try:
             async with aiohttp.ClientSession() as session:
                 async with session.get(browser_url, timeout=30.0) as response:
@@ -226,7 +306,7 @@ class SampleExtension(ExtensionInterface):
                             log.error(
                                 f"{log_prefix} Error decoding content from URL {browser_url}: {decode_err}"
                             )
-                            return
+                            return None
 
                         log.info(
                             f"{log_prefix} Successfully fetched URL content (length: {len(text_content)})"
@@ -235,31 +315,24 @@ class SampleExtension(ExtensionInterface):
                         log.error(
                             f"{log_prefix} Failed to fetch URL: {response.status}"
                         )
-                        await self.send_push_notification(
-                            device_id=device_id,
-                            notification=Notification(
-                                request_id=request_id,
-                                title="Sample",
-                                detail=f"Failed to fetch URL: {response.status}",
-                                content="",
-                                status=NotificationStatus.ERROR,
-                            ),
-                        )
-                        return
+                        fetch_error = f"Failed to fetch URL: {response.status}"
         except ImportError:
             log.error(
                 f"{log_prefix} aiohttp library not found. Cannot fetch URL content."
             )
-            return
+            return None
         except Exception as e:
             log.error(f"{log_prefix} Error fetching URL content: {e}", exc_info=True)
-            return
+            return None
         # --- End Fetch URL Content ---
 
+        if fetch_error:
+            raise ValueError(fetch_error)
+
         # --- LLM Integration ---
         if not text_content:
             log.warning(f"{log_prefix} No text content fetched from URL to process.")
-            return
+            return None
 
         content_summarization_prompt = """
         You are an AI assistant tasked with summarizing web page content.
@@ -274,7 +347,7 @@ class SampleExtension(ExtensionInterface):
 
         if not self.llm_processor:
             log.error(f"{log_prefix} LLM Processor not configured/injected.")
-            return
+            return None
 
         try:
             log.info(f"{log_prefix} Calling LLM to summarize content...")
@@ -288,28 +361,19 @@ class SampleExtension(ExtensionInterface):
 
             if not isinstance(llm_response, str) or not llm_response.strip():
                 log.error(f"{log_prefix} LLM response was not a non-empty string.")
-                return  # Stop if LLM response is invalid
+                return None  # Stop if LLM response is invalid
 
             summary_result = llm_response.strip()
             log.info(
                 f"{log_prefix} LLM summary received: {summary_result[:150]}..."
             )  # Log truncated summary
 
-            # --- Send Final Result via SSE ---
             log.info(f"{log_prefix} Successfully generated summary.")
-            await self.send_push_notification(
-                device_id=device_id,
-                notification=Notification(
-                    request_id=request_id,
-                    title="Sample",
-                    detail="Content summary generated",
-                    content=summary_result,
-                    status=NotificationStatus.READY,
-                ),
-            )
+            return summary_result
 
         except Exception as e:
             log.exception(f"{log_prefix} Error during LLM processing: {e}")
+            return None
 
     async def _sample_long_running_task(self, device_id: str, request_id: str) -> None:
         log.info(f"[{self.extension_id}][Req:{request_id}] Starting long running task.")
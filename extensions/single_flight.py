@@ -0,0 +1,107 @@
+"""
+Single-flight coalescing of identical in-flight work.
+
+When the same input arrives again while it is still being processed (the same
+text copied twice, or two devices copying the same URL), later callers attach
+to the computation already running instead of starting another. Every caller
+gets the result and sends its own notification for its own request.
+
+Usage:
+    _flights = SingleFlight("translation")
+
+    translations = await _flights.do(
+        flight_key(self.extension_id, text, api_key_fingerprint),
+        lambda: self._translate(text, api_key),
+    )
+"""
+
+import asyncio
+import hashlib
+import logging
+import re
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional, TypeVar
+
+log = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+_WHITESPACE_RE = re.compile(r"\s+")
+
+
+def normalize_text(text: str) -> str:
+    """Ignore differences in whitespace that don't change the request."""
+    return _WHITESPACE_RE.sub(" ", text).strip()
+
+
+def flight_key(extension_id: str, *parts: Optional[str]) -> str:
+    """
+    Build a key from the extension and everything the result depends on.
+    Include whatever identifies the user's account (an API key, an MCP URL)
+    so that different users never share a result.
+    """
+    digest = hashlib.sha256()
+    for part in parts:
+        digest.update(normalize_text(part or "").encode("utf-8"))
+        digest.update(b"\0")
+    return f"{extension_id}:{digest.hexdigest()}"
+
+
+class _Flight:
+    def __init__(self, task: "asyncio.Future[Any]"):
+        self.task = task
+        self.waiters = 0
+        self.cancelled = False
+
+
+class SingleFlight:
+    """
+    Runs at most one computation per key at a time.
+
+    The shared computation runs in its own task. A caller that is cancelled
+    stops waiting without disturbing the others; the computation itself is
+    cancelled only when its last waiter goes away.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self._flights: Dict[Hashable, _Flight] = {}
+
+    def in_flight(self, key: Hashable) -> bool:
+        flight = self._flights.get(key)
+        return flight is not None and not flight.cancelled
+
+    async def do(self, key: Hashable, factory: Callable[[], Awaitable[T]]) -> T:
+        """Return the result of `factory()`, shared with concurrent callers of `key`."""
+        flight = self._flights.get(key)
+        if flight is None or flight.cancelled:
+            # A flight whose last waiter left is winding down; start afresh
+            flight = _Flight(asyncio.ensure_future(factory()))
+            self._flights[key] = flight
+            flight.task.add_done_callback(lambda _: self._finished(key, flight))
+        else:
+            log.info(f"[{self.name}] Joining in-flight request {key}")
+
+        flight.waiters += 1
+        try:
+            return await asyncio.shield(flight.task)
+        except asyncio.CancelledError:
+            if not flight.task.done() and flight.waiters == 1:
+                flight.cancelled = True
+                flight.task.cancel()
+            raise
+        finally:
+            flight.waiters -= 1
+
+    def _finished(self, key: Hashable, flight: _Flight) -> None:
+        if self._flights.get(key) is flight:
+            del self._flights[key]
+        if not flight.task.cancelled():
+            # Waiters have received any exception; mark it retrieved so asyncio
+            # doesn't warn
+            flight.task.exception()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "in_flight": len(self._flights),
+            "waiters": sum(flight.waiters for flight in self._flights.values()),
+        }
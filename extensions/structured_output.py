@@ -0,0 +1,403 @@
+"""
+Structured (JSON) output from LLM responses.
+
+Responses are scanned left to right for balanced JSON values, so prose, code
+fences and trailing commentary around the JSON don't matter. Well-formed
+responses are scanned once; each stray bracket in the prose costs one more scan
+of the text after it, up to MAX_STRAY_OPENERS of them. Common defects are
+repaired (trailing commas, Python literals, output cut off mid-value) and the
+result can be checked against a small JSON Schema subset. When it still
+doesn't validate, `parse_llm_json` asks the model again for just the parts that
+failed.
+
+Usage:
+    result = await parse_llm_json(response, schema=SCHEMA, ask=ask_model)
+"""
+
+import json
+import logging
+from typing import Any, Awaitable, Callable, Dict, Iterator, List, Optional, Tuple
+
+log = logging.getLogger(__name__)
+
+# (system_prompt, message) -> model response
+AskModel = Callable[[str, str], Awaitable[str]]
+
+Path = Tuple[Any, ...]
+
+_OPENERS = {"{": "}", "[": "]"}
+# Deeper values aren't treated as JSON; model output never nests this far, and
+# json.loads and validate() recurse once per level
+MAX_NESTING_DEPTH = 100
+# After this many brackets that don't start valid JSON, the rest of a value that
+# fails to parse is skipped instead of rescanned, to bound the parsing time
+MAX_STRAY_OPENERS = 100
+_PYTHON_LITERALS = {"True": "true", "False": "false", "None": "null"}
+_INVALID = object()
+
+REPAIR_SYSTEM_PROMPT = """
+You fix JSON. Reply with only the corrected JSON value, no other text.
+"""
+
+
+class StructuredOutputError(Exception):
+    """Raised when no JSON value matching the schema could be obtained."""
+
+    def __init__(self, message: str, errors: Optional[List[str]] = None):
+        super().__init__(message)
+        self.errors = errors or []
+
+
+def _scan(text: str, start: int) -> Tuple[int, Optional[List[str]], bool, bool]:
+    """
+    Scan one JSON value starting at the opener at `start`.
+
+    Returns the end index (exclusive), the closers still open there, whether
+    the scan ended inside a string and whether the value nests deeper than
+    MAX_NESTING_DEPTH. The closers are empty for a complete value and None when
+    a closer didn't match its opener or the value is too deep.
+    """
+    stack = [_OPENERS[text[start]]]
+    # Levels beyond MAX_NESTING_DEPTH are only counted, to find the value's end
+    excess = 0
+    too_deep = False
+    in_string = False
+    escaped = False
+    i = start + 1
+    while i < len(text):
+        char = text[i]
+        if in_string:
+            if escaped:
+                escaped = False
+            elif char == "\\":
+                escaped = True
+            elif char == '"':
+                in_string = False
+        elif char == '"':
+            in_string = True
+        elif char in _OPENERS:
+            if len(stack) < MAX_NESTING_DEPTH:
+                stack.append(_OPENERS[char])
+            else:
+                excess += 1
+                too_deep = True
+        elif char in "}]":
+            if excess:
+                excess -= 1
+            elif char != stack[-1]:
+                return i + 1, None, False, too_deep
+            else:
+                stack.pop()
+                if not stack:
+                    return i + 1, None if too_deep else [], False, too_deep
+        i += 1
+    return i, None if too_deep else stack, in_string, too_deep
+
+
+def _normalize(fragment: str) -> str:
+    """Drop trailing commas and convert Python literals, outside of strings."""
+    out: List[str] = []
+    in_string = False
+    escaped = False
+    i = 0
+    while i < len(fragment):
+        char = fragment[i]
+        if in_string:
+            out.append(char)
+            if escaped:
+                escaped = False
+            elif char == "\\":
+                escaped = True
+            elif char == '"':
+                in_string = False
+            i += 1
+            continue
+        if char == '"':
+            in_string = True
+        elif char in "}]":
+            # Remove a comma (and whitespace) left before the closer
+            j = len(out) - 1
+            while j >= 0 and out[j].isspace():
+                j -= 1
+            if j >= 0 and out[j] == ",":
+                del out[j]
+        elif char.isalpha():
+            j = i
+            while j < len(fragment) and fragment[j].isalpha():
+                j += 1
+            word = fragment[i:j]
+            out.append(_PYTHON_LITERALS.get(word, word))
+            i = j
+            continue
+        out.append(char)
+        i += 1
+    return "".join(out)
+
+
+def _close_truncated(fragment: str, stack: List[str], in_string: bool) -> str:
+    """Complete output that was cut off mid-value by closing what is still open."""
+    if in_string:
+        if fragment.endswith("\\"):
+            fragment = fragment[:-1]
+        fragment += '"'
+    fragment = fragment.rstrip()
+    if fragment.endswith(":"):
+        # Drop a key left without a value
+        key_end = len(fragment[:-1].rstrip()) - 1
+        key_start = fragment.rfind('"', 0, key_end)
+        fragment = fragment[:key_start].rstrip() if key_start >= 0 else fragment[:-1]
+    if fragment.endswith(","):
+        fragment = fragment[:-1]
+    return fragment + "".join(reversed(stack))
+
+
+def _loads(fragment: str) -> Any:
+    try:
+        return json.loads(fragment)
+    except (ValueError, RecursionError):
+        return _INVALID
+
+
+def iter_json_values(text: str) -> Iterator[Tuple[Any, bool]]:
+    """
+    Yield each top-level JSON object or array in `text`, in order, with whether
+    it had to be repaired.
+
+    A bracket that doesn't start valid JSON, like the one in "[min, max)", is
+    skipped on its own so the JSON after it is still found. Past
+    MAX_STRAY_OPENERS such brackets the whole failed value is skipped instead,
+    which bounds the time taken at O(MAX_STRAY_OPENERS * len(text)).
+    """
+    stray = 0
+    i = 0
+    while i < len(text):
+        if text[i] not in _OPENERS:
+            i += 1
+            continue
+        end, stack, in_string, too_deep = _scan(text, i)
+        if too_deep:
+            # Not JSON, and its inner values are too deep to rescan cheaply
+            i = end
+            continue
+        value: Any = _INVALID
+        # None means a closer didn't match its opener
+        if stack is not None:
+            fragment = text[i:end]
+            repaired = bool(stack)
+            if stack:
+                fragment = _close_truncated(fragment, stack, in_string)
+            value = _loads(fragment)
+            if value is _INVALID:
+                value = _loads(_normalize(fragment))
+                repaired = True
+        if value is not _INVALID:
+            yield value, repaired
+            i = end
+        elif stray < MAX_STRAY_OPENERS:
+            stray += 1
+            i += 1
+        else:
+            i = end
+
+
+def validate(
+    value: Any, schema: Dict[str, Any], path: Path = ()
+) -> List[Tuple[Path, str]]:
+    """
+    Check `value` against a JSON Schema subset: type, properties, required,
+    items and enum. Returns (path, message) for each problem found.
+    """
+    errors: List[Tuple[Path, str]] = []
+    expected = schema.get("type")
+    if expected is not None:
+        types = expected if isinstance(expected, list) else [expected]
+        if not any(_is_type(value, t) for t in types):
+            return [
+                (path, f"expected {' or '.join(types)}, got {type(value).__name__}")
+            ]
+
+    if "enum" in schema and value not in schema["enum"]:
+        errors.append((path, f"must be one of {schema['enum']}"))
+
+    if isinstance(value, dict):
+        for key in schema.get("required", []):
+            if key not in value:
+                errors.append((path + (key,), "is required"))
+        for key, subschema in schema.get("properties", {}).items():
+            if key in value:
+                errors.extend(validate(value[key], subschema, path + (key,)))
+    elif isinstance(value, list) and "items" in schema:
+        for index, element in enumerate(value):
+            errors.extend(validate(element, schema["items"], path + (index,)))
+    return errors
+
+
+def _is_type(value: Any, expected: str) -> bool:
+    if expected == "object":
+        return isinstance(value, dict)
+    if expected == "array":
+        return isinstance(value, list)
+    if expected == "string":
+        return isinstance(value, str)
+    if expected == "integer":
+        return isinstance(value, int) and not isinstance(value, bool)
+    if expected == "number":
+        return isinstance(value, (int, float)) and not isinstance(value, bool)
+    if expected == "boolean":
+        return isinstance(value, bool)
+    if expected == "null":
+        return value is None
+    return True
+
+
+def _format_path(path: Path) -> str:
+    return "".join(f"[{p}]" if isinstance(p, int) else f".{p}" for p in path) or "$"
+
+
+def extract_json(
+    text: str, schema: Optional[Dict[str, Any]] = None
+) -> Tuple[Any, List[Tuple[Path, str]]]:
+    """
+    Return the first JSON value in `text` that validates against `schema`, or
+    failing that the first JSON value found along with its validation errors.
+
+    Raises:
+        StructuredOutputError: If `text` contains no JSON value at all
+    """
+    first: Optional[Tuple[Any, List[Tuple[Path, str]]]] = None
+    for value, repaired in iter_json_values(text):
+        errors = validate(value, schema) if schema else []
+        if repaired:
+            log.info("Repaired malformed JSON in model response")
+        if not errors:
+            return value, []
+        if first is None:
+            first = (value, errors)
+    if first is None:
+        raise StructuredOutputError("No JSON found in model response")
+    return first
+
+
+def _schema_at(schema: Dict[str, Any], path: Path) -> Dict[str, Any]:
+    for part in path:
+        if isinstance(part, int):
+            schema = schema.get("items", {})
+        else:
+            schema = schema.get("properties", {}).get(part, {})
+    return schema
+
+
+def _get(value: Any, path: Path) -> Any:
+    for part in path:
+        value = value[part]
+    return value
+
+
+def _failed_elements(errors: List[Tuple[Path, str]]) -> Optional[List[Path]]:
+    """
+    The array elements containing all errors, if every error is inside one;
+    these can be fixed one by one instead of regenerating the whole value.
+    """
+    elements: List[Path] = []
+    for path, _ in errors:
+        index = max((i for i, p in enumerate(path) if isinstance(p, int)), default=None)
+        if index is None:
+            return None
+        element = path[: index + 1]
+        if element not in elements:
+            elements.append(element)
+    return elements
+
+
+async def _reask(
+    ask: AskModel, fragment: Any, schema: Dict[str, Any], errors: List[str]
+) -> Tuple[Any, List[Tuple[Path, str]]]:
+    message = (
+        "This JSON does not match the schema.\n\nJSON:\n"
+        f"{fragment if isinstance(fragment, str) else json.dumps(fragment)}"
+        f"\n\nSchema:\n{json.dumps(schema)}\n\nProblems:\n- " + "\n- ".join(errors)
+    )
+    response = await ask(REPAIR_SYSTEM_PROMPT, message)
+    return extract_json(response, schema)
+
+
+async def parse_llm_json(
+    response: str,
+    schema: Optional[Dict[str, Any]] = None,
+    ask: Optional[AskModel] = None,
+    drop_invalid_items: bool = True,
+) -> Any:
+    """
+    Extract and validate the JSON value in a model response.
+
+    If it doesn't validate and `ask` is given, the model is asked once to fix
+    only the failing part: each invalid array element on its own when the
+    errors are confined to elements, otherwise the whole value. Elements that
+    still fail are dropped when `drop_invalid_items` is set.
+
+    Raises:
+        StructuredOutputError: If no valid value could be obtained
+    """
+    try:
+        value, errors = extract_json(response, schema)
+    except StructuredOutputError:
+        if ask is None or schema is None:
+            raise
+        log.warning("No JSON in model response; asking again")
+        value, errors = await _reask(
+            ask, response[-4000:], schema, ["no JSON value found"]
+        )
+
+    if not errors or schema is None:
+        return value
+
+    elements = _failed_elements(errors)
+    if ask is not None and elements is None:
+        log.warning(
+            f"Model response failed validation ({len(errors)} errors); asking again"
+        )
+        value, errors = await _reask(
+            ask, value, schema, [f"{_format_path(p)} {m}" for p, m in errors]
+        )
+        if not errors:
+            return value
+        elements = _failed_elements(errors)
+
+    if elements is None:
+        raise StructuredOutputError(
+            "Model response does not match the schema",
+            [f"{_format_path(p)} {m}" for p, m in errors],
+        )
+
+    invalid: List[Path] = []
+    for element in elements:
+        element_errors = [
+            f"{_format_path(p[len(element):])} {m}"
+            for p, m in errors
+            if p[: len(element)] == element
+        ]
+        if ask is not None:
+            element_schema = _schema_at(schema, element)
+            try:
+                fixed, fixed_errors = await _reask(
+                    ask, _get(value, element), element_schema, element_errors
+                )
+                if not fixed_errors:
+                    _get(value, element[:-1])[element[-1]] = fixed
+                    continue
+            except StructuredOutputError:
+                pass
+        invalid.append(element)
+
+    if invalid and not drop_invalid_items:
+        raise StructuredOutputError(
+            "Model response does not match the schema",
+            [_format_path(p) for p in invalid],
+        )
+    # Remove from the end so earlier indexes stay valid
+    for element in sorted(invalid, key=lambda p: p[-1], reverse=True):
+        log.warning(
+            f"Dropping invalid element {_format_path(element)} from model response"
+        )
+        del _get(value, element[:-1])[element[-1]]
+    return value
@@ -0,0 +1,403 @@
+"""
+Supervised background tasks for extensions.
+
+Extensions answer copy and paste events immediately and finish the work in the
+background. Submitting that work to a TaskSupervisor instead of calling
+`asyncio.create_task` directly keeps a strong reference to every task, bounds
+how many run at once (overall and per device), runs queued work by priority,
+enforces deadlines and logs failures in one place.
+
+Usage:
+    class MyExtension(BackgroundTasksMixin, ExtensionInterface):
+        async def on_copy(self, context):
+            self.tasks.submit(self._process(...), device_id=device_id, deadline=60)
+"""
+
+import asyncio
+import heapq
+import itertools
+import logging
+from collections import Counter
+from typing import (
+    Any,
+    Callable,
+    Coroutine,
+    Dict,
+    Hashable,
+    List,
+    Optional,
+    Set,
+    Tuple,
+)
+
+log = logging.getLogger(__name__)
+
+DEFAULT_MAX_CONCURRENT = 4
+DEFAULT_MAX_PER_DEVICE = 2
+DEFAULT_MAX_QUEUED = 100
+
+PRIORITY_LOW = -10
+PRIORITY_NORMAL = 0
+PRIORITY_HIGH = 10
+
+
+class SupervisorClosedError(RuntimeError):
+    """Raised when work is submitted to a supervisor that is shutting down."""
+
+
+class Job:
+    """A unit of background work and its outcome."""
+
+    def __init__(
+        self,
+        coro: Coroutine[Any, Any, Any],
+        name: str,
+        device_id: Optional[str],
+        priority: int,
+        deadline: Optional[float],
+        supersede_key: Optional[Hashable] = None,
+        on_superseded: Optional[Callable[[], Coroutine[Any, Any, Any]]] = None,
+    ):
+        self.coro = coro
+        self.name = name
+        self.device_id = device_id
+        self.priority = priority
+        # Absolute loop time by which the job must finish
+        self.deadline = deadline
+        self.supersede_key = supersede_key
+        self.superseded = False
+        self.on_superseded = on_superseded
+        self.task: Optional["asyncio.Task[None]"] = None
+        self.future: "asyncio.Future[Any]" = asyncio.get_running_loop().create_future()
+
+    @property
+    def started(self) -> bool:
+        return self.task is not None
+
+    def done(self) -> bool:
+        return self.future.done()
+
+    def cancel(self) -> bool:
+        """
+        Cancel the job whether it is queued or running. Returns False if it
+        already finished.
+        """
+        if self.future.done():
+            return False
+        if self.task is not None:
+            self.task.cancel()
+        else:
+            self.coro.close()
+            self.future.cancel()
+        return True
+
+
+class TaskSupervisor:
+    """
+    Runs background coroutines with bounded concurrency.
+
+    At most `max_concurrent` jobs run at once and at most `max_per_device` of
+    them for any one device; the rest wait in a priority queue (higher
+    priority first, then first come first served). When more than
+    `max_queued` jobs are waiting, the lowest-priority, oldest one is dropped
+    and its `on_superseded` callback is run as for a superseded job.
+    Exceptions and missed deadlines are logged here and passed to
+    `error_handler` if one is set; they are never raised to the submitter.
+
+    Jobs submitted with the same `supersede_key` (for example the kind of
+    request plus the device) replace one another: a newer job cancels the older
+    one if it hasn't started, or even if it is running when `cancel_running`
+    is set, so a burst of copies costs one pipeline instead of one each. A
+    superseded job's `on_superseded` callback then runs as a job of its own,
+    once the job has stopped, so its request still gets a final notification.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        max_concurrent: int = DEFAULT_MAX_CONCURRENT,
+        max_per_device: int = DEFAULT_MAX_PER_DEVICE,
+        max_queued: int = DEFAULT_MAX_QUEUED,
+        error_handler: Optional[Callable[[Job, BaseException], Any]] = None,
+    ):
+        self.name = name
+        self.max_concurrent = max_concurrent
+        self.max_per_device = max_per_device
+        self.max_queued = max_queued
+        self.error_handler = error_handler
+        self._queue: List[Tuple[int, int, Job]] = []
+        self._sequence = itertools.count()
+        self._running: Set[Job] = set()
+        self._per_device: "Counter[str]" = Counter()
+        self._latest: Dict[Hashable, Job] = {}
+        self.closed = False
+
+    def submit(
+        self,
+        coro: Coroutine[Any, Any, Any],
+        device_id: Optional[str] = None,
+        priority: int = PRIORITY_NORMAL,
+        deadline: Optional[float] = None,
+        name: Optional[str] = None,
+        supersede_key: Optional[Hashable] = None,
+        cancel_running: bool = True,
+        on_superseded: Optional[Callable[[], Coroutine[Any, Any, Any]]] = None,
+    ) -> Job:
+        """
+        Queue `coro` to run in the background and return its Job.
+
+        Args:
+            coro: The coroutine to run; it is closed unstarted if the job is dropped
+            device_id: Device the work is for, used for the per-device limit
+            priority: Higher runs first among queued jobs
+            deadline: Seconds from now within which the job must finish,
+                queueing included
+            name: Used in logs; defaults to the coroutine's name
+            supersede_key: Jobs with the same key supersede earlier ones
+            cancel_running: Whether a superseded job is cancelled even once it
+                has started, rather than only while it is queued
+            on_superseded: Called if this job is superseded or dropped from a
+                full queue, to report that to the user; a job that is never
+                started can't do so itself
+
+        Raises SupervisorClosedError (closing `coro`) once `close()` was called.
+        """
+        if self.closed:
+            coro.close()
+            raise SupervisorClosedError(f"{self.name} is not accepting new work")
+        loop = asyncio.get_running_loop()
+        job = Job(
+            coro,
+            name=name or str(getattr(coro, "__qualname__", "job")),
+            device_id=device_id,
+            priority=priority,
+            deadline=loop.time() + deadline if deadline is not None else None,
+            supersede_key=supersede_key,
+            on_superseded=on_superseded,
+        )
+        if supersede_key is not None:
+            previous = self._latest.get(supersede_key)
+            if previous is not None and (cancel_running or not previous.started):
+                # Set first so the job sees it when the cancellation reaches it
+                previous.superseded = True
+                if previous.cancel():
+                    log.info(
+                        f"[{self.name}] {previous.name} superseded by a newer request"
+                    )
+                    if not previous.started:
+                        self._report_superseded(previous)
+                else:
+                    previous.superseded = False
+            self._latest[supersede_key] = job
+        self._enqueue(job)
+        return job
+
+    def _enqueue(self, job: Job) -> None:
+        heapq.heappush(self._queue, (-job.priority, next(self._sequence), job))
+        if len(self._queue) > self.max_queued:
+            self._prune()
+        if len(self._queue) > self.max_queued:
+            self._drop_one()
+        self._dispatch()
+
+    def _report_superseded(self, job: Job) -> None:
+        """Run the job's `on_superseded` callback, even while closing."""
+        if job.on_superseded is None:
+            return
+        try:
+            coro = job.on_superseded()
+        except Exception as e:
+            log.error(f"[{self.name}] Superseded callback for {job.name} failed: {e}")
+            return
+        notification = Job(
+            coro,
+            name=f"{job.name}:superseded",
+            device_id=job.device_id,
+            priority=PRIORITY_HIGH,
+            deadline=None,
+        )
+        # Queued past `max_queued`: it stands in for a job that was already
+        # counted, and dropping it in turn would only drop another job
+        heapq.heappush(
+            self._queue, (-notification.priority, next(self._sequence), notification)
+        )
+        self._dispatch()
+
+    def _drop_one(self) -> None:
+        # Lowest priority first, then oldest
+        index = min(
+            range(len(self._queue)),
+            key=lambda i: (-self._queue[i][0], self._queue[i][1]),
+        )
+        _, _, victim = self._queue.pop(index)
+        heapq.heapify(self._queue)
+        log.warning(f"[{self.name}] Queue full, dropping {victim.name}")
+        if victim.cancel():
+            # It never started, so it can't tell its request itself
+            self._report_superseded(victim)
+
+    def _prune(self) -> None:
+        """Forget queued jobs that were cancelled before they started."""
+        self._queue = [entry for entry in self._queue if not entry[2].done()]
+        heapq.heapify(self._queue)
+
+    def _has_capacity(self, job: Job) -> bool:
+        return (
+            job.device_id is None
+            or self._per_device[job.device_id] < self.max_per_device
+        )
+
+    def _dispatch(self) -> None:
+        """Start queued jobs while there is capacity."""
+        skipped: List[Tuple[int, int, Job]] = []
+        loop = asyncio.get_running_loop()
+        while self._queue and len(self._running) < self.max_concurrent:
+            entry = heapq.heappop(self._queue)
+            job = entry[2]
+            if job.done():
+                continue
+            if job.deadline is not None and loop.time() >= job.deadline:
+                job.coro.close()
+                self._forget(job)
+                self._report(job, asyncio.TimeoutError("deadline passed while queued"))
+                continue
+            if not self._has_capacity(job):
+                skipped.append(entry)
+                continue
+            self._start(job)
+        for entry in skipped:
+            heapq.heappush(self._queue, entry)
+
+    def _start(self, job: Job) -> None:
+        self._running.add(job)
+        if job.device_id is not None:
+            self._per_device[job.device_id] += 1
+        job.task = asyncio.create_task(self._run(job), name=f"{self.name}:{job.name}")
+        # A callback rather than `finally`, so a task cancelled before its first
+        # step is still accounted for
+        job.task.add_done_callback(lambda _: self._finished(job))
+
+    async def _run(self, job: Job) -> None:
+        try:
+            if job.deadline is not None:
+                remaining = job.deadline - asyncio.get_running_loop().time()
+                result = await asyncio.wait_for(job.coro, timeout=max(remaining, 0))
+            else:
+                result = await job.coro
+            if not job.future.done():
+                job.future.set_result(result)
+        except Exception as e:
+            self._report(job, e)
+
+    def _forget(self, job: Job) -> None:
+        if job.supersede_key is not None and self._latest.get(job.supersede_key) is job:
+            del self._latest[job.supersede_key]
+
+    def _finished(self, job: Job) -> None:
+        self._forget(job)
+        if job.task is not None and job.task.cancelled():
+            # Cancelling a task before its first step leaves the coroutine unawaited
+            job.coro.close()
+            job.future.cancel()
+        if job.superseded:
+            self._report_superseded(job)
+        self._running.discard(job)
+        if job.device_id is not None:
+            self._per_device[job.device_id] -= 1
+            if not self._per_device[job.device_id]:
+                del self._per_device[job.device_id]
+        self._dispatch()
+
+    def _report(self, job: Job, error: BaseException) -> None:
+        if isinstance(error, asyncio.TimeoutError):
+            log.warning(f"[{self.name}] {job.name} missed its deadline")
+        else:
+            log.error(f"[{self.name}] {job.name} failed: {error!r}", exc_info=error)
+        if not job.future.done():
+            job.future.set_exception(error)
+            # Failures are reported here; don't also warn that nobody retrieved them
+            job.future.exception()
+        if self.error_handler is not None:
+            try:
+                self.error_handler(job, error)
+            except Exception as e:
+                log.error(f"[{self.name}] Error handler failed: {e}")
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "running": len(self._running),
+            "queued": len(self._queue),
+            "per_device": dict(self._per_device),
+        }
+
+    def cancel_all(self) -> None:
+        """Cancel every queued and running job."""
+        queued = [job for _, _, job in self._queue]
+        self._queue.clear()
+        for job in queued + list(self._running):
+            job.cancel()
+
+    def close(self) -> None:
+        """Refuse new work; queued and running jobs carry on."""
+        self.closed = True
+
+    async def wait_idle(self, timeout: Optional[float] = None) -> bool:
+        """Wait up to `timeout` seconds for all jobs to finish; False on timeout."""
+        try:
+            await asyncio.wait_for(self.join(), timeout=timeout)
+            return True
+        except asyncio.TimeoutError:
+            return False
+
+    async def shutdown(self, timeout: Optional[float] = None) -> bool:
+        """
+        Refuse new work, give queued and running jobs `timeout` seconds to
+        finish, then cancel whatever is left. Returns True if nothing had to
+        be cancelled.
+        """
+        self.close()
+        if await self.wait_idle(timeout):
+            return True
+        stats = self.stats()
+        log.warning(
+            f"[{self.name}] Cancelling {stats['running']} running and "
+            f"{stats['queued']} queued job(s) still pending at shutdown"
+        )
+        self.cancel_all()
+        await self.join()
+        return False
+
+    async def join(self) -> None:
+        """Wait until no jobs are queued or running."""
+        self._prune()
+        while self._queue or self._running:
+            pending: List["asyncio.Future[Any]"] = [
+                job.future for _, _, job in self._queue
+            ]
+            pending.extend(job.task for job in self._running if job.task is not None)
+            await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            # Let done callbacks update the bookkeeping before checking again
+            await asyncio.sleep(0)
+            self._prune()
+
+
+class BackgroundTasksMixin:
+    """
+    Gives an extension a `tasks` supervisor, created on first use and named
+    after the extension. Override the class attributes to change its limits.
+    """
+
+    MAX_CONCURRENT_TASKS = DEFAULT_MAX_CONCURRENT
+    MAX_TASKS_PER_DEVICE = DEFAULT_MAX_PER_DEVICE
+
+    @property
+    def tasks(self) -> TaskSupervisor:
+        supervisor = self.__dict__.get("_task_supervisor")
+        if supervisor is None:
+            supervisor = TaskSupervisor(
+                name=str(getattr(self, "extension_id", type(self).__name__)),
+                max_concurrent=self.MAX_CONCURRENT_TASKS,
+                max_per_device=self.MAX_TASKS_PER_DEVICE,
+            )
+            self._task_supervisor = supervisor
+        return supervisor
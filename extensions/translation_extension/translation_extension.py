@@ -1,4 +1,3 @@
-import asyncio
 import logging
 from typing import Any, Dict
 
@@ -11,8 +10,10 @@ from tabtabtab_lib.extension_interface import (
     NotificationStatus,
 )
 
-import anthropic
 from extension_constants import EXTENSION_DEPENDENCIES
+from extensions.single_flight import SingleFlight, flight_key
+from extensions.job_queue import DurableJobsMixin, JobHandler
+from extensions.llm_clients import AnthropicClientPool
 
 # Configure logging
 logging.basicConfig(
@@ -21,6 +22,9 @@ logging.basicConfig(
 
 logger = logging.getLogger(__name__)
 
+# Background work for a copy or paste is abandoned after this long
+BACKGROUND_TASK_DEADLINE_SECONDS = 120
+
 supported_languages = {
     "en": "English",
     "ja": "Japanese",
@@ -34,12 +38,28 @@ supported_languages = {
     "ko": "Korean",
 }
 
+# Identical texts copied while a translation is running share its result
+_translations_in_flight = SingleFlight("translation")
+
 
-class TranslationExtension(ExtensionInterface):
+class TranslationExtension(DurableJobsMixin, ExtensionInterface):
     """
     TabTabTab extension that provides translation functionality using Anthropic's Claude model.
     """
 
+    # Translating again only repeats the notification
+    JOB_HANDLERS = {"translate": JobHandler("_process_translation", idempotent=True)}
+    # Handed to the new instance on a hot reload
+    TRANSFERABLE_STATE = ("anthropic_clients",)
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.anthropic_clients = AnthropicClientPool()
+
+    async def close_resources(self) -> None:
+        await super().close_resources()
+        await self.anthropic_clients.close()
+
     async def on_context_request(
         self, source_extension_id: str, context_query: Dict[str, Any]
     ) -> OnContextResponse:
@@ -88,10 +108,19 @@ class TranslationExtension(ExtensionInterface):
         logger.info(
             f"{self.extension_id}: Starting background translation (Request ID: {request_id})"
         )
-        asyncio.create_task(
-            self._process_translation(
-                request_id, selected_text, device_id, dependencies
-            )
+        await self.submit_job(
+            "translate",
+            {
+                "request_id": request_id,
+                "text": selected_text,
+                "device_id": device_id,
+                "dependencies": dependencies,
+            },
+            device_id=device_id,
+            idempotency_key=f"copy:{request_id}",
+            deadline=BACKGROUND_TASK_DEADLINE_SECONDS,
+            # Only the latest copy from a device is translated
+            supersede_key=("copy", device_id),
         )
 
         return CopyResponse(
@@ -132,6 +161,19 @@ class TranslationExtension(ExtensionInterface):
             )
         )
 
+    async def on_job_superseded(self, kind: str, payload: Dict[str, Any]) -> None:
+        """Tell a copy replaced by a newer one that it won't be translated."""
+        await self.send_push_notification(
+            device_id=payload["device_id"],
+            notification=Notification(
+                request_id=payload["request_id"],
+                title="Translation",
+                detail="Replaced by a newer copy",
+                content="",
+                status=NotificationStatus.INFO,
+            ),
+        )
+
     async def _process_translation(
         self,
         request_id: str,
@@ -153,27 +195,10 @@ class TranslationExtension(ExtensionInterface):
             if not anthropic_api_key:
                 raise ValueError("Anthropic API key not found in dependencies")
 
-            # Create translations for each supported language
-            translations = {}
-            client = anthropic.Anthropic(api_key=anthropic_api_key)
-
-            for lang_code, lang_name in supported_languages.items():
-                if lang_code == "en":  # Skip English if the text is already in English
-                    continue
-
-                prompt = f"Translate the following text to {lang_name}:\n\n{text}"
-
-                response = client.messages.create(
-                    model="claude-3-opus-20240229",
-                    max_tokens=1000,
-                    temperature=0.0,
-                    system="You are a professional translator. Translate the text accurately while preserving the meaning, tone, and style.",
-                    messages=[{"role": "user", "content": prompt}],
-                )
-
-                if response and response.content:
-                    translation_text = response.content[0].text
-                    translations[lang_code] = translation_text
+            translations = await _translations_in_flight.do(
+                flight_key(self.extension_id, text, anthropic_api_key),
+                lambda: self._translate(text, anthropic_api_key),
+            )
 
             # Send translations via SSE
             if translations:
@@ -214,3 +239,33 @@ class TranslationExtension(ExtensionInterface):
                     status=NotificationStatus.ERROR,
                 ),
             )
+
+    async def _translate(self, text: str, anthropic_api_key: str) -> Dict[str, str]:
+        """Translate `text` into each supported language, keyed by language code."""
+        # Create translations for each supported language
+        translations = {}
+        # Async so that superseding this task also cancels the request in flight
+        with self.anthropic_clients.lease(anthropic_api_key) as client:
+            for lang_code, lang_name in supported_languages.items():
+                # Skip English if the text is already in English
+                if lang_code == "en":
+                    continue
+
+                prompt = f"Translate the following text to {lang_name}:\n\n{text}"
+
+                response = await client.messages.create(
+                    model="claude-3-opus-20240229",
+                    max_tokens=1000,
+                    temperature=0.0,
+                    system=(
+                        "You are a professional translator. Translate the text "
+                        "accurately while preserving the meaning, tone, and style."
+                    ),
+                    messages=[{"role": "user", "content": prompt}],
+                )
+
+                if response and response.content:
+                    translation_text = response.content[0].text
+                    translations[lang_code] = translation_text
+
+        return translations
@@ -0,0 +1,110 @@
+"""
+Report the import-time cost of each extension in the directory.
+
+Each extension is imported in a fresh interpreter so its cost includes the
+third-party packages it pulls in, as on a cold start. With --in-process the
+extensions are imported one after another in this interpreter instead, which
+shows what each adds once the others' shared dependencies are loaded (closer
+to a reload).
+
+    python local_runner/import_benchmark.py
+    python local_runner/import_benchmark.py --in-process
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+from typing import Any, Dict, List
+
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, project_root)
+
+# Imports `module` and prints how long it took and how many modules it loaded
+_MEASURE = """
+import importlib, json, sys, time
+sys.path.insert(0, {root!r})
+before = len(sys.modules)
+started = time.perf_counter()
+error = None
+try:
+    importlib.import_module({module!r})
+except Exception as e:
+    error = repr(e)
+print(json.dumps({{
+    "seconds": time.perf_counter() - started,
+    "modules": len(sys.modules) - before,
+    "error": error,
+}}))
+"""
+
+
+def measure_cold(module: str) -> Dict[str, Any]:
+    result = subprocess.run(
+        [sys.executable, "-c", _MEASURE.format(root=project_root, module=module)],
+        capture_output=True,
+        text=True,
+        cwd=project_root,
+    )
+    if result.returncode != 0 or not result.stdout.strip():
+        return {"seconds": 0.0, "modules": 0, "error": result.stderr.strip()[-200:]}
+    measured: Dict[str, Any] = json.loads(result.stdout.strip().splitlines()[-1])
+    return measured
+
+
+def measure_in_process(descriptor: Any) -> Dict[str, Any]:
+    before = len(sys.modules)
+    started = time.perf_counter()
+    error = None
+    try:
+        descriptor.extension_class
+    except Exception as e:
+        error = repr(e)
+    return {
+        "seconds": time.perf_counter() - started,
+        "modules": len(sys.modules) - before,
+        "error": error,
+    }
+
+
+def report(rows: List[Dict[str, Any]]) -> None:
+    width = max(len(row["name"]) for row in rows)
+    print(f"{'extension'.ljust(width)}  {'import ms':>10}  {'modules':>8}")
+    for row in rows:
+        line = (
+            f"{row['name'].ljust(width)}  "
+            f"{row['seconds'] * 1000:>10.1f}  {row['modules']:>8}"
+        )
+        if row["error"]:
+            line += f"  FAILED: {row['error']}"
+        print(line)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Report extension import times.")
+    parser.add_argument(
+        "--in-process",
+        action="store_true",
+        help="Import the extensions one after another in this interpreter",
+    )
+    args = parser.parse_args()
+
+    rows = [dict(name="(extension_directory)", **measure_cold("extension_directory"))]
+
+    from extension_directory import EXTENSION_DIRECTORY
+
+    for descriptor in EXTENSION_DIRECTORY:
+        name = getattr(descriptor.extension_id, "name", str(descriptor.extension_id))
+        if args.in_process:
+            measured = measure_in_process(descriptor)
+        else:
+            measured = measure_cold(descriptor.module_name)
+        rows.append(dict(name=name, **measured))
+
+    report(rows)
+
+
+if __name__ == "__main__":
+    main()
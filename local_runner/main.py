@@ -197,6 +197,18 @@ def get_mock_paste_context():
     }
 
 
+async def wait_for_background_tasks(
+    extension: ExtensionInterface, timeout: float
+) -> None:
+    """Wait until the extension's background work is done, or `timeout` seconds."""
+    tasks = getattr(extension, "tasks", None)
+    if tasks is None:
+        await asyncio.sleep(timeout)
+        return
+    if not await tasks.wait_idle(timeout):
+        log.warning(f"Background tasks still running after {timeout}s")
+
+
 async def main(
     extension_class: Type[ExtensionInterface],
     action: str,
@@ -215,10 +227,14 @@ async def main(
         extension_id=f"{extension_name}_local_test",
     )
 
+    # Extensions with a lifecycle resume stored work on start
+    if hasattr(extension, "start"):
+        await extension.start()
+
     # --- Call Extension Methods based on action ---
     if action in ["copy", "all"]:
         log.info(f"\n--- Testing {extension_name}.on_copy ---")
-        
+
         # First copy
         copy_context = get_mock_copy_context()
         copy_context["dependencies"] = dependencies
@@ -236,7 +252,7 @@ async def main(
             copy_response2 = await extension.on_copy(copy_context2)
             log.info(f"on_copy response 2: {copy_response2}")
             log.info("Waiting for background tasks (may involve network calls)...")
-            await asyncio.sleep(wait_time_seconds)
+            await wait_for_background_tasks(extension, wait_time_seconds)
         except Exception as e:
             log.error(f"Error during second copy: {e}", exc_info=True)
 
@@ -248,7 +264,7 @@ async def main(
             paste_response = await extension.on_paste(paste_context)
             log.info(f"on_paste response: {paste_response}")
             log.info("Waiting for background tasks (if any from paste)...")
-            await asyncio.sleep(wait_time_seconds)
+            await wait_for_background_tasks(extension, wait_time_seconds)
         except Exception as e:
             log.error(
                 f"Error calling on_paste or its background task: {e}", exc_info=True
@@ -277,9 +293,120 @@ async def main(
         except Exception as e:
             log.error(f"Error calling on_context_request: {e}", exc_info=True)
 
+    # Let in-flight work finish and close pooled clients before the loop exits
+    if hasattr(extension, "stop"):
+        drained = await extension.stop(timeout=wait_time_seconds)
+        log.info(
+            f"Extension stopped ({'drained' if drained else 'cancelled pending work'})"
+        )
+
     log.info(f"\n--- Local Extension Runner Finished for {extension_name} ---")
 
 
+def create_local_extension(descriptor: Any) -> ExtensionInterface:
+    """Instantiate a directory entry's extension with the mock host services."""
+    return descriptor.extension_class(
+        sse_sender=MockSSESender(),
+        llm_processor=MockLLMProcessor(),
+        extension_id=f"{descriptor.extension_id.name}_local_test",
+    )
+
+
+async def send_mock_events(
+    dispatcher: Any, action: str, dependencies: Dict[str, Any]
+) -> None:
+    """Send the mock events for `action` to every extension of `dispatcher`."""
+    if action in ["copy", "all"]:
+        copy_context = get_mock_copy_context()
+        copy_context["dependencies"] = dependencies
+        report = await dispatcher.on_copy(copy_context)
+        log.info(f"on_copy dispatch: {report.to_dict()}")
+
+    if action in ["paste", "all"]:
+        paste_context = get_mock_paste_context()
+        paste_context["dependencies"] = dependencies
+        report = await dispatcher.on_paste(paste_context)
+        log.info(f"on_paste dispatch: {report.to_dict()}")
+
+    if action in ["context", "all"]:
+        gathered = await dispatcher.gather_context({"dependencies": dependencies})
+        log.info(f"Gathered extensions_context: {gathered}")
+
+
+async def dispatch_to_all(
+    action: str,
+    dependencies: Dict[str, Any],
+    wait_time_seconds: int = 20,
+    deadline: float = 5.0,
+):
+    """Send the mock events to every extension in the directory at once."""
+    from extension_directory import EXTENSION_DIRECTORY
+    from extension_dispatcher import ExtensionDispatcher
+
+    log.info("--- Starting Local Extension Runner for all extensions ---")
+    extensions: Dict[Any, ExtensionInterface] = {}
+    for descriptor in EXTENSION_DIRECTORY:
+        try:
+            extension = create_local_extension(descriptor)
+            if hasattr(extension, "start"):
+                await extension.start()
+            extensions[descriptor.extension_id] = extension
+        except Exception as e:
+            log.error(f"Skipping {descriptor.extension_id.name}: {e}", exc_info=True)
+
+    dispatcher = ExtensionDispatcher(extensions, deadline=deadline)
+    await send_mock_events(dispatcher, action, dependencies)
+
+    for extension in extensions.values():
+        await wait_for_background_tasks(extension, wait_time_seconds)
+        if hasattr(extension, "stop"):
+            await extension.stop(timeout=wait_time_seconds)
+
+    log.info("\n--- Local Extension Runner Finished for all extensions ---")
+
+
+async def watch_and_reload(
+    action: str,
+    dependencies: Dict[str, Any],
+    wait_time_seconds: int = 20,
+    deadline: float = 5.0,
+    poll_seconds: float = 1.0,
+):
+    """
+    Load every extension, send the mock events, then keep checking the source
+    tree: extensions whose code changed are hot reloaded and sent the events
+    again. Runs until interrupted.
+    """
+    from extension_directory import EXTENSION_DIRECTORY
+    from extension_dispatcher import ExtensionDispatcher
+    from extension_reloader import ExtensionReloader
+
+    log.info("--- Starting Local Extension Runner with hot reload ---")
+    reloader = ExtensionReloader(
+        EXTENSION_DIRECTORY, create_local_extension, stop_timeout=wait_time_seconds
+    )
+    await reloader.load_all()
+    # The dispatcher reads `instances` on every event, so it always reaches
+    # the current instance of each extension
+    dispatcher = ExtensionDispatcher(reloader.instances, deadline=deadline)
+    await send_mock_events(dispatcher, action, dependencies)
+    log.info("Watching extension sources for changes (Ctrl-C to stop)...")
+
+    try:
+        while True:
+            await asyncio.sleep(poll_seconds)
+            report = await reloader.reload()
+            if report.reloaded or report.failed:
+                log.info(f"Reload: {report.to_dict()}")
+            if report.reloaded:
+                await send_mock_events(dispatcher, action, dependencies)
+    finally:
+        for extension in reloader.instances.values():
+            if hasattr(extension, "stop"):
+                await extension.stop(timeout=wait_time_seconds)
+        log.info("\n--- Local Extension Runner Finished ---")
+
+
 if __name__ == "__main__":
     parser = argparse.ArgumentParser(
         description="Run local tests for NotionMCPExtension."
@@ -289,6 +416,19 @@ if __name__ == "__main__":
         choices=["copy", "paste", "context", "all"],
         help="Specify which action to test: 'copy', 'paste', 'context', or 'all'.",
     )
+    parser.add_argument(
+        "--all-extensions",
+        action="store_true",
+        help="Send the events to every extension in the directory concurrently.",
+    )
+    parser.add_argument(
+        "--reload",
+        action="store_true",
+        help=(
+            "With --all-extensions, keep running and hot reload extensions whose "
+            "source changed, sending them the events again."
+        ),
+    )
     args = parser.parse_args()
     # Using the hardcoded values from the previous version for now:
     dependencies = {
@@ -303,6 +443,24 @@ if __name__ == "__main__":
         log.error("Missing required dependencies: mcp_url or anthropic_api_key")
         sys.exit(1)
 
+    if args.all_extensions:
+        dependencies[EXTENSION_DEPENDENCIES.calendar_mcp_url.name] = os.getenv(
+            "CALENDAR_MCP_URL"
+        )
+        dependencies[EXTENSION_DEPENDENCIES.my_location.name] = os.getenv("MY_LOCATION")
+        if args.reload:
+            try:
+                asyncio.run(
+                    watch_and_reload(args.action, dependencies, wait_time_seconds=20)
+                )
+            except KeyboardInterrupt:
+                pass
+        else:
+            asyncio.run(
+                dispatch_to_all(args.action, dependencies, wait_time_seconds=20)
+            )
+        sys.exit(0)
+
     # Run the main async function
     # Pass the action and loaded dependencies
     from extensions.notion_mcp_extension.notion_mcp_extension import NotionMCPExtension
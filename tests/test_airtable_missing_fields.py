@@ -0,0 +1,101 @@
+import pytest
+
+pytest.importorskip("tabtabtab_lib")
+
+from extensions.daily_digest_extension.daily_digest_extension import (  # noqa: E402
+    DailyDigestExtension,
+    DigestEntry,
+)
+from extensions.daily_digest_extension.http_client import HTTPError  # noqa: E402
+from extensions.daily_digest_extension.tenant import (  # noqa: E402
+    DigestConfig,
+    TenantState,
+)
+
+UNKNOWN_FIELD = '{"error":{"type":"UNKNOWN_FIELD_NAME","message":"Unknown field"}}'
+
+
+class FakeAirtable:
+    def __init__(self, missing):
+        self.missing = missing
+        self.created = []
+        self.updated = []
+
+    def _check(self, fields):
+        if self.missing & set(fields):
+            raise HTTPError(422, UNKNOWN_FIELD)
+
+    async def create_records(self, fields, table=None):
+        for f in fields:
+            self._check(f)
+        self.created.extend(fields)
+        return [{"id": f"rec{len(self.created)}"}]
+
+    async def update_records(self, updates, table=None):
+        for f in updates.values():
+            self._check(f)
+        self.updated.append(updates)
+        return []
+
+
+def make_tenant(missing):
+    tenant = TenantState(
+        DigestConfig.from_dependencies(
+            {
+                "airtable_api_key": "key",
+                "airtable_base_id": "base",
+                "airtable_table_name": "table",
+            }
+        )
+    )
+    tenant.airtable = FakeAirtable(missing)
+    return tenant
+
+
+def make_entry():
+    return DigestEntry(
+        url="https://example.com",
+        title="Example",
+        content="text",
+        timestamp="2025-04-16T10:00:00",
+        article_hash="abc",
+    )
+
+
+@pytest.fixture
+def extension():
+    # The helpers under test use no state set up by __init__
+    return DailyDigestExtension.__new__(DailyDigestExtension)
+
+
+def test_is_unknown_field():
+    assert HTTPError(422, UNKNOWN_FIELD).is_unknown_field
+    assert not HTTPError(422, "INVALID_VALUE_FOR_COLUMN").is_unknown_field
+    assert not HTTPError(404, UNKNOWN_FIELD).is_unknown_field
+
+
+async def test_entry_saved_without_missing_article_field(extension, caplog):
+    tenant = make_tenant({"Article"})
+    record_id = await extension._save_to_airtable(tenant, make_entry())
+    assert record_id == "rec1"
+    assert "Article" not in tenant.airtable.created[0]
+    assert "Article" in tenant.missing_fields
+    assert "'Article'" in caplog.text
+
+    # Later entries skip the field without another failed request
+    assert await extension._save_to_airtable(tenant, make_entry())
+    assert len(tenant.airtable.created) == 2
+
+
+async def test_entry_keeps_article_field_when_present(extension):
+    tenant = make_tenant(set())
+    await extension._save_to_airtable(tenant, make_entry())
+    assert tenant.airtable.created[0]["Article"] == "abc"
+
+
+async def test_copy_count_skipped_when_field_missing(extension):
+    tenant = make_tenant({"CopyCount"})
+    assert not await extension._update_copy_count(tenant, "rec1", 2)
+    assert "CopyCount" in tenant.missing_fields
+    assert not await extension._update_copy_count(tenant, "rec1", 3)
+    assert tenant.airtable.updated == []
@@ -0,0 +1,139 @@
+import pytest
+
+pytest.importorskip("tabtabtab_lib")
+
+from extensions.daily_digest_extension.analysis_store import (  # noqa: E402
+    AnalysisStore,
+    DigestAnalysis,
+    fingerprint,
+)
+from extensions.daily_digest_extension.daily_digest_extension import (  # noqa: E402
+    DailyDigestExtension,
+    DigestEntry,
+)
+from extensions.daily_digest_extension.tenant import (  # noqa: E402
+    DigestConfig,
+    TenantState,
+)
+
+
+def make_analysis(date="2025-04-16", **fields):
+    values = {
+        "prompt_hash": fingerprint("prompt"),
+        "watermark": "2025-04-16T10:00:00",
+        "entry_count": 2,
+        "analysis": "Two entries",
+        "generated_at": "2025-04-16T10:05:00",
+        **fields,
+    }
+    return DigestAnalysis(date=date, **values)
+
+
+def make_entry(hour):
+    return DigestEntry(
+        url=f"https://example.com/{hour}",
+        title=f"Entry {hour}",
+        content="text",
+        timestamp=f"2025-04-16T{hour:02d}:00:00",
+    )
+
+
+@pytest.fixture
+def tenant(tmp_path):
+    return TenantState(
+        DigestConfig.from_dependencies(
+            {
+                "airtable_api_key": "key",
+                "airtable_base_id": "base",
+                "airtable_table_name": "table",
+                "daily_digest_storage_path": str(tmp_path),
+            }
+        )
+    )
+
+
+@pytest.fixture
+def extension(monkeypatch):
+    # _update_digest uses no state set up by __init__
+    extension = DailyDigestExtension.__new__(DailyDigestExtension)
+    extension.extension_id = "daily_digest"
+    extension.analyzed = []
+
+    async def generate(tenant, prompt, entries, previous=None, covered=None):
+        extension.analyzed.append(([e.title for e in entries], previous))
+        return f"{len(entries)} new"
+
+    monkeypatch.setattr(extension, "_generate_analysis", generate)
+    return extension
+
+
+def test_fingerprint_is_stable_and_distinct():
+    assert fingerprint("prompt") == fingerprint("prompt")
+    assert fingerprint("prompt") != fingerprint("other prompt")
+    assert len(fingerprint("prompt")) == 16
+
+
+def test_round_trip_per_date_and_tenant(tmp_path):
+    store = AnalysisStore(str(tmp_path))
+    analysis = make_analysis()
+    store.save(analysis, "tenant")
+
+    loaded = store.load("2025-04-16", "tenant")
+    assert loaded.to_dict() == analysis.to_dict()
+    assert store.load("2025-04-17", "tenant") is None
+    assert store.load("2025-04-16", "other") is None
+    assert not list(tmp_path.glob("*.tmp"))
+
+
+def test_unreadable_analysis_is_ignored(tmp_path):
+    store = AnalysisStore(str(tmp_path))
+    store.save(make_analysis(), "tenant")
+    (path,) = tmp_path.glob("analysis_*.json")
+    path.write_text("{not json")
+    assert store.load("2025-04-16", "tenant") is None
+
+
+async def test_update_analyzes_only_entries_past_the_watermark(extension, tenant):
+    first = await extension._update_digest(tenant, "prompt", [make_entry(9)])
+    assert first.entry_count == 1
+    assert first.watermark == "2025-04-16T09:00:00"
+
+    entries = [make_entry(9), make_entry(10)]
+    second = await extension._update_digest(tenant, "prompt", entries)
+    assert extension.analyzed[-1][0] == ["Entry 10"]
+    assert extension.analyzed[-1][1].analysis == first.analysis
+    assert second.entry_count == 2
+    assert second.watermark == "2025-04-16T10:00:00"
+
+    # Nothing new: the stored digest is served without another LLM call
+    third = await extension._update_digest(tenant, "prompt", entries)
+    assert third.analysis == second.analysis
+    assert len(extension.analyzed) == 2
+
+
+async def test_changed_prompt_rebuilds_from_scratch(extension, tenant):
+    await extension._update_digest(tenant, "prompt", [make_entry(9)])
+    digest = await extension._update_digest(
+        tenant, "new prompt", [make_entry(9), make_entry(10)]
+    )
+    assert extension.analyzed[-1] == (["Entry 9", "Entry 10"], None)
+    assert digest.prompt_hash == fingerprint("new prompt")
+
+
+async def test_entry_count_mismatch_below_watermark_rebuilds(extension, tenant):
+    await extension._update_digest(tenant, "prompt", [make_entry(9), make_entry(10)])
+
+    # An entry older than the watermark appeared (e.g. a late save), so the
+    # stored analysis no longer covers exactly the entries below it
+    entries = [make_entry(8), make_entry(9), make_entry(10), make_entry(11)]
+    digest = await extension._update_digest(tenant, "prompt", entries)
+    assert extension.analyzed[-1] == (
+        ["Entry 8", "Entry 9", "Entry 10", "Entry 11"],
+        None,
+    )
+    assert digest.entry_count == 4
+
+    # Likewise when one was deleted
+    entries = [make_entry(9), make_entry(10), make_entry(11)]
+    await extension._update_digest(tenant, "prompt", entries)
+    assert extension.analyzed[-1][1] is None
@@ -0,0 +1,80 @@
+import pytest
+
+pytest.importorskip("tabtabtab_lib")
+
+from extensions.calendar_mcp_extension.calendar_mcp_extension import (  # noqa: E402
+    CALENDAR_RELEVANCE,
+    COPY_RELEVANCE_THRESHOLD,
+)
+from extensions.relevance import AppRule  # noqa: E402
+
+CHROME = {"bundleIdentifier": "com.google.Chrome"}
+CALENDAR = {"bundleIdentifier": "com.apple.iCal"}
+
+
+def combined(*weights):
+    miss = 1.0
+    for weight in weights:
+        miss *= 1.0 - weight
+    return 1.0 - miss
+
+
+def test_threshold_is_above_every_single_rule():
+    assert all(
+        rule.weight < COPY_RELEVANCE_THRESHOLD for rule in CALENDAR_RELEVANCE.rules
+    )
+
+
+def test_app_is_not_a_second_signal():
+    app = [r.weight for r in CALENDAR_RELEVANCE.rules if isinstance(r, AppRule)]
+    text_rules = [
+        r.weight
+        for r in CALENDAR_RELEVANCE.rules
+        if r.weight > 0 and not isinstance(r, AppRule)
+    ]
+    assert max(combined(weight, *app) for weight in text_rules) < (
+        COPY_RELEVANCE_THRESHOLD
+    )
+    # Any two text signals are enough, with or without the app
+    weakest, second = sorted(text_rules)[:2]
+    assert combined(weakest, second) >= COPY_RELEVANCE_THRESHOLD
+
+
+@pytest.mark.parametrize("text", ["What time works for you?", "Meeting notes"])
+def test_single_signal_copied_from_calendar_app_is_not_enough(text):
+    assert not CALENDAR_RELEVANCE.is_relevant(text, CALENDAR, COPY_RELEVANCE_THRESHOLD)
+
+
+@pytest.mark.parametrize(
+    "text",
+    [
+        "the event loop in python",
+        "I'll book it",
+        "She was available for comment",
+        "Meeting notes are in the shared folder",
+        "See you tomorrow",
+    ],
+)
+def test_single_signal_is_not_enough_for_a_copy(text):
+    assert not CALENDAR_RELEVANCE.is_relevant(text, CHROME, COPY_RELEVANCE_THRESHOLD)
+
+
+@pytest.mark.parametrize(
+    "text",
+    [
+        "Team meeting tomorrow at 3pm",
+        "Can we book a call next Monday?",
+        "Dentist appointment on April 16",
+        "April 16 at 3pm",
+        "Lunch on Friday?",
+    ],
+)
+def test_event_like_copies_are_relevant(text):
+    assert CALENDAR_RELEVANCE.is_relevant(text, CHROME, COPY_RELEVANCE_THRESHOLD)
+
+
+def test_event_copied_from_a_developer_app_is_not_relevant():
+    terminal = {"bundleIdentifier": "com.apple.Terminal"}
+    assert not CALENDAR_RELEVANCE.is_relevant(
+        "Team meeting tomorrow at 3pm", terminal, COPY_RELEVANCE_THRESHOLD
+    )
@@ -0,0 +1,108 @@
+import pytest
+
+from extensions.clipboard_history_extension.clipboard_history import (
+    ClipboardHistory,
+    tokenize,
+)
+
+SLOT_SIZE = 128
+
+
+def texts(entries):
+    return [entry.text for entry in entries]
+
+
+def test_not_opened_until_used(tmp_path):
+    path = tmp_path / "history.bin"
+    history = ClipboardHistory(str(path), capacity=4, slot_size=SLOT_SIZE)
+    assert not history.is_open and not path.exists()
+    history.open()
+    assert history.is_open and path.exists()
+    history.close()
+
+
+def test_ring_wraparound_keeps_latest_and_drops_evicted_from_indexes():
+    history = ClipboardHistory(capacity=3, slot_size=SLOT_SIZE)
+    for i in range(5):
+        history.add(f"copy number{i} shared", app="com.app", url=f"https://x/{i}")
+
+    assert len(history) == 3
+    assert texts(history.search()) == [
+        "copy number4 shared",
+        "copy number3 shared",
+        "copy number2 shared",
+    ]
+    assert texts(history.search(terms=["number1"])) == []
+    assert texts(history.search(terms=["number3"])) == ["copy number3 shared"]
+    assert texts(history.search(url="https://x/0")) == []
+    assert len(history.search(app="com.app", terms=["shared"], limit=10)) == 3
+    assert len(history.search(limit=2)) == 2
+
+
+def test_search_filters_combine():
+    history = ClipboardHistory(capacity=10, slot_size=SLOT_SIZE)
+    history.add("alpha beta", app="com.one", url="https://a/page#top")
+    history.add("alpha gamma", app="com.two", url="https://a/page/")
+    assert texts(history.search(terms=["ALPHA"])) == ["alpha gamma", "alpha beta"]
+    assert texts(history.search(terms=["alpha beta"])) == ["alpha beta"]
+    assert texts(history.search(app="COM.ONE")) == ["alpha beta"]
+    assert len(history.search(url="https://a/page")) == 2
+
+
+@pytest.mark.parametrize("terms", [["a"], ["!!"], ["a", "?"]])
+def test_terms_without_tokens_match_nothing(terms):
+    history = ClipboardHistory(capacity=10, slot_size=SLOT_SIZE)
+    history.add("a b c")
+    assert not any(tokenize(term) for term in terms)
+    assert history.search(terms=terms) == []
+
+
+def test_blank_terms_are_ignored():
+    history = ClipboardHistory(capacity=10, slot_size=SLOT_SIZE)
+    history.add("hello there")
+    assert texts(history.search(terms=["", "  "])) == ["hello there"]
+
+
+def test_long_text_is_truncated_on_a_character_boundary():
+    history = ClipboardHistory(capacity=2, slot_size=SLOT_SIZE)
+    entry = history.add("é" * SLOT_SIZE)
+    assert 0 < len(entry.text.encode("utf-8")) <= SLOT_SIZE
+    assert set(entry.text) == {"é"}
+
+
+def test_reopen_restores_entries_and_indexes(tmp_path):
+    path = str(tmp_path / "history.bin")
+    history = ClipboardHistory(path, capacity=3, slot_size=SLOT_SIZE)
+    for i in range(4):
+        history.add(f"entry{i}", app="com.app")
+    history.close()
+    assert not history.is_open
+
+    # The same object reopens, as does a new one for the same file
+    assert texts(history.search(terms=["entry3"])) == ["entry3"]
+    history.close()
+    reopened = ClipboardHistory(path, capacity=3, slot_size=SLOT_SIZE)
+    assert texts(reopened.search()) == ["entry3", "entry2", "entry1"]
+    assert texts(reopened.search(terms=["entry0"])) == []
+    reopened.add("entry4")
+    assert texts(reopened.search(app="com.app")) == ["entry3", "entry2"]
+    reopened.close()
+
+
+def test_reopen_with_another_layout_starts_over(tmp_path):
+    path = str(tmp_path / "history.bin")
+    history = ClipboardHistory(path, capacity=3, slot_size=SLOT_SIZE)
+    history.add("old")
+    history.close()
+
+    resized = ClipboardHistory(path, capacity=5, slot_size=SLOT_SIZE)
+    assert len(resized) == 0
+    resized.close()
+
+
+def test_clear():
+    history = ClipboardHistory(capacity=3, slot_size=SLOT_SIZE)
+    history.add("something here")
+    history.clear()
+    assert len(history) == 0
+    assert history.search(terms=["something"]) == []
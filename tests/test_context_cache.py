@@ -0,0 +1,168 @@
+import asyncio
+
+from extensions.context_cache import ContextCache, query_key
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+class Provider:
+    def __init__(self):
+        self.calls = 0
+        self.gate = None
+
+    async def compute(self):
+        self.calls += 1
+        answer = self.calls
+        if self.gate is not None:
+            await self.gate.wait()
+        return {"answer": answer}
+
+
+def test_query_key_normalizes_query_and_separates_scopes():
+    first = query_key("p", "src", {"q": "  hello\n  world "})
+    assert first == query_key("p", "src", {"q": "hello world"})
+    assert first != query_key("p", "other", {"q": "hello world"})
+    assert first != query_key("p", "src", {"q": "hello world"}, scope="tenant")
+
+
+async def test_hit_until_ttl_expires():
+    clock = Clock()
+    cache = ContextCache("test", ttl=60, clock=clock)
+    provider = Provider()
+
+    assert await cache.get_or_compute("src", {}, provider.compute) == {"answer": 1}
+    clock.now += 59
+    assert await cache.get_or_compute("src", {}, provider.compute) == {"answer": 1}
+    clock.now += 1
+    assert await cache.get_or_compute("src", {}, provider.compute) == {"answer": 2}
+    assert (cache.hits, cache.misses) == (1, 2)
+
+
+async def test_per_call_ttl_and_zero_ttl():
+    clock = Clock()
+    cache = ContextCache("test", ttl=60, clock=clock)
+    provider = Provider()
+
+    await cache.get_or_compute("src", {}, provider.compute, ttl=5)
+    clock.now += 5
+    await cache.get_or_compute("src", {}, provider.compute, ttl=0)
+    await cache.get_or_compute("src", {}, provider.compute)
+    assert provider.calls == 3
+
+
+async def test_none_is_not_cached():
+    cache = ContextCache("test")
+    calls = []
+
+    async def compute():
+        calls.append(1)
+
+    assert await cache.get_or_compute("src", {}, compute) is None
+    assert await cache.get_or_compute("src", {}, compute) is None
+    assert len(calls) == 2 and len(cache) == 0
+
+
+async def test_invalidate_scope_drops_only_that_scope():
+    cache = ContextCache("test")
+    provider = Provider()
+    await cache.get_or_compute("src", {}, provider.compute, scope="a")
+    await cache.get_or_compute("src", {}, provider.compute, scope="b")
+
+    assert cache.invalidate("a") == 1
+    await cache.get_or_compute("src", {}, provider.compute, scope="a")
+    await cache.get_or_compute("src", {}, provider.compute, scope="b")
+    assert provider.calls == 3
+
+
+async def test_invalidate_all():
+    cache = ContextCache("test")
+    provider = Provider()
+    await cache.get_or_compute("src", {}, provider.compute, scope="a")
+    await cache.get_or_compute("src", {"q": 1}, provider.compute)
+
+    assert cache.invalidate() == 2
+    assert len(cache) == 0
+
+
+async def test_lru_bound():
+    cache = ContextCache("test", max_entries=2)
+    provider = Provider()
+    for q in (1, 2, 1, 3):
+        await cache.get_or_compute("src", {"q": q}, provider.compute)
+    # 2 was least recently used when 3 arrived
+    await cache.get_or_compute("src", {"q": 1}, provider.compute)
+    assert provider.calls == 3
+    await cache.get_or_compute("src", {"q": 2}, provider.compute)
+    assert provider.calls == 4
+
+
+async def test_concurrent_misses_share_one_computation():
+    cache = ContextCache("test")
+    provider = Provider()
+    provider.gate = asyncio.Event()
+    waiting = [
+        asyncio.ensure_future(cache.get_or_compute("src", {}, provider.compute))
+        for _ in range(3)
+    ]
+    await asyncio.sleep(0)
+    provider.gate.set()
+    assert await asyncio.gather(*waiting) == [{"answer": 1}] * 3
+    assert provider.calls == 1
+
+
+async def _invalidated_while_computing(scope, invalidate_scope):
+    cache = ContextCache("test")
+    provider = Provider()
+    provider.gate = asyncio.Event()
+    running = asyncio.ensure_future(
+        cache.get_or_compute("src", {}, provider.compute, scope=scope)
+    )
+    await asyncio.sleep(0)
+    cache.invalidate(invalidate_scope)
+
+    # A caller arriving after the invalidation doesn't join the stale run
+    fresh = asyncio.ensure_future(
+        cache.get_or_compute("src", {}, provider.compute, scope=scope)
+    )
+    await asyncio.sleep(0)
+    provider.gate.set()
+    assert await running == {"answer": 1}
+    assert await fresh == {"answer": 2}
+    return cache, provider
+
+
+async def test_result_computed_across_scope_invalidation_is_not_stored_stale():
+    cache, provider = await _invalidated_while_computing("a", "a")
+    # Only the computation started after the invalidation was stored
+    assert await cache.get_or_compute("src", {}, provider.compute, scope="a") == {
+        "answer": 2
+    }
+    assert provider.calls == 2
+
+
+async def test_result_computed_across_full_invalidation_is_not_stored_stale():
+    cache, provider = await _invalidated_while_computing("a", None)
+    assert await cache.get_or_compute("src", {}, provider.compute, scope="a") == {
+        "answer": 2
+    }
+    assert provider.calls == 2
+
+
+async def test_invalidating_another_scope_keeps_result():
+    cache = ContextCache("test")
+    provider = Provider()
+    provider.gate = asyncio.Event()
+    running = asyncio.ensure_future(
+        cache.get_or_compute("src", {}, provider.compute, scope="a")
+    )
+    await asyncio.sleep(0)
+    cache.invalidate("b")
+    provider.gate.set()
+    await running
+    assert len(cache) == 1
@@ -0,0 +1,26 @@
+import pytest
+
+pytest.importorskip("tabtabtab_lib")
+
+from tabtabtab_lib.extension_directory import ExtensionDescriptor  # noqa: E402
+from tabtabtab_lib.extension_interface import ExtensionInterface  # noqa: E402
+
+from extension_directory import EXTENSION_DIRECTORY  # noqa: E402
+
+
+@pytest.mark.parametrize(
+    "entry", EXTENSION_DIRECTORY, ids=lambda entry: entry.extension_id.name
+)
+def test_every_entry_resolves_to_an_extension_descriptor(entry):
+    descriptor = entry.descriptor
+    assert isinstance(descriptor, ExtensionDescriptor)
+    assert descriptor.extension_id == entry.extension_id
+    assert descriptor.dependencies == entry.dependencies
+    assert descriptor.extension_class is entry.extension_class
+    assert issubclass(entry.extension_class, ExtensionInterface)
+    assert entry.extension_class.__name__ == entry.import_path.rpartition(":")[2]
+
+
+def test_extension_ids_are_unique():
+    ids = [entry.extension_id for entry in EXTENSION_DIRECTORY]
+    assert len(ids) == len(set(ids))
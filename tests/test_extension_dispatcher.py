@@ -0,0 +1,109 @@
+import asyncio
+from types import SimpleNamespace
+
+from extension_dispatcher import ExtensionDispatcher
+
+
+class Extension:
+    def __init__(self, response="ok", delay=0.0, error=None, contexts=()):
+        self.response = response
+        self.delay = delay
+        self.error = error
+        self.contexts = list(contexts)
+        self.seen = []
+
+    async def _answer(self, context):
+        self.seen.append(context)
+        await asyncio.sleep(self.delay)
+        if self.error is not None:
+            raise self.error
+        return self.response
+
+    async def on_copy(self, context):
+        return await self._answer(context)
+
+    async def on_paste(self, context):
+        return await self._answer(context)
+
+    async def on_context_request(self, source_extension_id, context_query):
+        contexts = [SimpleNamespace(description=d, context=c) for d, c in self.contexts]
+        return SimpleNamespace(contexts=contexts)
+
+
+async def test_extension_past_its_deadline_times_out_alone():
+    extensions = {"fast": Extension("fast"), "slow": Extension("slow", delay=1)}
+    dispatcher = ExtensionDispatcher(extensions, deadline=1, deadlines={"slow": 0.05})
+    report = await dispatcher.on_copy({})
+    assert report.responses == {"fast": "fast"}
+    results = {r.extension_id: r for r in report.results}
+    assert results["slow"].timed_out and not results["slow"].ok
+    assert results["fast"].ok
+    assert report.total_seconds < 0.5
+
+
+async def test_failing_extension_does_not_affect_others():
+    extensions = {
+        "broken": Extension(error=RuntimeError("boom")),
+        "working": Extension("done"),
+    }
+    report = await ExtensionDispatcher(extensions).on_copy({"text": "a"})
+    assert report.responses == {"working": "done"}
+    broken = next(r for r in report.results if r.extension_id == "broken")
+    assert broken.error == "RuntimeError('boom')"
+
+
+async def test_each_extension_gets_its_own_context():
+    first, second = Extension(), Extension()
+    await ExtensionDispatcher({"a": first, "b": second}).on_copy({"text": "a"})
+    assert first.seen == second.seen == [{"text": "a"}]
+    assert first.seen[0] is not second.seen[0]
+
+
+async def test_paste_merges_gathered_context():
+    calendar = Extension(contexts=[("events", "[]")])
+    notes = Extension(contexts=[("notes", "n")])
+    dispatcher = ExtensionDispatcher({"calendar": calendar, "notes": notes})
+    await dispatcher.on_paste(
+        {"extensions_context": {"notes": {"contexts": []}, "command": "x"}}
+    )
+    assert calendar.seen[0]["extensions_context"] == {
+        "calendar": {"contexts": [{"description": "events", "context": "[]"}]},
+        "notes": {"contexts": []},
+        "command": "x",
+    }
+
+
+async def test_report_contents():
+    extensions = {"quiet": Extension(None), "talks": Extension("hi", delay=0.02)}
+    report = await ExtensionDispatcher(extensions).on_paste({})
+    data = report.to_dict()
+    assert data["event"] == "on_paste"
+    assert [r["extension_id"] for r in data["results"]] == ["quiet", "talks"]
+    assert [r["responded"] for r in data["results"]] == [False, True]
+    assert data["context_seconds"] <= data["first_response_seconds"]
+    assert data["first_response_seconds"] <= data["total_seconds"]
+
+
+async def test_slow_response_handler_does_not_hold_back_others():
+    events = []
+    extensions = {"first": Extension("first"), "second": Extension("second", 0.02)}
+
+    async def forward(result):
+        events.append(f"got {result.response}")
+        if result.response == "first":
+            await asyncio.sleep(0.2)
+        events.append(f"sent {result.response}")
+
+    report = await ExtensionDispatcher(extensions).on_copy({}, on_response=forward)
+    assert events == ["got first", "got second", "sent second", "sent first"]
+    assert report.total_seconds < 0.2
+
+
+async def test_failing_response_handler_is_ignored():
+    async def forward(result):
+        raise RuntimeError("gone")
+
+    report = await ExtensionDispatcher({"a": Extension()}).on_copy(
+        {}, on_response=forward
+    )
+    assert report.responses == {"a": "ok"}
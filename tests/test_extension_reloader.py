@@ -0,0 +1,187 @@
+import sys
+import types
+
+import pytest
+
+from extension_reloader import ExtensionReloader, transfer_state
+
+
+class Pool:
+    pass
+
+
+class Extension:
+    TRANSFERABLE_STATE = ("pool", "pending", "missing")
+
+    def __init__(self):
+        self.pool = Pool()
+        self.pending = {}
+
+
+def test_transfer_state_swaps_listed_attributes():
+    old, new = Extension(), Extension()
+    old_pool, new_pool = old.pool, new.pool
+    old.pending["device"] = ["text"]
+    old.unlisted = "kept"
+
+    assert transfer_state(old, new) == ["pool", "pending"]
+    assert new.pool is old_pool and old.pool is new_pool
+    assert new.pending == {"device": ["text"]} and old.pending == {}
+    assert "unlisted" not in new.__dict__
+
+
+def test_transfer_state_skips_none():
+    old, new = Extension(), Extension()
+    old.pool = None
+    new_pool = new.pool
+    assert transfer_state(old, new) == ["pending"]
+    assert new.pool is new_pool
+
+
+def test_transfer_state_skips_values_of_reloaded_types(monkeypatch):
+    module = types.ModuleType("reloaded_pool")
+    exec("class Pool:\n    pass\n", module.__dict__)
+    monkeypatch.setitem(sys.modules, "reloaded_pool", module)
+    old, new = Extension(), Extension()
+    old.pool = module.Pool()
+    assert transfer_state(old, new) == ["pool", "pending"]
+
+    # The module is imported again, so the old value's class is stale
+    fresh = types.ModuleType("reloaded_pool")
+    exec("class Pool:\n    pass\n", fresh.__dict__)
+    monkeypatch.setitem(sys.modules, "reloaded_pool", fresh)
+    old, new = Extension(), Extension()
+    old.pool = module.Pool()
+    new_pool = new.pool
+    assert transfer_state(old, new) == ["pending"]
+    assert new.pool is new_pool
+
+
+class SharingExtension(Extension):
+    SHARED_STATE = ("copies",)
+
+    def __init__(self):
+        super().__init__()
+        self.copies = {}
+
+
+def test_transfer_state_shares_listed_attributes():
+    old, new = SharingExtension(), SharingExtension()
+    old.copies["device"] = ["text"]
+    assert transfer_state(old, new) == ["pool", "pending", "copies"]
+    assert new.copies is old.copies
+
+    # Work the old instance still finishes updates what the new one holds
+    old.copies.pop("device")
+    assert new.copies == {}
+
+
+async def test_notion_push_run_by_old_instance_is_not_pushed_again(monkeypatch):
+    pytest.importorskip("tabtabtab_lib")
+    from extensions.notion_mcp_extension.notion_mcp_extension import (
+        NotionMCPExtension,
+    )
+
+    jobs, pushed = [], []
+
+    def create():
+        instance = NotionMCPExtension(
+            sse_sender=None, llm_processor=None, extension_id="notion"
+        )
+
+        async def submit_job(kind, payload, **kwargs):
+            jobs.append(payload)
+
+        async def push(request_id, text, device_id, dependencies):
+            pushed.append(text)
+
+        monkeypatch.setattr(instance, "submit_job", submit_job)
+        monkeypatch.setattr(instance, "_process_in_background", push)
+        return instance
+
+    def copy(request_id, text):
+        return {"request_id": request_id, "device_id": "d", "selected_text": text}
+
+    old = create()
+    await old.on_copy(copy("r1", "Remember to book the venue for Friday"))
+    new = create()
+    transfer_state(old, new)
+
+    # The old instance claims the queued push while it drains
+    await old._process_pending_copies(**jobs[-1])
+    await new.on_copy(copy("r2", "Idea: ask the team about a summer party"))
+    await new._process_pending_copies(**jobs[-1])
+    assert pushed == [
+        "Remember to book the venue for Friday",
+        "Idea: ask the team about a summer party",
+    ]
+
+
+class Descriptor:
+    def __init__(self, extension_id, module_name):
+        self.extension_id = extension_id
+        self.module_name = module_name
+
+    def unload(self):
+        pass
+
+
+class Instance:
+    def __init__(self, reloader, events, name):
+        self.reloader = reloader
+        self.events = events
+        self.name = name
+
+    async def start(self):
+        self.events.append(f"start {self.name}")
+
+    async def stop(self, timeout):
+        current = self.reloader.instances["ext"].name
+        self.events.append(f"stop {self.name} while serving {current}")
+
+    async def take_over(self):
+        self.events.append(f"take over {self.name}")
+
+
+@pytest.fixture
+def source(tmp_path, monkeypatch):
+    module = tmp_path / "reload_target.py"
+    module.write_text("VALUE = 1\n")
+    monkeypatch.delitem(sys.modules, "reload_target", raising=False)
+    return module
+
+
+async def test_reload_serves_new_instance_before_stopping_old(source):
+    events = []
+    names = iter(["v1", "v2"])
+    reloader = ExtensionReloader(
+        [Descriptor("ext", "reload_target")],
+        lambda descriptor: Instance(reloader, events, next(names)),
+        root=str(source.parent),
+    )
+    await reloader.load_all()
+
+    source.write_text("VALUE = 22\n")
+    report = await reloader.reload()
+
+    assert report.reloaded == ["ext"]
+    assert reloader.instances["ext"].name == "v2"
+    assert events == [
+        "start v1",
+        "start v2",
+        "stop v1 while serving v2",
+        "take over v2",
+    ]
+
+
+async def test_reload_leaves_unchanged_extensions_alone(source):
+    events = []
+    reloader = ExtensionReloader(
+        [Descriptor("ext", "reload_target")],
+        lambda descriptor: Instance(reloader, events, "v1"),
+        root=str(source.parent),
+    )
+    await reloader.load_all()
+    report = await reloader.reload()
+    assert report.unchanged == ["ext"] and report.reloaded == []
+    assert events == ["start v1"]
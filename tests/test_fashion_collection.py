@@ -0,0 +1,80 @@
+from extensions.fashion_ideas.fashion_collection import FashionCollection, FashionItem
+
+
+def item(n, date=None, **fields):
+    return FashionItem(
+        id=f"item_{n}", date_added=date or f"2024-01-01 00:00:{n:02d}", **fields
+    )
+
+
+def ids(items):
+    return [i.id for i in items]
+
+
+def test_pages_walk_every_item_newest_first():
+    collection = FashionCollection(item(n) for n in range(25))
+    seen, cursor = [], None
+    while True:
+        page, cursor = collection.page(cursor, limit=10)
+        seen.append(ids(page))
+        if cursor is None:
+            break
+    assert [len(p) for p in seen] == [10, 10, 5]
+    assert sum(seen, []) == [f"item_{n}" for n in reversed(range(25))]
+
+
+def test_bad_cursor_starts_from_newest():
+    collection = FashionCollection(item(n) for n in range(3))
+    assert ids(collection.page("nope", limit=2)[0]) == ["item_2", "item_1"]
+    assert collection.page("0", limit=2) == ([], None)
+
+
+def test_items_are_ordered_by_date_added():
+    collection = FashionCollection([item(1), item(3)])
+    collection.add(item(2))
+    assert ids(collection) == ["item_1", "item_2", "item_3"]
+    assert ids(collection.last(2)) == ["item_2", "item_3"]
+
+
+def test_changes_since_across_versions():
+    collection = FashionCollection()
+    collection.add(item(1))
+    collection.add(item(2))
+    assert collection.version == 2
+    collection.update("item_1", {"notes": "hem it"})
+    assert collection.version == 3
+
+    assert ids(collection.changes_since(0)) == ["item_2", "item_1"]
+    assert ids(collection.changes_since(1)) == ["item_2", "item_1"]
+    assert ids(collection.changes_since(2)) == ["item_1"]
+    assert collection.changes_since(3) == []
+
+
+def test_loaded_items_keep_their_versions():
+    stored = [
+        {"id": "item_1", "version": 4, "date_added": "1"},
+        {"id": "item_2", "version": 2, "date_added": "2"},
+    ]
+    collection = FashionCollection.from_dicts(stored)
+    assert collection.version == 4
+    assert ids(collection.changes_since(2)) == ["item_1"]
+    collection.add(item(3))
+    assert collection.get("item_3").version == 5
+
+
+def test_category_counts_follow_updates_and_replays():
+    collection = FashionCollection(
+        [item(1, category="Shoes"), item(2, category="Shoes"), item(3)]
+    )
+    assert collection.categories() == {"Shoes": 2, "uncategorized": 1}
+    collection.update("item_2", {"category": "Bags"})
+    # Replaying an item from the log replaces it in place
+    collection.add(item(3, category="Bags", version=collection.version))
+    assert collection.categories() == {"Shoes": 1, "Bags": 2}
+    assert len(collection) == 3
+
+
+def test_unknown_fields_round_trip():
+    data = {"id": "item_1", "title": "Coat", "colour": "navy"}
+    assert FashionItem.from_dict(data).to_dict().items() >= data.items()
+    assert FashionCollection().update("missing", {"notes": "x"}) is None
@@ -0,0 +1,61 @@
+import asyncio
+import json
+
+import pytest
+
+pytest.importorskip("tabtabtab_lib")
+
+from extensions.fashion_ideas import fashion_ideas  # noqa: E402
+from extensions.fashion_ideas.fashion_images import StoredImage  # noqa: E402
+
+
+class Sender:
+    def __init__(self):
+        self.sent = []
+
+    async def send_push_notification(self, device_id, notification):
+        self.sent.append(notification)
+
+
+@pytest.fixture
+def extension(tmp_path, monkeypatch):
+    monkeypatch.setattr(fashion_ideas, "FASHION_STORAGE_DIR", str(tmp_path))
+    sender = Sender()
+    extension = fashion_ideas.FashionIdeasExtension(None, sender, "fashion_ideas")
+
+    async def save(data):
+        return StoredImage(data.hex(), f"{tmp_path}/{data.hex()}", None)
+
+    monkeypatch.setattr(extension.images, "save", save)
+    return extension, sender
+
+
+async def test_delta_version_is_read_before_saving(extension, monkeypatch):
+    extension, sender = extension
+    first_saving, release_first = asyncio.Event(), asyncio.Event()
+    add_items = extension.store.add_items
+
+    async def slow_first_save(items):
+        if not first_saving.is_set():
+            first_saving.set()
+            await release_first.wait()
+        await add_items(items)
+
+    monkeypatch.setattr(extension.store, "add_items", slow_first_save)
+
+    first = asyncio.create_task(extension._analyze_screenshot(b"a", "d", "r1"))
+    await first_saving.wait()
+    # A second copy is added while the first one is still being saved
+    await extension._analyze_screenshot(b"b", "d", "r2")
+    release_first.set()
+    await first
+
+    second_delta, first_delta = (json.loads(n.content) for n in sender.sent)
+    assert (first_delta["base_version"], first_delta["version"]) == (0, 1)
+    assert (second_delta["base_version"], second_delta["version"]) == (1, 2)
+    assert first_delta["total_items"] == 1
+
+    # A client that applied only the first delta still gets the second item
+    collection = await extension._ensure_loaded()
+    missing = collection.changes_since(first_delta["version"])
+    assert [item.to_dict() for item in missing] == second_delta["items"]
@@ -0,0 +1,70 @@
+import io
+import json
+import os
+
+import pytest
+
+from extensions.fashion_ideas import fashion_images
+from extensions.fashion_ideas.fashion_images import ImageStore
+
+
+def png(color, size=(64, 64)):
+    Image = pytest.importorskip("PIL.Image")
+    output = io.BytesIO()
+    Image.new("RGB", size, color).save(output, format="PNG")
+    return output.getvalue()
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = ImageStore(str(tmp_path))
+    yield store
+    fashion_images.shutdown()
+
+
+async def test_identical_image_stored_once(store):
+    first = await store.save(png("red"))
+    second = await store.save(png("red"))
+    assert first == second
+    assert os.path.exists(first.path)
+    with open(store.index_path) as f:
+        assert len(f.readlines()) == 1
+
+
+async def test_similar_images_are_kept_apart(store):
+    # Differ in one pixel region only, like two products on the same page
+    Image = pytest.importorskip("PIL.Image")
+    base = Image.new("RGB", (64, 64), "white")
+    variant = base.copy()
+    variant.paste((250, 250, 250), (10, 10, 20, 20))
+    images = []
+    for image in (base, variant):
+        output = io.BytesIO()
+        image.save(output, format="PNG")
+        images.append(await store.save(output.getvalue()))
+    assert images[0].hash != images[1].hash
+    assert all(os.path.exists(image.path) for image in images)
+
+
+async def test_thumbnail_written(store):
+    stored = await store.save(png("blue", size=(1024, 768)))
+    assert stored.thumbnail_path and os.path.exists(stored.thumbnail_path)
+
+
+async def test_undecodable_image_stored_without_thumbnail(store):
+    stored = await store.save(b"not an image")
+    assert stored.thumbnail_path is None
+    assert os.path.exists(stored.path)
+
+
+async def test_load_reads_index(store, tmp_path):
+    stored = await store.save(b"not an image")
+    with open(store.index_path, "a") as f:
+        f.write("not json\n")
+        # Records written before perceptual hashes were dropped
+        f.write(json.dumps({"hash": "ab" * 32, "dhash": 5, "thumbnail": None}) + "\n")
+
+    reloaded = ImageStore(str(tmp_path))
+    reloaded.load()
+    assert await reloaded.save(b"not an image") == stored
+    assert reloaded._stored("ab" * 32).thumbnail_path is None
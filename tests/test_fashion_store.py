@@ -0,0 +1,100 @@
+import json
+
+import pytest
+
+from extensions.fashion_ideas import fashion_store
+from extensions.fashion_ideas.fashion_collection import FashionCollection, FashionItem
+from extensions.fashion_ideas.fashion_store import FashionStore
+
+
+@pytest.fixture
+def store(tmp_path):
+    return FashionStore(str(tmp_path))
+
+
+def item(n, **fields):
+    return FashionItem(id=f"item_{n}", title=f"Item {n}", **fields)
+
+
+def log_lines(store):
+    with open(store.log_path) as f:
+        return f.read().splitlines()
+
+
+async def test_log_replays_puts_and_updates(store):
+    await store.add_items([item(1), item(2)])
+    await store.update_item("item_1", {"notes": "in blue", "version": 3})
+    await store.update_item("missing", {"notes": "ignored"})
+    items = {i["id"]: i for i in store.load()}
+    assert items["item_1"]["notes"] == "in blue"
+    assert items["item_1"]["version"] == 3
+    assert "notes" not in items["item_2"]
+    assert len(items) == 2
+
+
+async def test_torn_last_line_is_skipped_and_cut_off(store):
+    await store.add_items([item(1)])
+    with open(store.log_path, "a") as f:
+        f.write('{"op": "put", "item": {"id": "item_2"')
+
+    assert [i["id"] for i in store.load()] == ["item_1"]
+    # The next append isn't glued to the torn record
+    await store.add_items([item(3)])
+    assert [i["id"] for i in store.load()] == ["item_1", "item_3"]
+    assert len(log_lines(store)) == 2
+
+
+async def test_complete_last_line_without_newline_is_kept(store):
+    await store.add_items([item(1)])
+    with open(store.log_path, "a") as f:
+        f.write(json.dumps({"op": "put", "item": {"id": "item_2"}}))
+
+    assert len(store.load()) == 2
+    await store.add_items([item(3)])
+    assert [i["id"] for i in store.load()] == ["item_1", "item_2", "item_3"]
+
+
+async def test_compaction_rewrites_log_and_manifest(store, monkeypatch):
+    monkeypatch.setattr(fashion_store, "COMPACT_MIN_RECORDS", 4)
+    collection = FashionCollection()
+    for n in range(2):
+        collection.add(item(n))
+    await store.add_items(list(collection))
+    for note in ("a", "b", "c"):
+        updated = collection.update("item_0", {"notes": note})
+        await store.update_item("item_0", {"notes": note, "version": updated.version})
+
+    await store.maybe_compact(collection)
+    await store.write_manifest(collection)
+
+    assert len(log_lines(store)) == 2
+    assert store.load() == collection.to_dicts()
+    assert store.read_manifest() == {
+        "total_items": 2,
+        "categories": {"uncategorized": 2},
+        "version": 5,
+    }
+
+
+async def test_small_log_is_not_compacted(store):
+    collection = FashionCollection([item(1)])
+    await store.add_items(list(collection))
+    await store.update_item("item_1", {"notes": "x"})
+    await store.maybe_compact(collection)
+    assert len(log_lines(store)) == 2
+
+
+def test_legacy_file_is_migrated_once(store, tmp_path):
+    legacy = [{"id": "item_1", "title": "Old"}, {"id": "item_2", "title": "Older"}]
+    (tmp_path / fashion_store.LEGACY_FILENAME).write_text(json.dumps(legacy))
+
+    assert store.load() == legacy
+    assert len(log_lines(store)) == 2
+    (tmp_path / fashion_store.LEGACY_FILENAME).write_text("[]")
+    assert store.load() == legacy
+
+
+def test_unreadable_manifest_is_ignored(store, tmp_path):
+    assert store.read_manifest() is None
+    (tmp_path / fashion_store.MANIFEST_FILENAME).write_text("{not json")
+    assert store.read_manifest() is None
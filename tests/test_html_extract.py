@@ -0,0 +1,66 @@
+import asyncio
+import signal
+import time
+
+import pytest
+
+pytest.importorskip("tabtabtab_lib")
+
+from extensions.daily_digest_extension import config, html_extract  # noqa: E402
+
+
+def test_extract_title_and_text():
+    html = "<html><title>Hi</title><body><p>One</p><div>skip</div><p>Two</p></body>"
+    assert html_extract.extract_title_and_text(html, "fallback") == (
+        "Hi",
+        "One\nTwo\n",
+    )
+
+
+def test_extract_falls_back_to_given_title():
+    assert html_extract.extract_title_and_text("<p>x</p>", "fallback") == (
+        "fallback",
+        "x\n",
+    )
+
+
+@pytest.mark.skipif(not hasattr(signal, "SIGALRM"), reason="needs SIGALRM")
+def test_deadline_interrupts_parse_in_worker(monkeypatch):
+    def slow(html, fallback_title):
+        time.sleep(5)
+        return "late", ""
+
+    monkeypatch.setattr(html_extract, "extract_title_and_text", slow)
+    started = time.monotonic()
+    with pytest.raises(html_extract.ParseTimeout):
+        html_extract._parse_with_deadline("<p>x</p>", "fallback", 0.1)
+    assert time.monotonic() - started < 1
+    # The previous handler is restored
+    assert signal.getsignal(signal.SIGALRM) in (signal.SIG_DFL, None)
+
+
+async def test_parse_webpage_in_pool():
+    try:
+        assert await html_extract.parse_webpage("<title>T</title><p>a</p>", "f") == (
+            "T",
+            "a\n",
+        )
+    finally:
+        html_extract.shutdown()
+
+
+async def test_unresponsive_worker_recycles_pool(monkeypatch):
+    monkeypatch.setattr(config, "PARSE_TIMEOUT_SECONDS", 0.1)
+    monkeypatch.setattr(html_extract, "_DEADLINE_GRACE_SECONDS", 0.1)
+
+    async def hang(*args, **kwargs):
+        await asyncio.sleep(10)
+
+    class StuckLoop:
+        def run_in_executor(self, *args):
+            return hang()
+
+    monkeypatch.setattr(asyncio, "get_running_loop", lambda: StuckLoop())
+    html_extract._get_executor()
+    assert await html_extract.parse_webpage("<p>x</p>", "f") == ("f", "")
+    assert html_extract._executor is None
@@ -0,0 +1,129 @@
+import gc
+from types import SimpleNamespace
+
+import aiohttp
+import pytest
+
+pytest.importorskip("tabtabtab_lib")
+
+from extensions.daily_digest_extension import airtable_client, config  # noqa: E402
+from extensions.daily_digest_extension.http_client import (  # noqa: E402
+    HTTPError,
+    PooledClient,
+)
+
+
+class FakeResponse:
+    def __init__(self, status, body="{}"):
+        self.status = status
+        self.body = body
+        self.headers = {}
+
+    async def read(self):
+        return self.body.encode()
+
+    async def json(self, content_type=None):
+        return {"ok": True}
+
+    async def text(self):
+        return self.body
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        return False
+
+
+class FakeSession:
+    closed = False
+
+    def __init__(self, outcomes):
+        self.outcomes = list(outcomes)
+        self.calls = 0
+
+    def request(self, method, url, params=None, json=None):
+        self.calls += 1
+        outcome = self.outcomes.pop(0)
+        if isinstance(outcome, Exception):
+            raise outcome
+        if isinstance(outcome, tuple):
+            return FakeResponse(*outcome)
+        return FakeResponse(outcome)
+
+
+@pytest.fixture(autouse=True)
+def no_backoff(monkeypatch):
+    monkeypatch.setattr(config, "HTTP_BACKOFF_SECONDS", 0)
+
+
+def connector_error():
+    key = SimpleNamespace(host="example.com", port=443, ssl=True)
+    return aiohttp.ClientConnectorError(key, OSError("refused"))
+
+
+async def request(method, outcomes):
+    session = FakeSession(outcomes)
+    client = PooledClient(session=session)
+    try:
+        return await client._request(method, "https://example.com"), session.calls
+    except Exception as e:
+        return e, session.calls
+
+
+@pytest.mark.parametrize("method", ["GET", "PATCH", "DELETE"])
+async def test_idempotent_methods_retry_server_errors(method):
+    result, calls = await request(method, [503, aiohttp.ServerDisconnectedError(), 200])
+    assert result == {"ok": True}
+    assert calls == 3
+
+
+async def test_post_not_retried_after_server_error():
+    result, calls = await request("POST", [503, 200])
+    assert isinstance(result, HTTPError) and result.status == 503
+    assert calls == 1
+
+
+async def test_post_not_retried_after_disconnect():
+    result, calls = await request("POST", [aiohttp.ServerDisconnectedError(), 200])
+    assert isinstance(result, aiohttp.ServerDisconnectedError)
+    assert calls == 1
+
+
+async def test_post_retried_when_rate_limited():
+    result, calls = await request("POST", [429, 200])
+    assert result == {"ok": True}
+    assert calls == 2
+
+
+async def test_post_retried_when_connection_failed():
+    result, calls = await request("POST", [connector_error(), 200])
+    assert result == {"ok": True}
+    assert calls == 2
+
+
+async def test_retries_give_up(monkeypatch):
+    monkeypatch.setattr(config, "HTTP_MAX_RETRIES", 2)
+    result, calls = await request("GET", [503, 503, 503, 200])
+    assert isinstance(result, HTTPError)
+    assert calls == 3
+
+
+@pytest.mark.parametrize("outcome", [(204, ""), (200, ""), (200, " \n")])
+async def test_empty_body_decodes_as_empty_object(outcome):
+    result, calls = await request("DELETE", [outcome])
+    assert result == {}
+    assert calls == 1
+
+
+def test_airtable_limiter_shared_per_base_while_in_use():
+    first = airtable_client.AirtableClient("key", "base1")
+    second = airtable_client.AirtableClient("other key", "base1")
+    other_base = airtable_client.AirtableClient("key", "base2")
+    assert first.limiter is second.limiter
+    assert first.limiter is not other_base.limiter
+
+    del first, second, other_base
+    gc.collect()
+    assert "base1" not in airtable_client._base_limiters
+    assert "base2" not in airtable_client._base_limiters
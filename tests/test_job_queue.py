@@ -0,0 +1,207 @@
+import asyncio
+import time
+
+import pytest
+
+from extensions.job_queue import (
+    STATUS_DONE,
+    STATUS_FAILED,
+    STATUS_LEASED,
+    STATUS_PENDING,
+    STATUS_SUPERSEDED,
+    DurableJobsMixin,
+    JobHandler,
+    JobStore,
+)
+
+QUEUE = "test"
+
+
+@pytest.fixture
+def path(tmp_path):
+    return str(tmp_path / "jobs.sqlite3")
+
+
+@pytest.fixture
+def store(path):
+    store = JobStore(path)
+    yield store
+    store.close()
+
+
+def test_enqueue_ignores_repeated_idempotency_key(store):
+    job = store.enqueue(QUEUE, "work", {"n": 1}, idempotency_key="copy:1")
+    assert job is not None
+    assert store.enqueue(QUEUE, "work", {"n": 1}, idempotency_key="copy:1") is None
+    assert store.counts(QUEUE) == {STATUS_PENDING: 1}
+
+
+def test_enqueue_supersedes_earlier_jobs_with_same_key(store):
+    first = store.enqueue(QUEUE, "work", {}, supersede_key=("copy", "d1"))
+    second = store.enqueue(QUEUE, "work", {}, supersede_key=("copy", "d1"))
+    assert not store.claim(first.id)
+    assert [job.id for job in store.runnable(QUEUE)] == [second.id]
+    assert store.counts(QUEUE) == {STATUS_PENDING: 1, STATUS_SUPERSEDED: 1}
+
+
+def test_enqueue_leaves_running_job_unless_asked(store):
+    first = store.enqueue(QUEUE, "work", {}, supersede_key="k")
+    assert store.claim(first.id)
+    store.enqueue(QUEUE, "work", {}, supersede_key="k", supersede_running=False)
+    assert store.counts(QUEUE) == {STATUS_LEASED: 1, STATUS_PENDING: 1}
+
+
+def test_claim_then_complete(store):
+    job = store.enqueue(QUEUE, "work", {})
+    assert store.claim(job.id)
+    assert not store.claim(job.id)
+    store.complete(job.id)
+    assert store.counts(QUEUE) == {STATUS_DONE: 1}
+    assert store.runnable(QUEUE) == []
+
+
+def test_release_retries_until_out_of_attempts(store):
+    job = store.enqueue(QUEUE, "work", {}, max_attempts=2)
+    assert store.claim(job.id)
+    assert store.release(job.id, "boom")
+    assert store.claim(job.id)
+    assert not store.release(job.id, "boom")
+    assert store.counts(QUEUE) == {STATUS_FAILED: 1}
+
+
+def test_release_without_retry_fails_job(store):
+    job = store.enqueue(QUEUE, "work", {})
+    assert store.claim(job.id)
+    assert not store.release(job.id, "deadline exceeded", retry=False)
+    assert store.counts(QUEUE) == {STATUS_FAILED: 1}
+
+
+def test_expired_lease_can_be_claimed_by_another_owner(store, path):
+    job = store.enqueue(QUEUE, "work", {}, deadline=0.01)
+    assert store.claim(job.id)
+    other = JobStore(path)
+    try:
+        assert not other.claim(job.id)
+        time.sleep(0.05)
+        assert [j.id for j in other.runnable(QUEUE)] == [job.id]
+        assert other.claim(job.id)
+        # The first owner lost its lease and can't finish the job any more
+        store.complete(job.id)
+        assert store.counts(QUEUE) == {STATUS_LEASED: 1}
+    finally:
+        other.close()
+
+
+def test_abandon_only_fails_unleased_jobs(store, path):
+    held = store.enqueue(QUEUE, "work", {})
+    assert store.claim(held.id)
+    waiting = store.enqueue(QUEUE, "work", {})
+    assert not store.abandon(held.id, "interrupted")
+    assert store.abandon(waiting.id, "interrupted")
+    assert store.counts(QUEUE) == {STATUS_LEASED: 1, STATUS_FAILED: 1}
+
+
+def test_expire_fails_old_unfinished_jobs(store):
+    store.enqueue(QUEUE, "work", {})
+    assert store.expire(QUEUE, max_age=60) == 0
+    assert store.expire(QUEUE, max_age=-1) == 1
+    assert store.counts(QUEUE) == {STATUS_FAILED: 1}
+
+
+class Jobs(DurableJobsMixin):
+    extension_id = QUEUE
+    JOB_HANDLERS = {
+        "safe": JobHandler("_work", idempotent=True),
+        "unsafe": "_work",
+    }
+
+    def __init__(self, path):
+        self.JOB_QUEUE_PATH = path
+        self.started = asyncio.Event()
+        self.gate = asyncio.Event()
+        self.runs = []
+
+    async def _work(self, name):
+        self.runs.append(name)
+        self.started.set()
+        await self.gate.wait()
+
+
+@pytest.mark.parametrize("kind", ["safe", "unsafe"])
+async def test_job_cancelled_by_deadline_is_failed(path, kind):
+    jobs = Jobs(path)
+    await jobs.start()
+    await jobs.submit_job(kind, {"name": "a"}, deadline=0.05)
+    await jobs.tasks.join()
+    assert jobs.job_store.counts(QUEUE) == {STATUS_FAILED: 1}
+    await jobs.stop()
+
+
+async def test_idempotent_job_interrupted_by_shutdown_resumes(path):
+    jobs = Jobs(path)
+    await jobs.start()
+    await jobs.submit_job("safe", {"name": "a"})
+    await jobs.started.wait()
+    await jobs.stop(timeout=0)
+    assert jobs.job_store.counts(QUEUE) == {STATUS_PENDING: 1}
+
+    successor = Jobs(path)
+    successor.gate.set()
+    await successor.start()
+    await successor.tasks.join()
+    assert successor.runs == ["a"]
+    assert successor.job_store.counts(QUEUE) == {STATUS_DONE: 1}
+    await successor.stop()
+
+
+async def test_other_job_interrupted_by_shutdown_is_not_rerun(path):
+    jobs = Jobs(path)
+    await jobs.start()
+    await jobs.submit_job("unsafe", {"name": "a"})
+    await jobs.started.wait()
+    await jobs.stop(timeout=0)
+    assert jobs.job_store.counts(QUEUE) == {STATUS_FAILED: 1}
+
+    successor = Jobs(path)
+    await successor.start()
+    await successor.tasks.join()
+    assert successor.runs == []
+    await successor.stop()
+
+
+async def test_unfinished_job_of_crashed_process_resumes_only_if_idempotent(path):
+    crashed = JobStore(path)
+    safe = crashed.enqueue(QUEUE, "safe", {"name": "safe"}, deadline=0.01)
+    unsafe = crashed.enqueue(QUEUE, "unsafe", {"name": "unsafe"}, deadline=0.01)
+    crashed.enqueue(QUEUE, "unsafe", {"name": "new"})
+    assert crashed.claim(safe.id) and crashed.claim(unsafe.id)
+    crashed.close()
+    await asyncio.sleep(0.05)
+
+    jobs = Jobs(path)
+    jobs.gate.set()
+    await jobs.start()
+    await jobs.tasks.join()
+    assert sorted(jobs.runs) == ["new", "safe"]
+    assert jobs.job_store.counts(QUEUE) == {STATUS_DONE: 2, STATUS_FAILED: 1}
+    await jobs.stop()
+
+
+async def test_successor_takes_over_jobs_released_while_stopping(path):
+    jobs = Jobs(path)
+    await jobs.start()
+    await jobs.submit_job("safe", {"name": "a"})
+    await jobs.started.wait()
+
+    # A hot reload starts the successor before stopping its predecessor
+    successor = Jobs(path)
+    successor.gate.set()
+    await successor.start()
+    await jobs.stop(timeout=0)
+    assert successor.runs == []
+
+    await successor.take_over()
+    await successor.tasks.join()
+    assert successor.runs == ["a"]
+    assert successor.job_store.counts(QUEUE) == {STATUS_DONE: 1}
+    await successor.stop()
@@ -0,0 +1,85 @@
+import asyncio
+
+from extensions.leased_cache import LeasedCache
+
+
+class Resource:
+    def __init__(self, name):
+        self.name = name
+        self.closed = 0
+
+    async def close(self):
+        self.closed += 1
+
+
+def make_cache(max_entries=1):
+    return LeasedCache(Resource.close, max_entries=max_entries)
+
+
+async def settle():
+    for _ in range(3):
+        await asyncio.sleep(0)
+
+
+async def test_lease_reuses_value_per_key():
+    cache = make_cache(max_entries=2)
+    with cache.lease("a", lambda: Resource("a")) as first:
+        pass
+    with cache.lease("a", lambda: Resource("other")) as second:
+        assert second is first
+    assert len(cache) == 1
+
+
+async def test_unleased_value_closed_on_eviction():
+    cache = make_cache()
+    with cache.lease("a", lambda: Resource("a")) as a:
+        pass
+    with cache.lease("b", lambda: Resource("b")):
+        await settle()
+        assert a.closed == 1
+
+
+async def test_leased_value_closed_after_last_release():
+    cache = make_cache()
+    with cache.lease("a", lambda: Resource("a")) as a:
+        with cache.lease("a", lambda: Resource("a")):
+            with cache.lease("b", lambda: Resource("b")):
+                pass
+        await settle()
+        # Evicted, but still in use
+        assert a.closed == 0
+    await settle()
+    assert a.closed == 1
+
+
+async def test_close_closes_leased_values_once():
+    cache = make_cache()
+    with cache.lease("a", lambda: Resource("a")) as a:
+        with cache.lease("b", lambda: Resource("b")) as b:
+            await cache.close()
+            assert (a.closed, b.closed) == (1, 1)
+    await settle()
+    assert (a.closed, b.closed) == (1, 1)
+    assert len(cache) == 0
+
+
+async def test_close_waits_for_pending_closes():
+    cache = make_cache()
+    with cache.lease("a", lambda: Resource("a")) as a:
+        pass
+    with cache.lease("b", lambda: Resource("b")):
+        pass
+    await cache.close()
+    assert a.closed == 1
+
+
+async def test_close_errors_are_logged(caplog):
+    class Failing(Resource):
+        async def close(self):
+            raise RuntimeError("boom")
+
+    cache = LeasedCache(Failing.close, max_entries=1, name="failing thing")
+    with cache.lease("a", lambda: Failing("a")):
+        pass
+    await cache.close()
+    assert "Error closing failing thing: boom" in caplog.text
@@ -0,0 +1,140 @@
+import asyncio
+
+import pytest
+
+from extensions.lifecycle import (
+    STATE_CREATED,
+    STATE_DRAINING,
+    STATE_RUNNING,
+    STATE_STOPPED,
+    LifecycleMixin,
+)
+from extensions.task_supervisor import SupervisorClosedError
+
+
+class FakeExtension(LifecycleMixin):
+    def __init__(self, events, unfinished=None):
+        self.extension_id = "fake"
+        self.events = events
+        # Work a stopped instance left behind, shared with its successor
+        self.unfinished = unfinished if unfinished is not None else []
+
+    async def on_start(self):
+        await super().on_start()
+        self.events.append("start")
+
+    async def take_over(self):
+        await super().take_over()
+        while self.unfinished:
+            name = self.unfinished.pop(0)
+            self.tasks.submit(self.work(f"{name} resumed"))
+
+    async def work(self, name, gate=None):
+        self.events.append(f"start {name}")
+        try:
+            if gate is not None:
+                await gate.wait()
+        except asyncio.CancelledError:
+            self.events.append(f"cancelled {name}")
+            self.unfinished.append(name)
+            raise
+        self.events.append(f"done {name}")
+
+    async def close_resources(self):
+        await super().close_resources()
+        self.events.append("closed")
+
+
+async def test_start_runs_once():
+    events = []
+    extension = FakeExtension(events)
+    assert extension.lifecycle_state == STATE_CREATED
+    assert extension.accepting_work
+
+    await extension.start()
+    await extension.start()
+    assert events == ["start"]
+    assert extension.lifecycle_state == STATE_RUNNING
+
+
+async def test_drain_waits_for_work_and_refuses_new_work():
+    events = []
+    extension = FakeExtension(events)
+    await extension.start()
+    gate = asyncio.Event()
+    extension.tasks.submit(extension.work("job", gate))
+
+    drain = asyncio.create_task(extension.drain(timeout=1))
+    await asyncio.sleep(0)
+    assert extension.lifecycle_state == STATE_DRAINING
+    assert not extension.accepting_work
+    with pytest.raises(SupervisorClosedError):
+        extension.tasks.submit(extension.work("late"))
+
+    gate.set()
+    assert await drain
+    assert events == ["start", "start job", "done job"]
+
+
+async def test_stop_closes_resources_after_work_drains():
+    events = []
+    extension = FakeExtension(events)
+    gate = asyncio.Event()
+    extension.tasks.submit(extension.work("job", gate))
+    asyncio.get_running_loop().call_later(0.01, gate.set)
+
+    assert await extension.stop(timeout=1)
+    assert events == ["start job", "done job", "closed"]
+    assert extension.lifecycle_state == STATE_STOPPED
+
+    # Stopping again is a no-op
+    assert await extension.stop()
+    assert events.count("closed") == 1
+
+
+async def test_stop_timeout_cancels_work_before_closing():
+    events = []
+    extension = FakeExtension(events)
+    extension.MAX_CONCURRENT_TASKS = 1
+    extension.tasks.submit(extension.work("stuck", asyncio.Event()))
+    extension.tasks.submit(extension.work("queued", asyncio.Event()))
+    await asyncio.sleep(0)
+
+    assert not await extension.stop(timeout=0.01)
+    # The queued job is dropped without ever starting
+    assert events == ["start stuck", "cancelled stuck", "closed"]
+    assert extension.tasks.stats()["running"] == 0
+
+
+async def test_stop_survives_failing_close_resources(caplog):
+    extension = FakeExtension([])
+
+    async def fail():
+        raise RuntimeError("boom")
+
+    extension.close_resources = fail
+    assert await extension.stop()
+    assert extension.lifecycle_state == STATE_STOPPED
+    assert "Error closing resources" in caplog.text
+
+
+async def test_take_over_resumes_work_left_by_predecessor():
+    events = []
+    old = FakeExtension(events)
+    old.tasks.submit(old.work("job", asyncio.Event()))
+    await asyncio.sleep(0)
+
+    new = FakeExtension(events, unfinished=old.unfinished)
+    await new.start()
+    await old.stop(timeout=0.01)
+    await new.take_over()
+    await new.tasks.wait_idle(1)
+
+    assert events == [
+        "start job",
+        "start",
+        "cancelled job",
+        "closed",
+        "start job resumed",
+        "done job resumed",
+    ]
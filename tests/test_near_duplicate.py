@@ -0,0 +1,92 @@
+import random
+
+from extensions.near_duplicate import (
+    FINGERPRINT_BITS,
+    NearDuplicateIndex,
+    hamming_distance,
+    simhash,
+)
+
+TEXT = (
+    "The quarterly report shows revenue grew twelve percent while operating "
+    "costs stayed flat across every region we track."
+)
+
+
+def flip(fingerprint, bits):
+    for bit in bits:
+        fingerprint ^= 1 << bit
+    return fingerprint
+
+
+def test_simhash_ignores_case_punctuation_and_spacing():
+    assert simhash(TEXT) == simhash("  " + TEXT.upper().replace(" ", "  ") + "!!")
+    assert hamming_distance(simhash(TEXT), simhash("Completely unrelated words")) > 6
+
+
+def test_every_bit_is_in_a_band():
+    index = NearDuplicateIndex[str](max_distance=6)
+    top_bit = 1 << (FINGERPRINT_BITS - 1)
+    assert index._band_values(0) != index._band_values(top_bit)
+
+
+def test_recall_at_the_distance_threshold():
+    rng = random.Random(0)
+    for max_distance in (3, 6, 9):
+        index = NearDuplicateIndex[int](max_distance=max_distance)
+        for trial in range(200):
+            fingerprint = rng.getrandbits(FINGERPRINT_BITS)
+            index.add_fingerprint(trial, fingerprint)
+            # Always include the top bit, which 64 // bands leaves over
+            bits = {FINGERPRINT_BITS - 1} | set(
+                rng.sample(range(FINGERPRINT_BITS - 1), max_distance - 1)
+            )
+            match = index.find_fingerprint(flip(fingerprint, bits))
+            assert match is not None and match.key == trial
+            assert match.distance == max_distance
+
+
+def test_no_match_past_the_threshold():
+    index = NearDuplicateIndex[str](max_distance=6)
+    index.add_fingerprint("a", 0)
+    assert index.find_fingerprint(flip(0, range(7))) is None
+    assert index.find_fingerprint(flip(0, range(6))).key == "a"
+
+
+def test_closest_match_wins():
+    index = NearDuplicateIndex[str]()
+    index.add_fingerprint("far", flip(0, range(5)))
+    index.add_fingerprint("near", flip(0, [1]))
+    assert index.find_fingerprint(0).key == "near"
+
+
+def test_record_hit_bumps_copy_count():
+    index = NearDuplicateIndex[str]()
+    index.add("rec1", TEXT, count=2)
+    assert index.find(TEXT).copy_count == 2
+    assert index.record_hit("rec1") == 3
+    assert index.record_hit("rec1") == 4
+    assert index.find(TEXT.lower()).copy_count == 4
+
+
+def test_eviction_keeps_recently_hit_entries():
+    index = NearDuplicateIndex[int](max_entries=2)
+    ones = (1 << FINGERPRINT_BITS) - 1
+    alternating = ones // 3
+    index.add_fingerprint(1, 0)
+    index.add_fingerprint(2, ones)
+    index.record_hit(1)
+    index.add_fingerprint(3, alternating)
+
+    assert len(index) == 2
+    assert index.find_fingerprint(ones) is None
+    assert index.find_fingerprint(0).key == 1
+    assert not any(2 in bucket for band in index._buckets for bucket in band.values())
+
+
+def test_readding_a_key_replaces_its_fingerprint():
+    index = NearDuplicateIndex[str]()
+    index.add_fingerprint("a", 0)
+    index.add_fingerprint("a", (1 << 64) - 1)
+    assert len(index) == 1
+    assert index.find_fingerprint(0) is None
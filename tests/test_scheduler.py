@@ -0,0 +1,126 @@
+import asyncio
+from datetime import datetime, time, timedelta
+
+import pytest
+
+pytest.importorskip("tabtabtab_lib")
+
+from extensions.daily_digest_extension.scheduler import (  # noqa: E402
+    DigestScheduler,
+    TenantSchedule,
+    parse_schedule,
+)
+
+
+class FakePrecompute:
+    def __init__(self, result=True):
+        self.result = result
+        self.calls = []
+        self.release = asyncio.Event()
+        self.release.set()
+
+    async def __call__(self, dependencies):
+        self.calls.append(dependencies)
+        await self.release.wait()
+        return self.result
+
+
+async def settle(scheduler, tenant):
+    task = scheduler._tenants[tenant].task
+    if task:
+        await task
+
+
+def test_parse_schedule_sorts_and_skips_invalid_times():
+    assert parse_schedule("18:30, bogus,09:00,,25:00") == [time(9, 0), time(18, 30)]
+    assert parse_schedule(None) == []
+
+
+def test_invalid_precompute_after_falls_back_to_default():
+    schedule = TenantSchedule({"daily_digest_precompute_after": "many"})
+    assert schedule.precompute_after == 0
+
+
+def test_is_due_once_per_slot():
+    schedule = TenantSchedule({"daily_digest_schedule": "09:00"})
+    today = datetime.now().date()
+    schedule.last_scheduled_run = datetime.combine(today, time(8, 0))
+    assert not schedule.is_due(datetime.combine(today, time(8, 59)))
+    assert schedule.is_due(datetime.combine(today, time(9, 1)))
+    schedule.last_scheduled_run = datetime.combine(today, time(9, 1))
+    assert not schedule.is_due(datetime.combine(today, time(9, 30)))
+
+
+async def test_is_fresh_since():
+    scheduler = DigestScheduler(FakePrecompute())
+    assert not scheduler.is_fresh_since("tenant", datetime.now().isoformat())
+
+    scheduler.register("tenant", {})
+    since = scheduler._tenants["tenant"].tracking_since
+    assert scheduler.is_fresh_since("tenant", since.isoformat())
+    assert scheduler.is_fresh_since("tenant", (since + timedelta(1)).isoformat())
+    # Generated before this process started counting copies
+    assert not scheduler.is_fresh_since(
+        "tenant", (since - timedelta(seconds=1)).isoformat()
+    )
+    assert not scheduler.is_fresh_since("tenant", "")
+    assert not scheduler.is_fresh_since("tenant", "yesterday")
+
+
+async def test_precompute_triggers_after_n_entries():
+    precompute = FakePrecompute()
+    scheduler = DigestScheduler(precompute)
+    scheduler.register("tenant", {"daily_digest_precompute_after": "3"})
+    assert scheduler.precompute_enabled("tenant")
+
+    scheduler.record_entry("tenant")
+    scheduler.record_entry("tenant")
+    await settle(scheduler, "tenant")
+    assert precompute.calls == []
+    assert scheduler.pending_entries("tenant") == 2
+
+    scheduler.record_entry("tenant")
+    await settle(scheduler, "tenant")
+    assert len(precompute.calls) == 1
+    assert scheduler.pending_entries("tenant") == 0
+
+
+async def test_entries_copied_during_precompute_stay_pending():
+    precompute = FakePrecompute()
+    precompute.release.clear()
+    scheduler = DigestScheduler(precompute)
+    scheduler.register("tenant", {"daily_digest_precompute_after": "1"})
+
+    scheduler.record_entry("tenant")
+    await asyncio.sleep(0)
+    # A run is in flight, so this entry doesn't start another one
+    scheduler.record_entry("tenant")
+    precompute.release.set()
+    await settle(scheduler, "tenant")
+
+    assert len(precompute.calls) == 1
+    assert scheduler.pending_entries("tenant") == 1
+
+
+async def test_failed_precompute_keeps_entries_pending():
+    scheduler = DigestScheduler(FakePrecompute(result=False))
+    scheduler.register("tenant", {"daily_digest_precompute_after": "1"})
+    scheduler.record_entry("tenant")
+    await settle(scheduler, "tenant")
+    assert scheduler.pending_entries("tenant") == 1
+
+
+async def test_precompute_disabled_by_default():
+    precompute = FakePrecompute()
+    scheduler = DigestScheduler(precompute)
+    scheduler.register("tenant", {})
+    assert not scheduler.precompute_enabled("tenant")
+
+    for _ in range(5):
+        scheduler.record_entry("tenant")
+    await settle(scheduler, "tenant")
+    assert precompute.calls == []
+    assert scheduler.pending_entries("tenant") == 5
+    # Entries for unregistered tenants are ignored
+    scheduler.record_entry("other")
+    assert scheduler.pending_entries("other") == 0
@@ -0,0 +1,112 @@
+import asyncio
+
+import pytest
+
+from extensions.single_flight import SingleFlight, flight_key
+
+
+async def settle():
+    for _ in range(5):
+        await asyncio.sleep(0)
+
+
+class Computation:
+    def __init__(self, result=None, error=None):
+        self.calls = 0
+        self.cancelled = False
+        self.gate = asyncio.Event()
+        self.result = result
+        self.error = error
+
+    async def __call__(self):
+        self.calls += 1
+        try:
+            await self.gate.wait()
+        except asyncio.CancelledError:
+            self.cancelled = True
+            raise
+        if self.error is not None:
+            raise self.error
+        return self.result
+
+
+async def test_concurrent_callers_share_one_computation():
+    flights = SingleFlight("test")
+    compute = Computation(result="value")
+    callers = [asyncio.create_task(flights.do("key", compute)) for _ in range(3)]
+    await settle()
+    assert flights.stats() == {"in_flight": 1, "waiters": 3}
+    compute.gate.set()
+    assert await asyncio.gather(*callers) == ["value"] * 3
+    assert compute.calls == 1
+    assert not flights.in_flight("key")
+
+
+async def test_error_propagates_to_every_waiter():
+    flights = SingleFlight("test")
+    compute = Computation(error=ValueError("boom"))
+    callers = [asyncio.create_task(flights.do("key", compute)) for _ in range(2)]
+    await settle()
+    compute.gate.set()
+    results = await asyncio.gather(*callers, return_exceptions=True)
+    assert all(isinstance(r, ValueError) and str(r) == "boom" for r in results)
+    assert compute.calls == 1
+
+
+async def test_failure_is_not_cached():
+    flights = SingleFlight("test")
+    failing = Computation(error=RuntimeError("down"))
+    failing.gate.set()
+    with pytest.raises(RuntimeError):
+        await flights.do("key", failing)
+
+    working = Computation(result="ok")
+    working.gate.set()
+    assert await flights.do("key", working) == "ok"
+
+
+async def test_cancelled_waiter_leaves_others_running():
+    flights = SingleFlight("test")
+    compute = Computation(result="value")
+    leaving = asyncio.create_task(flights.do("key", compute))
+    staying = asyncio.create_task(flights.do("key", compute))
+    await settle()
+    leaving.cancel()
+    await settle()
+    assert not compute.cancelled
+    compute.gate.set()
+    assert await staying == "value"
+    assert leaving.cancelled()
+
+
+async def test_last_waiter_leaving_cancels_computation():
+    flights = SingleFlight("test")
+    compute = Computation(result="value")
+    caller = asyncio.create_task(flights.do("key", compute))
+    await settle()
+    caller.cancel()
+    await settle()
+    assert compute.cancelled
+    assert not flights.in_flight("key")
+
+    # A later caller starts a fresh computation instead of joining the dead one
+    fresh = Computation(result="fresh")
+    fresh.gate.set()
+    assert await flights.do("key", fresh) == "fresh"
+
+
+async def test_different_keys_run_separately():
+    flights = SingleFlight("test")
+    first, second = Computation(result=1), Computation(result=2)
+    first.gate.set()
+    second.gate.set()
+    assert await asyncio.gather(flights.do("a", first), flights.do("b", second)) == [
+        1,
+        2,
+    ]
+
+
+def test_flight_key_ignores_whitespace_and_separates_parts():
+    assert flight_key("ext", "a  b\n", "k") == flight_key("ext", " a b", "k")
+    assert flight_key("ext", "ab", "") != flight_key("ext", "a", "b")
+    assert flight_key("ext", "x", "key1") != flight_key("ext", "x", "key2")
@@ -0,0 +1,131 @@
+import json
+
+import pytest
+
+from extensions.fashion_ideas.structured_data import (
+    extract_page_data,
+    guess_category,
+    is_apparel_category,
+)
+
+
+def json_ld_page(*products, text="Free returns"):
+    scripts = "".join(
+        f'<script type="application/ld+json">{json.dumps(p)}</script>' for p in products
+    )
+    return (
+        f"<html><head><title>Shop</title>{scripts}</head>"
+        f"<body><nav>Menu</nav><p>{text}</p><script>var x = 1;</script></body></html>"
+    )
+
+
+def product(name, category=None, price="49.00"):
+    node = {
+        "@context": "https://schema.org",
+        "@type": "Product",
+        "name": name,
+        "brand": {"@type": "Brand", "name": "Acme"},
+        "offers": {"@type": "Offer", "price": price, "priceCurrency": "EUR"},
+    }
+    if category is not None:
+        node["category"] = category
+    return node
+
+
+def test_json_ld_product_is_parsed():
+    page = extract_page_data(
+        json_ld_page(product("Linen Shirt", "Apparel & Accessories > Clothing"))
+    )
+    assert page.title == "Shop"
+    assert page.text == "Free returns"
+    assert page.is_complete
+    assert page.fashion_items() == [
+        {
+            "title": "Linen Shirt",
+            "category": "Clothing",
+            "description": "Acme.",
+            "price": "49.00 EUR",
+        }
+    ]
+
+
+def test_json_ld_graph_and_duplicates():
+    graph = {
+        "@graph": [
+            {"@type": "WebPage", "name": "Shop"},
+            product("Wool Coat", "Women > Coats"),
+            product("Wool Coat", "Women > Coats"),
+            product("Ankle Boots", "Footwear"),
+        ]
+    }
+    page = extract_page_data(json_ld_page(graph))
+    assert [p["title"] for p in page.products] == ["Wool Coat", "Ankle Boots"]
+    assert [p["category"] for p in page.products] == ["Clothing", "Shoes"]
+    assert page.is_complete
+
+
+def test_opengraph_product_is_used_without_json_ld():
+    page = extract_page_data(
+        "<html><head>"
+        '<meta property="og:type" content="product">'
+        '<meta property="og:title" content="Leather Sneakers">'
+        '<meta property="product:price:amount" content="120">'
+        '<meta property="product:price:currency" content="USD">'
+        '<meta property="product:category" content="187">'
+        "</head><body></body></html>"
+    )
+    assert page.products[0]["price"] == "120 USD"
+    assert page.is_complete
+
+
+def test_invalid_json_ld_is_ignored():
+    page = extract_page_data(
+        '<script type="application/ld+json">{"@type": "Product",</script><p>Hi</p>'
+    )
+    assert page.products == []
+    assert not page.is_complete
+    assert "Hi" in page.relevant_text()
+
+
+@pytest.mark.parametrize(
+    "name, category",
+    [
+        ("Apple Watch Series 9", "Electronics > Wearables"),
+        ("Smart Ring", "Electronics"),
+        ("Gaming Laptop", "Computers > Laptops"),
+        ("Linen Shirt", None),
+        ("Baseball Cap", "Sports > Watches & Rings"),
+    ],
+)
+def test_page_without_apparel_category_needs_the_llm(name, category):
+    page = extract_page_data(json_ld_page(product(name, category)))
+    assert not page.is_complete
+    assert name in page.relevant_text()
+
+
+def test_product_without_price_needs_the_llm():
+    page = extract_page_data(json_ld_page(product("Linen Shirt", "Clothing", "")))
+    assert not page.is_complete
+
+
+def test_guess_category_matches_whole_words_only():
+    assert guess_category("Laptop stand") is None
+    assert guess_category("Lawsuit documents") is None
+    assert guess_category("Summer Dresses") == "Clothing"
+    assert guess_category("Apple Watch") == "Accessories"
+
+
+@pytest.mark.parametrize(
+    "category, expected",
+    [
+        ("Apparel & Accessories > Jewelry > Watches", True),
+        ("Women > Dresses", True),
+        ("1604", True),
+        ("Electronics > Smart Watches", False),
+        ("Computers > Laptops", False),
+        ("", False),
+        (None, False),
+    ],
+)
+def test_is_apparel_category(category, expected):
+    assert is_apparel_category(category) is expected
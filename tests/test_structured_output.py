@@ -0,0 +1,154 @@
+import pytest
+
+from extensions.structured_output import (
+    MAX_NESTING_DEPTH,
+    MAX_STRAY_OPENERS,
+    StructuredOutputError,
+    extract_json,
+    iter_json_values,
+    parse_llm_json,
+    validate,
+)
+
+SCHEMA = {
+    "type": "object",
+    "required": ["items"],
+    "properties": {
+        "items": {
+            "type": "array",
+            "items": {
+                "type": "object",
+                "required": ["name"],
+                "properties": {"name": {"type": "string"}},
+            },
+        }
+    },
+}
+
+
+def values(text):
+    return list(iter_json_values(text))
+
+
+def test_values_found_between_prose_and_fences():
+    text = 'Here you go:\n```json\n{"a": [1, 2]}\n```\nand also [3] done.'
+    assert values(text) == [({"a": [1, 2]}, False), ([3], False)]
+
+
+def test_brackets_inside_strings_are_ignored():
+    text = '{"text": "a } ] \\" [ {", "n": 1}'
+    assert values(text) == [({"text": 'a } ] " [ {', "n": 1}, False)]
+
+
+def test_trailing_commas_and_python_literals_repaired():
+    assert values('{"a": [True, None,], "b": False,}') == [
+        ({"a": [True, None], "b": False}, True)
+    ]
+
+
+def test_literal_words_inside_strings_untouched():
+    assert values('{"a": "True or None",}') == [({"a": "True or None"}, True)]
+
+
+@pytest.mark.parametrize(
+    "text, expected",
+    [
+        ('{"a": 1, "b": [1, 2', {"a": 1, "b": [1, 2]}),
+        ('{"a": "cut off', {"a": "cut off"}),
+        ('{"a": "ends in escape\\', {"a": "ends in escape"}),
+        ('{"a": 1, "b":', {"a": 1}),
+        ('{"a": 1,', {"a": 1}),
+    ],
+)
+def test_truncated_output_closed(text, expected):
+    assert values(text) == [(expected, True)]
+
+
+def test_mismatched_brackets_skipped():
+    assert values('{"a": [1}} then {"b": 2}') == [({"b": 2}, False)]
+
+
+def test_unparseable_value_skipped():
+    assert values("[not json at all] {}") == [({}, False)]
+
+
+def test_stray_bracket_in_prose_does_not_hide_json():
+    text = (
+        "Sure! Prices are listed as [min, max) ranges.\n"
+        '```json\n{"is_fashion": true, "items": []}\n```'
+    )
+    assert values(text) == [({"is_fashion": True, "items": []}, False)]
+    assert extract_json(text) == ({"is_fashion": True, "items": []}, [])
+
+
+def test_stray_closer_does_not_hide_json():
+    assert values('See [note {"a": 1} } here') == [({"a": 1}, False)]
+
+
+def test_many_stray_brackets_stop_rescanning():
+    def text(strays):
+        return "[x} " * strays + '[min, max) {"a": 1}'
+
+    assert values(text(MAX_STRAY_OPENERS - 1)) == [({"a": 1}, False)]
+    assert values(text(MAX_STRAY_OPENERS)) == []
+
+
+def test_deeply_nested_input_is_not_json():
+    assert values("[1, {" * 30000) == []
+
+
+def test_deeply_nested_value_skipped_whole():
+    deep = "[" * (MAX_NESTING_DEPTH + 1) + "]" * (MAX_NESTING_DEPTH + 1)
+    assert values(deep + ' {"a": 1}') == [({"a": 1}, False)]
+
+
+def test_nesting_at_limit_allowed():
+    value = "[" * MAX_NESTING_DEPTH + "]" * MAX_NESTING_DEPTH
+    assert len(values(value)) == 1
+
+
+def test_validate_reports_paths():
+    errors = validate({"items": [{"name": 1}, {}]}, SCHEMA)
+    assert errors == [
+        (("items", 0, "name"), "expected string, got int"),
+        (("items", 1, "name"), "is required"),
+    ]
+
+
+def test_extract_prefers_first_valid_value():
+    text = '{"items": "no"} {"items": []}'
+    assert extract_json(text, SCHEMA) == ({"items": []}, [])
+
+
+def test_extract_without_json_raises():
+    with pytest.raises(StructuredOutputError):
+        extract_json("no json here", SCHEMA)
+
+
+async def test_invalid_elements_reasked_one_by_one():
+    asked = []
+
+    async def ask(system_prompt, message):
+        asked.append(message)
+        return '{"name": "fixed"}'
+
+    result = await parse_llm_json(
+        '{"items": [{"name": "ok"}, {"name": 2}]}', SCHEMA, ask=ask
+    )
+    assert result == {"items": [{"name": "ok"}, {"name": "fixed"}]}
+    assert len(asked) == 1
+
+
+async def test_elements_still_invalid_are_dropped():
+    async def ask(system_prompt, message):
+        return "{}"
+
+    result = await parse_llm_json(
+        '{"items": [{"name": 1}, {"name": "ok"}, {}]}', SCHEMA, ask=ask
+    )
+    assert result == {"items": [{"name": "ok"}]}
+
+
+async def test_invalid_elements_raise_when_not_dropped():
+    with pytest.raises(StructuredOutputError):
+        await parse_llm_json('{"items": [{}]}', SCHEMA, drop_invalid_items=False)
@@ -0,0 +1,253 @@
+import asyncio
+
+import pytest
+
+from extensions.task_supervisor import SupervisorClosedError, TaskSupervisor
+
+
+async def settle():
+    for _ in range(5):
+        await asyncio.sleep(0)
+
+
+class Recorder:
+    def __init__(self):
+        self.events = []
+
+    async def work(self, name, gate=None):
+        self.events.append(f"start {name}")
+        try:
+            if gate is not None:
+                await gate.wait()
+        except asyncio.CancelledError:
+            self.events.append(f"cancelled {name}")
+            raise
+        self.events.append(f"done {name}")
+        return name
+
+    def superseded(self, name):
+        async def notify():
+            self.events.append(f"superseded {name}")
+
+        return notify
+
+
+async def test_queued_job_superseded_reports_without_running():
+    supervisor = TaskSupervisor("test", max_concurrent=1)
+    recorder = Recorder()
+    gate = asyncio.Event()
+    supervisor.submit(recorder.work("blocker", gate))
+    first = supervisor.submit(
+        recorder.work("first"),
+        supersede_key="copy",
+        on_superseded=recorder.superseded("first"),
+    )
+    second = supervisor.submit(recorder.work("second"), supersede_key="copy")
+    gate.set()
+    await supervisor.join()
+
+    assert first.superseded and first.future.cancelled()
+    assert await second.future == "second"
+    assert "start first" not in recorder.events
+    assert recorder.events.index("superseded first") < recorder.events.index(
+        "start second"
+    )
+
+
+async def test_running_job_superseded_reports_after_cancellation():
+    supervisor = TaskSupervisor("test")
+    recorder = Recorder()
+    gate = asyncio.Event()
+    first = supervisor.submit(
+        recorder.work("first", gate),
+        supersede_key="copy",
+        on_superseded=recorder.superseded("first"),
+    )
+    await settle()
+    supervisor.submit(recorder.work("second"), supersede_key="copy")
+    await supervisor.join()
+
+    assert first.superseded
+    assert recorder.events.index("cancelled first") < recorder.events.index(
+        "superseded first"
+    )
+
+
+async def test_running_job_kept_without_cancel_running():
+    supervisor = TaskSupervisor("test")
+    recorder = Recorder()
+    gate = asyncio.Event()
+    first = supervisor.submit(
+        recorder.work("first", gate),
+        supersede_key="copy",
+        on_superseded=recorder.superseded("first"),
+    )
+    await settle()
+    supervisor.submit(
+        recorder.work("second"), supersede_key="copy", cancel_running=False
+    )
+    gate.set()
+    await supervisor.join()
+
+    assert not first.superseded
+    assert await first.future == "first"
+    assert "superseded first" not in recorder.events
+
+
+async def test_different_keys_do_not_supersede():
+    supervisor = TaskSupervisor("test")
+    recorder = Recorder()
+    jobs = [
+        supervisor.submit(recorder.work(name), supersede_key=("copy", name))
+        for name in ("a", "b")
+    ]
+    await supervisor.join()
+    assert [await job.future for job in jobs] == ["a", "b"]
+
+
+async def test_finished_job_is_not_superseded():
+    supervisor = TaskSupervisor("test")
+    recorder = Recorder()
+    first = supervisor.submit(
+        recorder.work("first"),
+        supersede_key="copy",
+        on_superseded=recorder.superseded("first"),
+    )
+    await supervisor.join()
+    supervisor.submit(recorder.work("second"), supersede_key="copy")
+    await supervisor.join()
+    assert not first.superseded
+    assert "superseded first" not in recorder.events
+
+
+async def test_submit_after_close_raises():
+    supervisor = TaskSupervisor("test")
+    supervisor.close()
+    coro = Recorder().work("late")
+    with pytest.raises(SupervisorClosedError):
+        supervisor.submit(coro)
+    # The coroutine was closed rather than left unawaited
+    assert coro.cr_frame is None
+
+
+async def test_per_device_limit_lets_other_devices_run():
+    supervisor = TaskSupervisor("test", max_concurrent=4, max_per_device=1)
+    recorder = Recorder()
+    gate = asyncio.Event()
+    supervisor.submit(recorder.work("a1", gate), device_id="a")
+    supervisor.submit(recorder.work("a2"), device_id="a")
+    supervisor.submit(recorder.work("b1"), device_id="b")
+    await settle()
+
+    assert "start a2" not in recorder.events
+    assert "done b1" in recorder.events
+    assert supervisor.stats()["per_device"] == {"a": 1}
+    gate.set()
+    await supervisor.join()
+    assert "done a2" in recorder.events
+    assert supervisor.stats()["per_device"] == {}
+
+
+async def test_queued_jobs_run_by_priority():
+    supervisor = TaskSupervisor("test", max_concurrent=1)
+    recorder = Recorder()
+    gate = asyncio.Event()
+    supervisor.submit(recorder.work("blocker", gate))
+    supervisor.submit(recorder.work("low"), priority=-1)
+    supervisor.submit(recorder.work("high"), priority=1)
+    gate.set()
+    await supervisor.join()
+    assert recorder.events.index("start high") < recorder.events.index("start low")
+
+
+async def test_running_job_cancelled_at_deadline():
+    errors = []
+    supervisor = TaskSupervisor(
+        "test", error_handler=lambda job, error: errors.append(error)
+    )
+    recorder = Recorder()
+    job = supervisor.submit(recorder.work("slow", asyncio.Event()), deadline=0.01)
+    await supervisor.join()
+
+    assert "cancelled slow" in recorder.events
+    assert isinstance(job.future.exception(), asyncio.TimeoutError)
+    assert len(errors) == 1
+
+
+async def test_deadline_counts_time_spent_queued():
+    supervisor = TaskSupervisor("test", max_concurrent=1)
+    recorder = Recorder()
+    gate = asyncio.Event()
+    supervisor.submit(recorder.work("blocker", gate))
+    late = supervisor.submit(recorder.work("late"), deadline=0.01)
+    await asyncio.sleep(0.02)
+    gate.set()
+    await supervisor.join()
+
+    assert "start late" not in recorder.events
+    assert isinstance(late.future.exception(), asyncio.TimeoutError)
+
+
+async def test_full_queue_drops_lowest_priority_oldest():
+    supervisor = TaskSupervisor("test", max_concurrent=1, max_queued=2)
+    recorder = Recorder()
+    gate = asyncio.Event()
+    supervisor.submit(recorder.work("blocker", gate))
+    old_low = supervisor.submit(recorder.work("old_low"), priority=-1)
+    supervisor.submit(recorder.work("new_low"), priority=-1)
+    supervisor.submit(recorder.work("normal"))
+    gate.set()
+    await supervisor.join()
+
+    assert old_low.future.cancelled()
+    assert "start old_low" not in recorder.events
+    assert {"done new_low", "done normal"} <= set(recorder.events)
+
+
+async def test_dropped_job_reports_superseded():
+    supervisor = TaskSupervisor("test", max_concurrent=1, max_queued=2)
+    recorder = Recorder()
+    gate = asyncio.Event()
+    supervisor.submit(recorder.work("blocker", gate))
+    for name in ("first", "second", "third"):
+        supervisor.submit(recorder.work(name), on_superseded=recorder.superseded(name))
+    # The notification is queued on top without dropping another job
+    assert supervisor.stats()["queued"] == 3
+    gate.set()
+    await supervisor.join()
+
+    assert "start first" not in recorder.events
+    assert recorder.events.count("superseded first") == 1
+    assert recorder.events.index("superseded first") < recorder.events.index(
+        "start second"
+    )
+    assert {"done second", "done third"} <= set(recorder.events)
+    assert not any(
+        event.startswith("superseded ") and event != "superseded first"
+        for event in recorder.events
+    )
+
+
+async def test_failures_reported_not_raised():
+    errors = []
+    supervisor = TaskSupervisor(
+        "test", error_handler=lambda job, error: errors.append((job.name, error))
+    )
+
+    async def fail():
+        raise ValueError("boom")
+
+    job = supervisor.submit(fail(), name="failing")
+    await supervisor.join()
+    assert isinstance(job.future.exception(), ValueError)
+    assert [name for name, _ in errors] == ["failing"]
+
+
+async def test_shutdown_cancels_what_outlives_timeout():
+    supervisor = TaskSupervisor("test", max_concurrent=1)
+    recorder = Recorder()
+    running = supervisor.submit(recorder.work("running", asyncio.Event()))
+    queued = supervisor.submit(recorder.work("queued"))
+    assert not await supervisor.shutdown(timeout=0.01)
+    assert running.future.cancelled() and queued.future.cancelled()
+    assert supervisor.stats() == {"running": 0, "queued": 0, "per_device": {}}